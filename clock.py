@@ -0,0 +1,82 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+
+
+class Clock:
+    """Time source and wait primitive used by the executor.
+
+    wait() blocks until ``event`` is set or ``timeout`` seconds pass and
+    returns True if the event was set, exactly like threading.Event.wait.
+    """
+
+    def now_ns(self) -> int:
+        raise NotImplementedError
+
+    def wait(self, event: threading.Event, timeout: float) -> bool:
+        raise NotImplementedError
+
+    def sleep(self, seconds: float):
+        raise NotImplementedError
+
+
+class RealClock(Clock):
+    def now_ns(self) -> int:
+        return time.perf_counter_ns()
+
+    def wait(self, event, timeout):
+        return event.wait(timeout)
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class VirtualClock(Clock):
+    """Simulated time that jumps forward instead of sleeping.
+
+    Callbacks scheduled with call_at()/call_later() run when simulated time
+    reaches them (e.g. a cancel in the middle of a countdown), so hour-long
+    schedules and cancellation races run in milliseconds with exact,
+    repeatable timestamps. Intended for single-threaded simulation.
+    """
+
+    def __init__(self, start_ns: int = 0):
+        self._now = start_ns
+        self._timers = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def now_ns(self) -> int:
+        return self._now
+
+    def call_at(self, when_ns: int, callback: Callable[[], None]):
+        with self._lock:
+            heapq.heappush(self._timers, (when_ns, next(self._sequence), callback))
+
+    def call_later(self, delay_s: float, callback: Callable[[], None]):
+        self.call_at(self._now + int(round(delay_s * 1e9)), callback)
+
+    def advance(self, seconds: float, event: Optional[threading.Event] = None) -> bool:
+        """Move time forward, firing due timers; stop early if ``event`` gets set."""
+        deadline = self._now + int(round(seconds * 1e9))
+        while True:
+            if event is not None and event.is_set():
+                return True
+            with self._lock:
+                if not self._timers or self._timers[0][0] > deadline:
+                    break
+                when, _, callback = heapq.heappop(self._timers)
+            self._now = max(self._now, when)
+            callback()
+        if event is not None and event.is_set():
+            return True
+        self._now = deadline
+        return False
+
+    def wait(self, event, timeout):
+        return self.advance(timeout, event)
+
+    def sleep(self, seconds):
+        self.advance(seconds)
@@ -1,6 +1,37 @@
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, Any, List
+import threading
+from typing import Dict, Any, List, Optional
+
+from coord_buffer import json_default
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = "Default"
+
+
+def profiles_of(config: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """Actions of every profile by name; a plain action list is the "Default" profile."""
+    profiles = config.get("profiles")
+    if profiles:
+        return {name: profile.get("actions", []) for name, profile in profiles.items()}
+    return {DEFAULT_PROFILE: config.get("actions", [])}
+
+
+def profile_hotkeys_of(config: Dict[str, Any]) -> Dict[str, str]:
+    """Hotkey -> profile name for profiles that have a switch hotkey."""
+    return {
+        profile["hotkey"]: name
+        for name, profile in config.get("profiles", {}).items()
+        if profile.get("hotkey")
+    }
+
+
+def digest_of(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
 
 class ConfigManager:
     def __init__(self, config_file: str = "config.json"):
@@ -8,44 +39,127 @@ class ConfigManager:
         self.default_config = {
             "actions": [],
             "always_on_top": True,
-            "theme": "Dark"
+            "theme": "Dark",
+            "panic_hotkey": "ctrl+alt+k",
+            "engine_mode": "thread",
+            "engine_stop_with_ui": False,
+            "journal_enabled": True,
+            "journal_path": "journal/executions.jsonl",
+            "journal_max_bytes": 5 * 1024 * 1024,
+            "journal_backups": 5,
+            "stats_block_name": "strade_stats",
+            "gc_pause_free": False,
+            "realtime_mode": False,
+            "realtime_core": None,
+            "governor": {"sustained_cps": 0, "peak_cps": 0, "per_target": {}},
+            "log_path": "logs/strade.log",
+            "log_level": "INFO",
+            "config_watch": True
         }
+        # Digest of the file content last read or written by us; anything else
+        # on disk is an external edit (see ConfigWatcher)
+        self.disk_digest: Optional[str] = None
+        self.version = 0  # Bumped whenever self.config is saved or replaced
+        self.conflict_callback = None  # conflict_callback(path of the saved local copy, external file content)
+        self._lock = threading.Lock()
         self.config = self.load_config()
 
+    def read_file(self) -> Optional[bytes]:
+        try:
+            with open(self.config_file, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
     def load_config(self) -> Dict[str, Any]:
-        if not os.path.exists(self.config_file):
+        try:
+            data = self.read_file()
+        except OSError as e:
+            log.error("Error loading config: %s", e)
             return self.default_config.copy()
+        if data is None:
+            return self.default_config.copy()
+        self.disk_digest = digest_of(data)
         
         try:
-            with open(self.config_file, 'r') as f:
-                return json.load(f)
+            return json.loads(data)
         except Exception as e:
-            print(f"Error loading config: {e}")
+            log.error("Error loading config: %s", e)
             return self.default_config.copy()
 
-    def save_config(self):
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=4)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+    def save_config(self) -> bool:
+        """Write the config atomically, unless someone else changed the file since we last saw it.
+
+        On such a write conflict the file is left alone and our copy goes to
+        ``<config>.conflict``. The external version becomes the new base (it
+        is handed to ``conflict_callback`` to be applied), so later saves
+        reach the real file again.
+        """
+        with self._lock:
+            self.version += 1
+            data = json.dumps(self.config, indent=4, default=json_default).encode("utf-8")
+            try:
+                current = self.read_file()
+                path = self.config_file
+                conflict = current is not None and self.disk_digest is not None \
+                    and digest_of(current) != self.disk_digest
+                if conflict:
+                    path = self.config_file + ".conflict"
+                    self.disk_digest = digest_of(current)
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'wb') as f:
+                    f.write(data)
+                # Readers (and the watcher) never see a half-written file
+                os.replace(tmp, path)
+            except Exception as e:
+                log.error("Error saving config: %s", e)
+                return False
+            if not conflict:
+                self.disk_digest = digest_of(data)
+                return True
+        log.warning("Config changed on disk since last load; local copy saved to %s", path)
+        if self.conflict_callback:
+            self.conflict_callback(path, current)
+        return False
+
+    def apply_external(self, config: Dict[str, Any], digest: str):
+        """Adopt a config read from disk (already applied to the UI) as the current one."""
+        with self._lock:
+            self.config = config
+            self.disk_digest = digest
+            self.version += 1
+
+    def get_profiles(self) -> Dict[str, List[Dict[str, Any]]]:
+        return profiles_of(self.config)
+
+    def get_profile_hotkeys(self) -> Dict[str, str]:
+        return profile_hotkeys_of(self.config)
+
+    def get_active_profile(self) -> str:
+        profiles = self.get_profiles()
+        # "last_profile" is the key used by older versions
+        name = self.config.get("active_profile", self.config.get("last_profile"))
+        return name if name in profiles else next(iter(profiles))
 
     def get_actions(self) -> List[Dict[str, Any]]:
-        """Get saved actions list."""
-        # Support old profile format for backward compatibility
-        if "profiles" in self.config:
-            profiles = self.config.get("profiles", {})
-            if profiles:
-                first_profile = list(profiles.values())[0]
-                return first_profile.get("actions", [])
-        return self.config.get("actions", [])
+        """Get the active profile's actions."""
+        return self.get_profiles()[self.get_active_profile()]
 
-    def save_actions(self, actions: List[Dict[str, Any]]):
-        """Save actions list."""
-        self.config["actions"] = actions
-        # Remove old profile data if exists
-        if "profiles" in self.config:
-            del self.config["profiles"]
-        if "last_profile" in self.config:
-            del self.config["last_profile"]
+    def save_profiles(self, profiles: Dict[str, List[Dict[str, Any]]], active: str):
+        """Save every profile's actions; switch hotkeys set in the file are kept."""
+        old = self.config.get("profiles", {})
+        self.config["profiles"] = {
+            name: dict(old.get(name, {}), actions=actions) for name, actions in profiles.items()
+        }
+        self.config["active_profile"] = active
+        # Superseded by "profiles" / "active_profile"
+        self.config.pop("actions", None)
+        self.config.pop("last_profile", None)
         self.save_config()
+
+    def save_actions(self, actions: List[Dict[str, Any]]):
+        """Save the active profile's actions, leaving the other profiles untouched."""
+        profiles = self.get_profiles()
+        active = self.get_active_profile()
+        profiles[active] = actions
+        self.save_profiles(profiles, active)
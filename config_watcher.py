@@ -0,0 +1,248 @@
+import ctypes
+import ctypes.util
+import difflib
+import json
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from config_manager import ConfigManager, digest_of, profiles_of, profile_hotkeys_of
+from coord_buffer import json_default
+
+log = logging.getLogger(__name__)
+
+# inotify(7) constants
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+# Top-level keys applied live; everything else takes effect on restart
+LIVE_SETTINGS = ("panic_hotkey", "active_profile", "profile_hotkeys")
+
+
+def _action_key(action: Dict[str, Any]) -> str:
+    return json.dumps(action, sort_keys=True, default=json_default)
+
+
+class ConfigDiff:
+    """What changed between two configs.
+
+    ``actions`` maps a profile present in both to its edit opcodes
+    ``(tag, i1, i2, new_actions)`` ("replace", "delete" or "insert" over the
+    old list, as from difflib.SequenceMatcher); unchanged actions are not
+    listed, so they can be left alone.
+    """
+
+    def __init__(self):
+        self.added_profiles: Dict[str, List[Dict[str, Any]]] = {}
+        self.removed_profiles: List[str] = []
+        self.actions: Dict[str, List[tuple]] = {}
+        self.settings: Dict[str, Any] = {}
+
+    def is_empty(self) -> bool:
+        return not (self.added_profiles or self.removed_profiles or self.actions or self.settings)
+
+    def counts(self):
+        """(added, removed, changed) action counts."""
+        added = sum(len(actions) for actions in self.added_profiles.values())
+        removed = changed = 0
+        for ops in self.actions.values():
+            for tag, i1, i2, new in ops:
+                if tag == "insert":
+                    added += len(new)
+                elif tag == "delete":
+                    removed += i2 - i1
+                else:
+                    common = min(i2 - i1, len(new))
+                    changed += common
+                    added += len(new) - common
+                    removed += i2 - i1 - common
+        return added, removed, changed
+
+
+def diff_configs(old: Dict[str, Any], new: Dict[str, Any]) -> ConfigDiff:
+    diff = ConfigDiff()
+    old_profiles, new_profiles = profiles_of(old), profiles_of(new)
+    for name, actions in new_profiles.items():
+        if name not in old_profiles:
+            diff.added_profiles[name] = actions
+            continue
+        matcher = difflib.SequenceMatcher(
+            a=[_action_key(a) for a in old_profiles[name]],
+            b=[_action_key(a) for a in actions],
+            autojunk=False,
+        )
+        ops = [(tag, i1, i2, actions[j1:j2]) for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"]
+        if ops:
+            diff.actions[name] = ops
+    diff.removed_profiles = [name for name in old_profiles if name not in new_profiles]
+
+    for key in set(old) | set(new):
+        if key not in ("actions", "profiles") and old.get(key) != new.get(key):
+            diff.settings[key] = new.get(key)
+    if profile_hotkeys_of(old) != profile_hotkeys_of(new):
+        diff.settings["profile_hotkeys"] = profile_hotkeys_of(new)
+    return diff
+
+
+class ConfigChange:
+    """An external edit: the parsed config, its file digest and its diff against the model."""
+
+    def __init__(self, config: Dict[str, Any], digest: str, diff: Optional[ConfigDiff], base_version: int):
+        self.config = config
+        self.digest = digest
+        self.diff = diff
+        self.base_version = base_version  # ConfigManager.version the diff was made against
+
+    def diff_for(self, manager: ConfigManager) -> ConfigDiff:
+        """The diff against the manager's current model (recomputed if it has moved on)."""
+        if self.diff is None or manager.version != self.base_version:
+            self.diff = diff_configs(manager.config, self.config)
+            self.base_version = manager.version
+        return self.diff
+
+
+class ConfigWatcher:
+    """Watches the config file for external edits on a background thread.
+
+    Uses inotify on Linux and polls mtime/size elsewhere (or if inotify is
+    unavailable). Our own saves are recognised by their digest and
+    ignored; anything else is parsed and diffed here, off the UI thread,
+    and handed to ``on_change(ConfigChange)``. Files that do not parse yet
+    (an editor mid-save) are skipped until the next change.
+    """
+
+    def __init__(self, manager: ConfigManager, on_change: Callable[[ConfigChange], None],
+                 interval: float = 0.5, debounce: float = 0.05, use_inotify: bool = True):
+        self.manager = manager
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self.mode = None  # "inotify" or "poll" once started
+        self.changes = 0
+        self._reported = None  # Digest of the last change handed to on_change
+        self._fd = None
+        self._stat = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        if self.use_inotify:
+            self._fd = self._open_inotify()
+        self.mode = "inotify" if self._fd is not None else "poll"
+        self._stat = self._file_stat()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join(timeout=2 * self.interval + 1.0)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _open_inotify(self) -> Optional[int]:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            # Watch the directory: atomic saves replace the file (and its inode)
+            directory = os.path.dirname(os.path.abspath(self.manager.config_file))
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+            if libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+            return fd
+        except (OSError, AttributeError) as e:
+            log.info("inotify unavailable, polling config file: %s", e)
+            return None
+
+    def _file_stat(self):
+        try:
+            st = os.stat(self.manager.config_file)
+            return (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            return None
+
+    def _run(self):
+        while self._running:
+            try:
+                changed = self._wait_inotify() if self._fd is not None else self._wait_poll()
+                if changed:
+                    time.sleep(self.debounce)  # Let multi-step writes finish
+                    if self._fd is not None:
+                        self._drain_inotify()
+                    self.check()
+            except Exception as e:
+                log.exception("Config watcher failed: %s", e)
+                time.sleep(self.interval)
+
+    def _wait_inotify(self) -> bool:
+        ready, _, _ = select.select([self._fd], [], [], self.interval)
+        return bool(ready) and self._drain_inotify()
+
+    def _drain_inotify(self) -> bool:
+        """Consume queued events; True if any of them concerns the config file."""
+        name = os.path.basename(self.manager.config_file)
+        hit = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return hit
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                start = offset + _INOTIFY_EVENT.size
+                if data[start:start + length].rstrip(b"\0").decode(errors="replace") == name:
+                    hit = True
+                offset = start + length
+
+    def _wait_poll(self) -> bool:
+        time.sleep(self.interval)
+        stat = self._file_stat()
+        if stat == self._stat:
+            return False
+        self._stat = stat
+        return True
+
+    def check(self) -> Optional[ConfigChange]:
+        """Read the file once; report it if it is an external, parseable edit."""
+        data = self.manager.read_file()
+        if data is None:
+            return None
+        digest = digest_of(data)
+        if digest in (self.manager.disk_digest, self._reported):
+            return None  # Our own save, or already reported
+        try:
+            config = json.loads(data)
+        except ValueError as e:
+            log.debug("Config not parseable yet: %s", e)
+            return None
+        version = self.manager.version
+        try:
+            diff = diff_configs(self.manager.config, config)
+        except RuntimeError:
+            diff = None  # The model was being edited; diff_for() redoes it on the UI thread
+        change = ConfigChange(config, digest, diff, version)
+        self._reported = digest
+        self.changes += 1
+        log.info("External config change detected (%s)", self.mode)
+        self.on_change(change)
+        return change
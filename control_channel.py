@@ -0,0 +1,88 @@
+import logging
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from shm_ring import ShmRing
+
+log = logging.getLogger(__name__)
+
+# Shared memory ring other processes (strade_ctl.py, trading scripts) push commands into
+CONTROL_RING = "strade_control"
+CONTROL_CAPACITY = 1 << 16
+CONTROL_POLL = 0.005
+
+# Controller -> app
+CTL_PROFILE = 1       # profile name
+CTL_TRIGGER = 2       # ladder row (-1 = none) + hotkey, see pack_trigger()
+
+_ROW = struct.Struct("<i")
+
+
+def pack_trigger(hotkey: str, row: Optional[int] = None) -> bytes:
+    return _ROW.pack(-1 if row is None else row) + hotkey.encode("utf-8")
+
+
+def unpack_trigger(payload: bytes) -> Tuple[str, Optional[int]]:
+    (row,) = _ROW.unpack_from(payload, 0)
+    return payload[_ROW.size:].decode("utf-8"), (None if row < 0 else row)
+
+
+class ControlServer:
+    """Polls the control ring on a daemon thread and dispatches each command.
+
+    ``handlers`` maps a CTL_* type to ``handler(payload)``. Handlers run on
+    the polling thread, so they must be thread-safe (Executor.switch_profile
+    is: it only swaps a reference). The ring is single-producer, so only one
+    controller should write at a time.
+    """
+
+    def __init__(self, handlers: Dict[int, Callable[[bytes], None]], name: str = CONTROL_RING):
+        self.handlers = dict(handlers)
+        self.name = name
+        self.ring: Optional[ShmRing] = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return
+        self.ring = ShmRing.create(self.name, CONTROL_CAPACITY)
+        self._running = True
+        self._thread = threading.Thread(target=self._poll, name="control", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._thread.join(timeout=1.0)
+        self.ring.close()
+        self.ring = None
+
+    def _poll(self):
+        while self._running:
+            message = self.ring.pop()
+            if message is None:
+                time.sleep(CONTROL_POLL)
+                continue
+            msg_type, payload = message
+            handler = self.handlers.get(msg_type)
+            if handler is None:
+                log.warning("Unknown control command %d", msg_type)
+                continue
+            try:
+                handler(payload)
+            except Exception as e:
+                log.exception("Control command %d failed: %s", msg_type, e)
+
+
+def send_command(msg_type: int, payload: bytes = b"", name: str = CONTROL_RING) -> bool:
+    """Push one command into a running app's control ring (raises FileNotFoundError if none)."""
+    ring = ShmRing.attach(name)
+    try:
+        ring.touch()
+        return ring.push(msg_type, payload)
+    finally:
+        ring.close()
@@ -0,0 +1,179 @@
+import base64
+import csv
+import io
+import sys
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+NO_REF = -1
+
+# Up to this many points an action keeps one editable chip per point and is
+# saved as a readable "coords" list; beyond it the editor collapses to a
+# summary and the points are saved packed.
+INLINE_LIMIT = 16
+
+
+def to_le_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def from_le_bytes(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class CoordBuffer:
+    """An action's click points as flat machine-int arrays.
+
+    ``xy`` holds x0, y0, x1, y1, ... in one ``array('i')``; ``refs`` is a
+    parallel ``array('q')`` of screen hashes for "Match" waits (NO_REF where
+    unset), or None when no point has one. Thousands of points cost 8 bytes
+    each instead of a dict, and plans are built and sent from the arrays
+    directly.
+    """
+
+    def __init__(self, xy: Optional[array] = None, refs: Optional[array] = None):
+        self.xy = xy if xy is not None else array("i")
+        self.refs = refs
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple]) -> "CoordBuffer":
+        """From ``(x, y)`` or ``(x, y, ref)`` tuples."""
+        buffer = cls()
+        for point in points:
+            buffer.append(point[0], point[1], point[2] if len(point) > 2 else None)
+        return buffer
+
+    @classmethod
+    def from_dicts(cls, coords: List[Dict[str, Any]]) -> "CoordBuffer":
+        return cls.from_points((c.get("x", 0), c.get("y", 0), c.get("ref")) for c in coords)
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "CoordBuffer":
+        xy = from_le_bytes("i", base64.b64decode(data.get("xy", "")))
+        refs = from_le_bytes("q", base64.b64decode(data["refs"])) if data.get("refs") else None
+        return cls(xy, refs)
+
+    @classmethod
+    def from_csv(cls, text: str) -> "CoordBuffer":
+        """Parse "x,y[,ref]" lines (comma, semicolon, tab or space separated).
+
+        Blank lines and rows that do not start with two integers (e.g. a
+        header) are skipped. Raises ValueError if nothing could be read.
+        """
+        buffer = cls()
+        for line in text.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            fields = next(csv.reader(io.StringIO(line.replace(";", ",").replace("\t", ","))))
+            if len(fields) == 1:
+                fields = line.split()
+            try:
+                x, y = int(float(fields[0])), int(float(fields[1]))
+            except (ValueError, IndexError):
+                continue
+            ref = None
+            if len(fields) > 2 and fields[2].strip():
+                try:
+                    ref = int(fields[2])
+                except ValueError:
+                    pass
+            buffer.append(x, y, ref)
+        if not len(buffer):
+            raise ValueError("no coordinates found")
+        return buffer
+
+    def to_json(self) -> Dict[str, Any]:
+        data = {"count": len(self), "xy": base64.b64encode(to_le_bytes(self.xy)).decode("ascii")}
+        if self.refs is not None:
+            data["refs"] = base64.b64encode(to_le_bytes(self.refs)).decode("ascii")
+        return data
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        coords = []
+        for i in range(len(self)):
+            coord = {"x": self.xy[2 * i], "y": self.xy[2 * i + 1]}
+            ref = self.ref(i)
+            if ref is not None:
+                coord["ref"] = ref
+            coords.append(coord)
+        return coords
+
+    def __len__(self) -> int:
+        return len(self.xy) // 2
+
+    def point(self, i: int) -> Tuple[int, int]:
+        return self.xy[2 * i], self.xy[2 * i + 1]
+
+    def ref(self, i: int) -> Optional[int]:
+        if self.refs is None:
+            return None
+        ref = self.refs[i]
+        return None if ref == NO_REF else ref
+
+    def append(self, x: int, y: int, ref: Optional[int] = None):
+        self.xy.append(int(x))
+        self.xy.append(int(y))
+        if ref is not None and self.refs is None:
+            self.refs = array("q", [NO_REF]) * (len(self) - 1)
+        if self.refs is not None:
+            self.refs.append(NO_REF if ref is None else int(ref))
+
+    def extend(self, other: "CoordBuffer"):
+        count = len(self)
+        self.xy.extend(other.xy)
+        if other.refs is not None and self.refs is None:
+            self.refs = array("q", [NO_REF]) * count
+        if self.refs is not None:
+            self.refs.extend(other.refs if other.refs is not None else array("q", [NO_REF]) * len(other))
+
+    def copy(self) -> "CoordBuffer":
+        return CoordBuffer(array("i", self.xy), array("q", self.refs) if self.refs is not None else None)
+
+    def translated(self, dx: int, dy: int) -> "CoordBuffer":
+        """A copy shifted by (dx, dy), e.g. window-relative -> screen coordinates."""
+        xy = array("i", self.xy)
+        xy[0::2] = array("i", [x + dx for x in self.xy[0::2]])
+        xy[1::2] = array("i", [y + dy for y in self.xy[1::2]])
+        return CoordBuffer(xy, self.refs)
+
+    def bounds(self) -> Optional[Tuple[int, int, int, int]]:
+        """(min_x, min_y, max_x, max_y), or None if empty."""
+        if not len(self):
+            return None
+        xs, ys = self.xy[0::2], self.xy[1::2]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def summary(self) -> str:
+        bounds = self.bounds()
+        if bounds is None:
+            return "no points"
+        return f"{len(self):,} points · x {bounds[0]}–{bounds[2]} · y {bounds[1]}–{bounds[3]}"
+
+
+def coords_of(action_data: Dict[str, Any]) -> CoordBuffer:
+    """The action's points as a CoordBuffer, whichever form they were saved in."""
+    packed = action_data.get("coord_buffer")
+    if packed is not None:
+        return packed if isinstance(packed, CoordBuffer) else CoordBuffer.from_json(packed)
+    coords = action_data.get("coords")
+    if isinstance(coords, CoordBuffer):
+        return coords
+    if coords:
+        return CoordBuffer.from_dicts(coords)
+    # Backward compatibility
+    return CoordBuffer.from_points([(action_data.get("x", 0), action_data.get("y", 0))])
+
+
+def json_default(value):
+    """``json.dump(default=...)`` hook: packed buffers (CoordBuffer, MacroBuffer) write their to_json()."""
+    if hasattr(value, "to_json"):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,534 @@
+import logging
+import struct
+import threading
+import time
+import multiprocessing
+from collections import deque
+from typing import Optional
+
+from shm_ring import ShmRing
+from plan import compile_action, encode_plan, decode_plan
+from screen_wait import RegionWaiter, GdiScreenSource
+from stats_block import HOOK_UNKNOWN
+from config_manager import DEFAULT_PROFILE
+from control_channel import pack_trigger, unpack_trigger
+from message_backend import default_message_backend
+
+log = logging.getLogger(__name__)
+
+# Shared memory names; fixed so a restarted UI can re-attach to a surviving engine
+COMMAND_RING = "strade_engine_cmd"
+EVENT_RING = "strade_engine_evt"
+COMMAND_CAPACITY = 1 << 20
+EVENT_CAPACITY = 1 << 18
+
+# UI -> engine
+CMD_PLAN = 1          # hotkey + encoded plan
+CMD_CLEAR = 2
+CMD_KILL = 3
+CMD_SETTING = 4       # setting id + value
+CMD_PANIC_HOTKEY = 5
+CMD_SHUTDOWN = 6
+CMD_PROFILE_PLAN = 7      # profile + hotkey + encoded plan, staged until CMD_PROFILE_COMMIT
+CMD_PROFILE_COMMIT = 8    # newline-separated profile names, active first
+CMD_PROFILE_SWITCH = 9    # profile name
+CMD_PROFILE_HOTKEYS = 10  # newline-separated "combo\tprofile" lines
+CMD_TRIGGER = 11          # ladder row + hotkey (control_channel.pack_trigger)
+CMD_UI_LAG = 12           # UI event-loop lag p99 + max (ns), for the stats block
+
+# Engine -> UI
+EVT_STATUS = 16
+EVT_CLICK = 17
+EVT_EXEC_START = 18
+EVT_EXEC_END = 19
+EVT_METRICS = 20
+EVT_PROFILE = 21      # switch time (ns) + profile name
+
+SETTING_CANCEL_ON_MOVE = 1
+SETTING_PERFORMANCE_MODE = 2
+SETTING_STOP_WITH_UI = 3
+SETTING_REALTIME = 4        # value: core to pin to, REALTIME_OFF or REALTIME_DEFAULT_CORE
+REALTIME_OFF = -1
+REALTIME_DEFAULT_CORE = -2
+
+_SETTING = struct.Struct("<Bi")
+_POINT = struct.Struct("<ii")
+_STR_LEN = struct.Struct("<H")
+_PROFILE_SWITCHED = struct.Struct("<Q")
+_UI_LAG = struct.Struct("<QQ")
+METRIC_FIELDS = (
+    "triggers", "executions", "clicks", "cancellations", "kills",
+    "kill_ack_worst_ns", "kill_to_last_injection_worst_ns", "queue_depth",
+    "throttled", "throttle_delay_max_ns", "hook_health", "journal_dropped",
+)
+_METRICS = struct.Struct("<" + "Q" * len(METRIC_FIELDS))
+
+METRICS_INTERVAL = 0.25
+HEARTBEAT_INTERVAL = 0.5
+UI_TIMEOUT = 3.0        # Engine gives up on a silent UI after this (if stop_with_ui)
+ENGINE_TIMEOUT = 2.0    # A heartbeat older than this means no engine is running
+COMMAND_POLL = 0.002
+
+
+def _pack_plan(hotkey: str, plan_bytes: bytes) -> bytes:
+    raw = hotkey.encode("utf-8")
+    return _STR_LEN.pack(len(raw)) + raw + plan_bytes
+
+
+def _unpack_plan(payload: bytes):
+    (length,) = _STR_LEN.unpack_from(payload, 0)
+    start = _STR_LEN.size
+    return payload[start:start + length].decode("utf-8"), decode_plan(payload[start + length:])
+
+
+def _pack_profile_plan(profile: str, hotkey: str, plan_bytes: bytes) -> bytes:
+    raw = profile.encode("utf-8")
+    return _STR_LEN.pack(len(raw)) + raw + _pack_plan(hotkey, plan_bytes)
+
+
+def _unpack_profile_plan(payload: bytes):
+    (length,) = _STR_LEN.unpack_from(payload, 0)
+    start = _STR_LEN.size
+    hotkey, plan = _unpack_plan(payload[start + length:])
+    return payload[start:start + length].decode("utf-8"), hotkey, plan
+
+
+class _ReliableEvents:
+    """Events the UI must not miss (execution start/end), delivered in order.
+
+    Status and click events may be dropped when the event ring is full, but
+    a lost EXEC_END would leave the UI showing an execution forever. These
+    wait in ``pending`` instead and are retried by ``flush()`` from the
+    engine loop; while any are pending, new ones queue behind them.
+    """
+
+    def __init__(self, ring: ShmRing):
+        self.ring = ring
+        self.pending = deque()
+        self._lock = threading.Lock()
+
+    def push(self, msg_type: int, payload: bytes = b""):
+        with self._lock:
+            if not self.pending and self.ring.push(msg_type, payload):
+                return
+            self.pending.append((msg_type, payload))
+
+    def flush(self):
+        with self._lock:
+            while self.pending and self.ring.push(*self.pending[0]):
+                self.pending.popleft()
+
+
+def run_engine(stop_with_ui: bool = False, journal_options: Optional[dict] = None,
+               stats_block_name: Optional[str] = None, gc_pause_free: bool = False,
+               log_options: Optional[dict] = None, governor_options: Optional[dict] = None):
+    """Engine process entry point: owns the hotkey hooks and input injection."""
+    from executor import Executor
+    from gc_guard import GcGuard
+    from governor import InjectionGovernor
+    from hook_watchdog import HookWatchdog
+    from input_hub import InputHub
+    from log_setup import setup_logging
+
+    log_listener = setup_logging(**log_options) if log_options else None
+    from journal import ExecutionJournal
+    from stats_block import StatsBlock
+
+    commands = ShmRing.create(COMMAND_RING, COMMAND_CAPACITY)
+    events = ShmRing.create(EVENT_RING, EVENT_CAPACITY)
+    commands.touch()  # Treat startup as a UI heartbeat
+    events.touch()
+
+    executor = Executor()
+    execution_events = _ReliableEvents(events)
+    executor.status_callback = lambda message: events.push(EVT_STATUS, message.encode("utf-8"))
+    executor.click_indicator_callback = lambda x, y: events.push(EVT_CLICK, _POINT.pack(x, y))
+    executor.execution_start_callback = lambda: execution_events.push(EVT_EXEC_START)
+    executor.execution_end_callback = lambda: execution_events.push(EVT_EXEC_END)
+    executor.profile_callback = lambda name, elapsed_ns: events.push(
+        EVT_PROFILE, _PROFILE_SWITCHED.pack(elapsed_ns) + name.encode("utf-8")
+    )
+    if journal_options:
+        try:
+            executor.journal = ExecutionJournal(**journal_options)
+        except Exception as e:
+            log.error("Engine: failed to open execution journal: %s", e)
+    if stats_block_name:
+        try:
+            executor.stats_block = StatsBlock.create(stats_block_name)
+        except Exception as e:
+            log.error("Engine: failed to create stats block: %s", e)
+
+    tracker = None
+    try:
+        from window_tracker import WindowTracker, WinEventWindowProvider
+        tracker = WindowTracker(WinEventWindowProvider())
+        tracker.start()
+        executor.window_tracker = tracker
+    except Exception as e:
+        log.warning("Engine: window tracker unavailable: %s", e)
+    executor.message_backend = default_message_backend()
+    executor.governor = InjectionGovernor.from_config(governor_options)
+
+    # The engine's hotkey hook is the one that matters here; probe and repair it like the UI's
+    watchdog = None
+    try:
+        hub = InputHub(executor.backend)
+        hub.start()
+
+        def reinstall_hooks():
+            hub.restart()
+            executor.reinstall_hotkeys()
+
+        def report_hooks(state, message):
+            executor.set_hook_health(state, message)
+            if message and executor.status_callback:
+                executor.status_callback(f"⚠️ Engine hooks: {message}")
+
+        watchdog = HookWatchdog(hub, reinstall_hooks, report_hooks, dict(hub.hook_time, hotkey=executor.hook_time))
+        watchdog.start()
+    except Exception as e:
+        log.error("Engine: failed to start hook watchdog: %s", e)
+
+    executor.gc_guard = GcGuard(gc_pause_free)
+    executor.gc_guard.freeze()
+
+    staged_profiles = {}  # Tables received since the last CMD_PROFILE_COMMIT
+    next_metrics = 0.0
+    try:
+        while True:
+            if execution_events.pending:
+                execution_events.flush()
+            message = commands.pop()
+            if message is None:
+                now = time.monotonic()
+                if now >= next_metrics:
+                    stats = executor.get_stats()
+                    events.push(EVT_METRICS, _METRICS.pack(*(int(stats.get(f, 0)) for f in METRIC_FIELDS)))
+                    events.touch()
+                    next_metrics = now + METRICS_INTERVAL
+                    executor.gc_guard.collect_if_idle()
+                    if stop_with_ui and commands.heartbeat_age() > UI_TIMEOUT:
+                        break
+                time.sleep(COMMAND_POLL)
+                continue
+
+            msg_type, payload = message
+            if msg_type == CMD_PLAN:
+                hotkey, plan = _unpack_plan(payload)
+                if tracker and plan["window"]:
+                    tracker.watch(plan["window"])
+                executor.register_hotkey(hotkey, plan)
+            elif msg_type == CMD_CLEAR:
+                executor.unregister_all()
+            elif msg_type == CMD_KILL:
+                executor.cancel_all()
+            elif msg_type == CMD_SETTING:
+                setting, value = _SETTING.unpack(payload)
+                if setting == SETTING_CANCEL_ON_MOVE:
+                    executor.cancel_on_mouse_move = bool(value)
+                elif setting == SETTING_PERFORMANCE_MODE:
+                    executor.performance_mode = bool(value)
+                elif setting == SETTING_STOP_WITH_UI:
+                    stop_with_ui = bool(value)
+                elif setting == SETTING_REALTIME:
+                    executor.set_realtime(value != REALTIME_OFF, value if value >= 0 else None)
+            elif msg_type == CMD_PANIC_HOTKEY:
+                executor.set_panic_hotkey(payload.decode("utf-8") or None)
+            elif msg_type == CMD_PROFILE_PLAN:
+                profile, hotkey, plan = _unpack_profile_plan(payload)
+                if tracker and plan["window"]:
+                    tracker.watch(plan["window"])
+                staged_profiles.setdefault(profile, {})[hotkey] = plan
+            elif msg_type == CMD_PROFILE_COMMIT:
+                names = payload.decode("utf-8").split("\n")
+                executor.set_profile_tables({name: staged_profiles.get(name, {}) for name in names}, names[0])
+                staged_profiles = {}
+            elif msg_type == CMD_TRIGGER:
+                executor.trigger_hotkey(*unpack_trigger(payload))
+            elif msg_type == CMD_UI_LAG:
+                executor.publish_ui_lag(*_UI_LAG.unpack(payload))
+            elif msg_type == CMD_PROFILE_SWITCH:
+                executor.switch_profile(payload.decode("utf-8"))
+            elif msg_type == CMD_PROFILE_HOTKEYS:
+                lines = payload.decode("utf-8").split("\n") if payload else []
+                executor.set_profile_hotkeys(dict(line.split("\t", 1) for line in lines))
+            elif msg_type == CMD_SHUTDOWN:
+                break
+    finally:
+        if watchdog:
+            watchdog.stop()
+        executor.stop_listening()
+        if tracker:
+            tracker.stop()
+        commands.close()
+        events.close()
+        if log_listener:
+            log_listener.stop()
+
+
+class EngineClient:
+    """UI-side stand-in for Executor that drives an engine process.
+
+    Exposes the subset of the Executor interface the UI uses. Plans and
+    control commands go out through one shared-memory ring; status, click
+    and metrics events come back through another and are dispatched to the
+    same callbacks the UI would set on an in-process Executor.
+    """
+
+    def __init__(self, stop_with_ui: bool = False, journal_options: Optional[dict] = None,
+                 stats_block_name: Optional[str] = None, gc_pause_free: bool = False,
+                 log_options: Optional[dict] = None, governor_options: Optional[dict] = None):
+        self.hotkeys = {}
+        self.active_profile = DEFAULT_PROFILE
+        self.profile_tables = {DEFAULT_PROFILE: {}}  # profile -> {combo: compiled plan}
+        self.profile_hotkeys = {}
+        self.profile_callback = None
+        self.status_callback = None
+        self.click_indicator_callback = None
+        self.execution_start_callback = None
+        self.execution_end_callback = None
+        self.window_tracker = None  # Tracking happens in the engine process
+        self.stats = {field: 0 for field in METRIC_FIELDS}
+        self.panic_hotkey = None
+        self.hook_health = HOOK_UNKNOWN
+        self.stop_with_ui = stop_with_ui
+        self.journal_options = journal_options
+        self.stats_block_name = stats_block_name
+        self.gc_pause_free = gc_pause_free
+        self.log_options = log_options
+        self.governor_options = governor_options
+        self._cancel_on_mouse_move = False
+        self._performance_mode = False
+        self._screen_waiter = None
+        self.screen_source = None
+        self.process = None
+
+        self.commands, self.events = self._start_or_attach()
+        self._send_setting(SETTING_STOP_WITH_UI, stop_with_ui)
+        self._running = True
+        self._reader = threading.Thread(target=self._read_events, daemon=True)
+        self._reader.start()
+
+    def _start_or_attach(self):
+        """Re-attach to an engine that outlived a previous UI, or spawn a new one."""
+        try:
+            events = ShmRing.attach(EVENT_RING)
+            if events.heartbeat_age() < ENGINE_TIMEOUT:
+                commands = ShmRing.attach(COMMAND_RING)
+                commands.touch()
+                commands.push(CMD_CLEAR)  # The UI re-registers everything on load
+                return commands, events
+            events.close()
+        except FileNotFoundError:
+            pass
+
+        self.process = multiprocessing.Process(
+            target=run_engine,
+            args=(self.stop_with_ui, self.journal_options, self.stats_block_name, self.gc_pause_free,
+                  self.log_options, self.governor_options),
+            daemon=False
+        )
+        self.process.start()
+        deadline = time.monotonic() + 10.0
+        while True:
+            try:
+                events = ShmRing.attach(EVENT_RING)
+                commands = ShmRing.attach(COMMAND_RING)
+                return commands, events
+            except FileNotFoundError:
+                if time.monotonic() > deadline or not self.process.is_alive():
+                    raise RuntimeError("Engine process did not start")
+                time.sleep(0.05)
+
+    def _send(self, msg_type, payload=b""):
+        try:
+            sent = self.commands.push(msg_type, payload)
+        except ValueError as e:
+            # Too big for the ring at all (e.g. a huge plan): report it instead of raising into the UI
+            log.error("Engine command %d not sent: %s", msg_type, e)
+            if self.status_callback:
+                self.status_callback(f"⚠️ Engine: {e}")
+            return
+        if not sent:
+            log.error("Engine command ring full, dropped message %d", msg_type)
+
+    def _send_setting(self, setting, value):
+        self._send(CMD_SETTING, _SETTING.pack(setting, int(value)))
+
+    def _read_events(self):
+        next_heartbeat = 0.0
+        while self._running:
+            now = time.monotonic()
+            if now >= next_heartbeat:
+                self.commands.touch()
+                next_heartbeat = now + HEARTBEAT_INTERVAL
+
+            message = self.events.pop()
+            if message is None:
+                time.sleep(0.005)
+                continue
+
+            msg_type, payload = message
+            try:
+                if msg_type == EVT_STATUS and self.status_callback:
+                    self.status_callback(payload.decode("utf-8"))
+                elif msg_type == EVT_CLICK and self.click_indicator_callback:
+                    self.click_indicator_callback(*_POINT.unpack(payload))
+                elif msg_type == EVT_EXEC_START and self.execution_start_callback:
+                    self.execution_start_callback()
+                elif msg_type == EVT_EXEC_END and self.execution_end_callback:
+                    self.execution_end_callback()
+                elif msg_type == EVT_METRICS:
+                    self.stats = dict(zip(METRIC_FIELDS, _METRICS.unpack(payload)))
+                elif msg_type == EVT_PROFILE:
+                    (elapsed_ns,) = _PROFILE_SWITCHED.unpack_from(payload, 0)
+                    self.active_profile = payload[_PROFILE_SWITCHED.size:].decode("utf-8")
+                    if self.profile_callback:
+                        self.profile_callback(self.active_profile, elapsed_ns)
+            except Exception as e:
+                log.exception("Engine event %d failed: %s", msg_type, e)
+
+    @property
+    def cancel_on_mouse_move(self):
+        return self._cancel_on_mouse_move
+
+    @cancel_on_mouse_move.setter
+    def cancel_on_mouse_move(self, value):
+        self._cancel_on_mouse_move = bool(value)
+        self._send_setting(SETTING_CANCEL_ON_MOVE, value)
+
+    @property
+    def performance_mode(self):
+        return self._performance_mode
+
+    @performance_mode.setter
+    def performance_mode(self, value):
+        self._performance_mode = bool(value)
+        self._send_setting(SETTING_PERFORMANCE_MODE, value)
+
+    def set_realtime(self, enabled: bool, core: Optional[int] = None):
+        """Real-time mode for the engine's execution thread (and the engine process)."""
+        if not enabled:
+            value = REALTIME_OFF
+        else:
+            value = core if core is not None else REALTIME_DEFAULT_CORE
+        self._send_setting(SETTING_REALTIME, value)
+
+    def set_status_callback(self, callback):
+        self.status_callback = callback
+
+    def set_screen_source(self, source):
+        self.screen_source = source
+        self._screen_waiter = None
+
+    def capture_reference(self, x: int, y: int):
+        """Hash a screen region locally; the hash is the same in both processes."""
+        try:
+            if self._screen_waiter is None:
+                if self.screen_source is None:
+                    self.screen_source = GdiScreenSource()
+                self._screen_waiter = RegionWaiter(self.screen_source)
+            return self._screen_waiter.snapshot(x, y)
+        except Exception as e:
+            log.warning("Failed to capture reference at %d,%d: %s", x, y, e)
+            return None
+
+    def register_hotkey(self, key_combo: str, data_getter):
+        """Compile the action now and ship the plan to the engine."""
+        action_data = data_getter() if callable(data_getter) else data_getter
+        plan = compile_action(action_data)
+        self._send(CMD_PLAN, _pack_plan(key_combo, encode_plan(plan)))
+        self.hotkeys[key_combo] = plan
+        return True
+
+    def set_panic_hotkey(self, key_combo: Optional[str]):
+        self.panic_hotkey = key_combo
+        self._send(CMD_PANIC_HOTKEY, (key_combo or "").encode("utf-8"))
+        return True
+
+    def set_profile_tables(self, tables, active: Optional[str] = None):
+        """Compile every profile's actions and install them in the engine in one commit."""
+        self.profile_tables = {
+            name: {
+                key_combo: compile_action(getter() if callable(getter) else getter)
+                for key_combo, getter in table.items()
+            }
+            for name, table in tables.items()
+        } or {DEFAULT_PROFILE: {}}
+        if active not in self.profile_tables:
+            active = self.active_profile if self.active_profile in self.profile_tables else next(iter(self.profile_tables))
+        self.active_profile = active
+        self._send_profile_tables()
+
+    def _send_profile_tables(self):
+        for name, table in self.profile_tables.items():
+            for key_combo, plan in table.items():
+                self._send(CMD_PROFILE_PLAN, _pack_profile_plan(name, key_combo, encode_plan(plan)))
+        names = [self.active_profile] + [n for n in self.profile_tables if n != self.active_profile]
+        self._send(CMD_PROFILE_COMMIT, "\n".join(names).encode("utf-8"))
+
+    def switch_profile(self, name: str) -> bool:
+        """Ask the engine to swap tables; profile_callback fires once it has."""
+        if name not in self.profile_tables:
+            return False
+        self._send(CMD_PROFILE_SWITCH, name.encode("utf-8"))
+        return True
+
+    def trigger_hotkey(self, key_combo: str, row: Optional[int] = None) -> bool:
+        if key_combo not in self.profile_tables.get(self.active_profile, {}):
+            return False
+        self._send(CMD_TRIGGER, pack_trigger(key_combo, row))
+        return True
+
+    def set_profile_hotkeys(self, hotkeys):
+        self.profile_hotkeys = dict(hotkeys)
+        self._send_profile_hotkeys()
+
+    def _send_profile_hotkeys(self):
+        lines = [f"{key_combo}\t{name}" for key_combo, name in self.profile_hotkeys.items()]
+        self._send(CMD_PROFILE_HOTKEYS, "\n".join(lines).encode("utf-8"))
+
+    def reinstall_hotkeys(self):
+        """Re-send every compiled plan so the engine re-registers its hotkeys."""
+        self._send(CMD_CLEAR)
+        for key_combo, plan in self.hotkeys.items():
+            self._send(CMD_PLAN, _pack_plan(key_combo, encode_plan(plan)))
+        self._send_profile_tables()
+        self._send(CMD_PANIC_HOTKEY, (self.panic_hotkey or "").encode("utf-8"))
+        self._send_profile_hotkeys()
+
+    def set_hook_health(self, state: int, message: Optional[str] = None):
+        self.hook_health = state
+        if message:
+            log.warning("Hook health: %s", message)
+
+    def cancel_all(self):
+        self._send(CMD_KILL)
+
+    def publish_ui_lag(self, p99_ns: int, max_ns: int):
+        """The stats block lives in the engine process; send the lag there."""
+        self._send(CMD_UI_LAG, _UI_LAG.pack(p99_ns, max_ns))
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats["engine"] = "process"
+        # The UI's hooks and the engine's hotkey hook are watched separately; report the worse
+        stats["hook_health"] = max(self.hook_health, stats.get("hook_health", HOOK_UNKNOWN))
+        return stats
+
+    def unregister_all(self):
+        self._send(CMD_CLEAR)
+        self.hotkeys.clear()
+        self.profile_tables = {name: {} for name in self.profile_tables}
+
+    def start_listening(self):
+        pass
+
+    def stop_listening(self):
+        """Closing the UI normally always shuts the engine down."""
+        self._send(CMD_SHUTDOWN)
+        self._running = False
+        self._reader.join(timeout=1.0)
+        self.commands.close()
+        self.events.close()
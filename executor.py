@@ -1,46 +1,81 @@
 import time
+import logging
 import threading
-import ctypes
+import weakref
+from collections import deque
 from typing import Optional, Tuple
-from pynput.mouse import Button, Controller
-import keyboard
-
-# Ctypes definitions for low-level mouse input
-PUL = ctypes.POINTER(ctypes.c_ulong)
-class KeyBdInput(ctypes.Structure):
-    _fields_ = [("wVk", ctypes.c_ushort),
-                ("wScan", ctypes.c_ushort),
-                ("dwFlags", ctypes.c_ulong),
-                ("time", ctypes.c_ulong),
-                ("dwExtraInfo", PUL)]
-
-class HardwareInput(ctypes.Structure):
-    _fields_ = [("uMsg", ctypes.c_ulong),
-                ("wParamL", ctypes.c_ushort),
-                ("wParamH", ctypes.c_ushort)]
-
-class MouseInput(ctypes.Structure):
-    _fields_ = [("dx", ctypes.c_long),
-                ("dy", ctypes.c_long),
-                ("mouseData", ctypes.c_ulong),
-                ("dwFlags", ctypes.c_ulong),
-                ("time", ctypes.c_ulong),
-                ("dwExtraInfo", PUL)]
-
-class Input_I(ctypes.Union):
-    _fields_ = [("ki", KeyBdInput),
-                ("mi", MouseInput),
-                ("hi", HardwareInput)]
-
-class Input(ctypes.Structure):
-    _fields_ = [("type", ctypes.c_ulong),
-                ("ii", Input_I)]
+from input_backend import InputBackend, default_backend
+from histogram import LatencyHistogram
+from clock import Clock, RealClock
+from stats_block import HOOK_UNKNOWN
+from screen_wait import RegionWaiter, GdiScreenSource, WAIT_TIMEOUT, WAIT_CANCELLED
+from log_setup import trace_id
+from config_manager import DEFAULT_PROFILE
+from coord_buffer import coords_of
+from plan import ladder_of, ladder_table
+from governor import PRIORITY_HIGH, PRIORITY_NORMAL
+from macro import BUTTONS, BUTTON_DOWN, BUTTON_UP, KEY, macro_of
+from realtime import RealtimeMode
+from message_backend import WindowMessageInput
+
+log = logging.getLogger(__name__)
+
+# Lane key of high-priority executions (window lanes are keyed by window)
+PRIORITY_LANE = None
+
+class GilWaitStats:
+    """Measures how long the execution thread waits to get the GIL back.
+
+    A probe releases the GIL with time.sleep(0); with no contention it
+    returns in microseconds, while a busy Tk thread holds it for up to the
+    interpreter switch interval. Samples are bucketed by label so runs with
+    and without performance mode can be compared.
+    """
 
-class Executor:
     def __init__(self):
-        self.mouse = Controller()
+        self.buckets = {}  # label -> [count, total_ns, max_ns]
+
+    def probe(self, label: str):
+        start = time.perf_counter_ns()
+        time.sleep(0)
+        waited = time.perf_counter_ns() - start
+        bucket = self.buckets.get(label)
+        if bucket is None:
+            bucket = self.buckets[label] = [0, 0, 0]
+        bucket[0] += 1
+        bucket[1] += waited
+        if waited > bucket[2]:
+            bucket[2] = waited
+
+    def summary(self):
+        """Return {label: {"samples", "avg_us", "max_us"}}."""
+        return {
+            label: {
+                "samples": count,
+                "avg_us": total / count / 1000 if count else 0.0,
+                "max_us": worst / 1000,
+            }
+            for label, (count, total, worst) in self.buckets.items()
+        }
+
+class _Lane:
+    """Queue and worker thread of one window's message-delivered executions,
+    or of high-priority executions (PRIORITY_LANE)."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.queue = deque()
+        self.active_token = None
+        self.thread = None
+
+
+class Executor:
+    def __init__(self, backend: Optional[InputBackend] = None, clock: Optional[Clock] = None):
+        self.backend = backend or default_backend()
+        # All timing goes through the clock so a VirtualClock can simulate it
+        self.clock = clock or RealClock()
         self.running = False
-        self.hotkeys = {}  # Map hotkey string to action data
+        self.hotkeys = {}  # Map hotkey string to its hook callback (one per combo)
         self.listener = None
         self.status_callback = None
         self.click_indicator_callback = None  # Visual indicator for clicks
@@ -49,37 +84,149 @@ class Executor:
         
         # Cancel on mouse move feature
         self.cancel_on_mouse_move = False
-        self._execution_cancelled = False
         self._initial_mouse_pos = None
         self._mouse_move_threshold = 10  # pixels
+        # Event-driven detector from the input hub; without one the cursor is polled
+        self.movement_detector = None
 
-    def _send_input(self, flags, data=0, dx=0, dy=0):
-        """Send low-level mouse input via user32.dll"""
-        extra = ctypes.c_ulong(0)
-        ii_ = Input_I()
-        ii_.mi = MouseInput(dx, dy, data, flags, 0, ctypes.pointer(extra))
-        x = Input(ctypes.c_ulong(0), ii_)
-        ctypes.windll.user32.SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+        # Adaptive wait steps (screen source is pluggable, created lazily)
+        self.screen_source = None
+        self._screen_waiter = None
 
-    def click(self, x: int, y: int, button: str = 'left', mode: str = 'single', burst_count: int = 3):
-        """Execute click(s) at specific coordinates with low latency."""
-        
-        # Move mouse first (using pynput for movement as it's reliable enough, or could use SetCursorPos)
-        # ctypes.windll.user32.SetCursorPos(x, y) is faster
-        ctypes.windll.user32.SetCursorPos(x, y)
+        # Window anchoring / focus gating (WindowTracker, set by the UI)
+        self.window_tracker = None
+
+        # Executions run on a worker thread so hook callbacks return immediately.
+        # Every execution gets its own cancel event; the kill switch bumps the
+        # generation (dropping queued triggers) and sets the in-flight event.
+        self.panic_hotkey = None
+
+        # Profiles: every profile has its own hotkey table (combo -> action
+        # data getter), all built up front. Each combo is hooked once and its
+        # callback looks the action up in the active table, so switching
+        # profiles is a single reference swap.
+        self.active_profile = DEFAULT_PROFILE
+        self.profile_tables = {DEFAULT_PROFILE: {}}
+        self._active_table = self.profile_tables[DEFAULT_PROFILE]
+        self.profile_hotkeys = {}  # combo -> profile, kept across unregister_all
+        self.profile_switch_time = LatencyHistogram()
+        self.profile_callback = None  # profile_callback(name, elapsed_ns) after a switch
+        # Ladder actions wait for a row key (1-9, 0 = row 10) after their hotkey
+        self.ladder_timeout = 2.0
+        # One [event, row, pressed_ns] per ladder waiting for a row key, oldest first
+        self._row_picks = []
+        self._row_lock = threading.Lock()
+        self._row_keys_hooked = False
+        self._queue = deque()
+        self._queue_cond = threading.Condition()
+        self._generation = 0
+        self._active_token = None
+        self._worker = None
+        self._inject_lock = threading.Lock()
+        self._last_injection_ns = 0
+        # Cancel tokens set by the kill switch -> when it was requested, to time the releases after it
+        self._kill_times = weakref.WeakKeyDictionary()
+        self._execution_id = 0
+
+        # Optional ExecutionJournal recording every injected click
+        self.journal = None
+
+        # Optional StatsBlock published for external monitors
+        self.stats_block = None
+        self.latency = LatencyHistogram()  # Trigger -> first injected click
+        self.hook_time = LatencyHistogram()  # Time spent inside hotkey hook callbacks
+        self.hook_health = HOOK_UNKNOWN
+        self.last_error = ""
+        self.last_error_ns = 0
+
+        # Performance mode is set by the UI; it only labels the GIL wait samples here
+        self.performance_mode = False
+        self.gil_stats = GilWaitStats()
+        # Optional GcGuard: defers cyclic GC while an execution is in flight
+        self.gc_guard = None
+        # Real-time mode of the worker thread (see set_realtime); kept after turning off for its report
+        self.realtime: Optional[RealtimeMode] = None
+        self._thread_tasks = []  # Callables the worker runs on its own thread between executions
+        # Optional MessageBackend: actions with delivery "message" click their window without the
+        # cursor, each window in its own lane so different windows run in parallel
+        self.message_backend = None
+        self._lanes = {}  # window or PRIORITY_LANE -> _Lane; lanes wait on _queue_cond too, hence notify_all()
+        # Optional InjectionGovernor: rate limit checked before every button-down
+        self.governor = None
+
+        self.stats = {
+            "triggers": 0,
+            "executions": 0,
+            "clicks": 0,
+            "cancellations": 0,
+            "kills": 0,
+            "kill_ack_worst_ns": 0,
+            "kill_to_last_injection_worst_ns": 0,
+        }
+
+    def _inject(self, token, func, *args):
+        """Run one input injection unless the execution has been cancelled.
+
+        The check and the injection happen under the same lock that
+        cancel_all() takes before acknowledging, so nothing is injected
+        after a cancel has been acknowledged.
+        """
+        with self._inject_lock:
+            if token is not None and token.is_set():
+                return False
+            func(*args)
+            self._last_injection_ns = self.clock.now_ns()
+        return True
+
+    @staticmethod
+    def _button_at(backend, x, y, button, down):
+        """Move and press/release as one injection (one flush where the backend batches)."""
+        with backend.batch():
+            backend.move(x, y)
+            backend.button(button, down)
+
+    def _release(self, token, backend, button):
+        """Release a pressed button, even after a cancel.
+
+        This is the one injection allowed after the kill switch has been
+        acknowledged: a button left down would keep dragging or selecting.
+        Releases that happen after a kill are counted in
+        kill_to_last_injection_worst_ns.
+        """
+        with self._inject_lock:
+            backend.button(button, False)
+            self._last_injection_ns = now = self.clock.now_ns()
+        requested = self._kill_times.get(token) if token is not None else None
+        if requested is not None:
+            self.stats["kill_to_last_injection_worst_ns"] = max(
+                self.stats["kill_to_last_injection_worst_ns"], now - requested
+            )
+
+    def click(self, x: int, y: int, button: str = 'left', mode: str = 'single', burst_count: int = 3,
+              token=None, trace=None, planned_ns=None, triggered_ns=None, backend=None,
+              target=None, priority=PRIORITY_NORMAL):
+        """Execute click(s) at specific coordinates with low latency.
+
+        ``trace`` is an (execution id, action name) pair; when a journal is
+        attached each click is recorded with its planned and actual time.
+        ``triggered_ns`` is passed for the first click of an execution to
+        record trigger-to-click latency. ``backend`` overrides where input
+        goes (a window's message lane); the cursor is only watched for the
+        real backend. With a governor every press first waits for its rate
+        limit (``target`` is the window, ``priority`` may skip the wait).
+        Returns False if the click sequence was interrupted by ``token``.
+        """
+        backend = backend or self.backend
+        if not self._inject(token, backend.move, x, y):
+            return False
         
         # Update initial position after moving to click target
-        if self.cancel_on_mouse_move:
-            self._initial_mouse_pos = self._get_mouse_pos()
-        
-        # Prepare click constants
-        MOUSEEVENTF_LEFTDOWN = 0x0002
-        MOUSEEVENTF_LEFTUP = 0x0004
-        MOUSEEVENTF_RIGHTDOWN = 0x0008
-        MOUSEEVENTF_RIGHTUP = 0x0010
+        if self.cancel_on_mouse_move and backend is self.backend:
+            self._arm_mouse_move()
         
-        down_flag = MOUSEEVENTF_LEFTDOWN if button == 'left' else MOUSEEVENTF_RIGHTDOWN
-        up_flag = MOUSEEVENTF_LEFTUP if button == 'left' else MOUSEEVENTF_RIGHTUP
+        journal = self.journal if trace is not None else None
+        if planned_ns is None:
+            planned_ns = self.clock.now_ns()
         
         clicks_to_do = 1
         if mode == 'double':
@@ -87,28 +234,123 @@ class Executor:
         elif mode == 'burst':
             clicks_to_do = burst_count
             
-        for _ in range(clicks_to_do):
-            self._send_input(down_flag)
-            self._send_input(up_flag)
+        governor = self.governor
+        for n in range(clicks_to_do):
+            if governor is not None and not governor.acquire(token, target, priority):
+                return False
+            # Move and press in one injection: the priority lane may have moved the cursor meanwhile
+            if not self._inject(token, self._button_at, backend, x, y, button, True):
+                return False
+            actual_ns = self._last_injection_ns
+            if n == 0 and triggered_ns is not None:
+                self.latency.record(actual_ns - triggered_ns)
+            # Always release a button we pressed, even if cancelled in between
+            self._release(token, backend, button)
+            self.stats["clicks"] += 1
+            if journal is not None:
+                journal.record(trace[0], trace[1], x, y, button,
+                               planned_ns + n * 10_000_000, actual_ns, time.time_ns())
             # Minimal sleep for stability if needed, but for trading speed is key. 
             # Some apps might miss it if too fast (0ms), so maybe 1-5ms.
             if clicks_to_do > 1:
-                time.sleep(0.01) 
+                if token is not None:
+                    if self.clock.wait(token, 0.01):
+                        return False
+                else:
+                    self.clock.sleep(0.01)
+        return True
 
     def set_status_callback(self, callback):
         self.status_callback = callback
+
+    def set_screen_source(self, source):
+        """Use a custom screen source for wait steps (e.g. a synthetic one in tests)."""
+        self.screen_source = source
+        self._screen_waiter = None
+
+    def _get_screen_waiter(self):
+        if self._screen_waiter is None:
+            if self.screen_source is None:
+                self.screen_source = GdiScreenSource()
+            self._screen_waiter = RegionWaiter(self.screen_source, clock=self.clock)
+        return self._screen_waiter
+
+    def capture_reference(self, x: int, y: int):
+        """Hash the region around a coordinate so a 'Match' wait can look for it later."""
+        try:
+            return self._get_screen_waiter().snapshot(x, y)
+        except Exception as e:
+            log.warning("Failed to capture reference at %d,%d: %s", x, y, e)
+            return None
+
+    def _wait_for_screen(self, name, next_x, next_y, next_ref, baseline, wait_mode, timeout_ms, fallback, step, total, token):
+        """Wait for the region near the next coordinate instead of a fixed delay.
+
+        Returns False if the execution should stop (cancelled or aborted on timeout).
+        """
+        reference = next_ref if wait_mode == 'match' else None
+        if self.status_callback:
+            self.status_callback(f"{name}: ⌛ Waiting for screen → Click {step+2}/{total}")
+
+        result = self._get_screen_waiter().wait(
+            next_x,
+            next_y,
+            timeout_ms,
+            baseline=baseline,
+            reference=reference,
+            should_cancel=self._check_mouse_moved,
+            cancel_event=token
+        )
+
+        if result == WAIT_CANCELLED:
+            if not token.is_set():
+                self._cancel(token, "⚠️ Cancelled: Mouse moved")
+            return False
+        if result == WAIT_TIMEOUT and fallback == 'abort':
+            self._cancel(token, f"⚠️ {name}: Screen did not respond, aborted")
+            return False
+        return True
     
     def _get_mouse_pos(self):
         """Get current mouse position."""
-        import ctypes.wintypes
-        pt = ctypes.wintypes.POINT()
-        ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
-        return (pt.x, pt.y)
+        return self.backend.cursor_pos()
     
+    def _resolve_window(self, action_data, name):
+        """Return the anchor origin for an action, or None if it must not fire.
+
+        Unanchored actions resolve to (0, 0). Anchored actions read the
+        tracker's cached origin; with focus_only they also require the
+        target window to be in the foreground.
+        """
+        window = action_data.get('window')
+        if not window:
+            return (0, 0)
+        tracker = self.window_tracker
+        if tracker is None:
+            if self.status_callback:
+                self.status_callback(f"⚠️ {name}: Window tracking unavailable")
+            return None
+        if action_data.get('focus_only') and tracker.foreground != window:
+            if self.status_callback:
+                self.status_callback(f"⚠️ {name}: Target window not focused")
+            return None
+        origin = tracker.origins.get(window)
+        if origin is None and self.status_callback:
+            self.status_callback(f"⚠️ {name}: Target window not found")
+        return origin
+
+    def _arm_mouse_move(self):
+        """Anchor cancel-on-move at the current cursor position."""
+        self._initial_mouse_pos = self._get_mouse_pos()
+        if self.movement_detector:
+            self.movement_detector.arm(self._initial_mouse_pos, self._mouse_move_threshold)
+
     def _check_mouse_moved(self):
         """Check if mouse has moved beyond threshold from initial position."""
         if not self.cancel_on_mouse_move or not self._initial_mouse_pos:
             return False
+        if self.movement_detector:
+            return self.movement_detector.moved
         
         current = self._get_mouse_pos()
         dx = abs(current[0] - self._initial_mouse_pos[0])
@@ -116,123 +358,828 @@ class Executor:
         
         return dx > self._mouse_move_threshold or dy > self._mouse_move_threshold
 
-    def register_hotkey(self, key_combo: str, data_getter):
-        """Register a hotkey to trigger an action.
-        
-        Args:
-            key_combo: The hotkey combination string (e.g., 'ctrl+shift+a')
-            data_getter: A callable that returns the current action data dict.
-                        This allows reading fresh settings (like delay_ms) 
-                        at execution time, not registration time.
+    def _cancel(self, token, message):
+        """Cancel one execution and report why."""
+        token.set()
+        self.stats["cancellations"] += 1
+        log.info("Execution cancelled: %s", message)
+        if self.status_callback:
+            self.status_callback(message)
+
+    def cancel_all(self):
+        """Kill switch: cancel the running execution and drop everything queued.
+
+        Returns once the cancel is acknowledged, i.e. once no further input
+        can be injected by any execution that was queued or running. The
+        exception is releasing a button that is still held (see _release);
+        those releases are timed into kill_to_last_injection_worst_ns.
         """
+        requested = self.clock.now_ns()
+        with self._queue_cond:
+            self._generation += 1
+            dropped = len(self._queue)
+            self._queue.clear()
+            token = self._active_token
+            if token is not None:
+                self._kill_times[token] = requested
+                token.set()
+            for lane in self._lanes.values():
+                dropped += len(lane.queue)
+                lane.queue.clear()
+                if lane.active_token is not None:
+                    self._kill_times[lane.active_token] = requested
+                    lane.active_token.set()
+                    dropped += 1
+            for pick in list(self._row_picks):
+                pick[0].set()  # Wake ladders waiting for their row key
         
-        def on_triggered():
-            # Get fresh data each time the hotkey is triggered
-            action_data = data_getter() if callable(data_getter) else data_getter
+        # Wait for an injection already in progress; none can start after this
+        with self._inject_lock:
+            acknowledged = self.clock.now_ns()
+            last_injection = self._last_injection_ns
+        
+        ack_ns = acknowledged - requested
+        last_ns = max(0, last_injection - requested)
+        self.stats["kills"] += 1
+        self.stats["cancellations"] += dropped + (1 if token is not None else 0)
+        self.stats["kill_ack_worst_ns"] = max(self.stats["kill_ack_worst_ns"], ack_ns)
+        self.stats["kill_to_last_injection_worst_ns"] = max(
+            self.stats["kill_to_last_injection_worst_ns"], last_ns
+        )
+        
+        self._publish_stats()
+        if self.status_callback:
+            cancelled = dropped + (1 if token is not None else 0)
+            self.status_callback(f"🛑 Kill switch: {cancelled} cancelled (ack {ack_ns / 1e6:.2f}ms)")
+        return dropped + (1 if token is not None else 0)
+
+    def is_idle(self) -> bool:
+        """True when no execution is running or queued."""
+        with self._queue_cond:
+            if self._active_token is not None or self._queue:
+                return False
+            return all(lane.active_token is None and not lane.queue for lane in self._lanes.values())
+
+    def get_stats(self):
+        """Snapshot of execution counters."""
+        stats = dict(self.stats)
+        with self._queue_cond:
+            stats["queue_depth"] = len(self._queue)
+        stats["gil_wait"] = self.gil_stats.summary()
+        if self.gc_guard:
+            stats["gc"] = self.gc_guard.summary()
+        if self.realtime:
+            stats["realtime"] = self.realtime.summary()
+        if self.journal:
+            stats["journal_dropped"] = self.journal.dropped
+        if self.governor:
+            governor = self.governor.summary()
+            stats["governor"] = governor
+            stats["throttled"] = governor["throttled"]
+            stats["throttle_delay_max_ns"] = governor["delay_max_ns"]
+        latency = self.latency.summary()
+        for key in ("p50_ns", "p90_ns", "p99_ns", "max_ns"):
+            stats[f"latency_{key}"] = latency[key]
+        stats["hook_health"] = self.hook_health
+        stats["profile"] = self.active_profile
+        stats["profile_switch_max_ns"] = self.profile_switch_time.summary()["max_ns"]
+        stats["last_error"] = self.last_error
+        stats["last_error_ns"] = self.last_error_ns
+        return stats
+
+    def _record_error(self, message: str, *args, exc_info=False):
+        """Log an error and remember it for the stats surface."""
+        log.error(message, *args, exc_info=exc_info)
+        self.last_error = message % args if args else message
+        self.last_error_ns = time.time_ns()
+        self._publish_stats()
+
+    def _publish_stats(self):
+        """Copy the current counters into the shared stats block, if any."""
+        block = self.stats_block
+        if block is None:
+            return
+        try:
+            stats = self.get_stats()
+            del stats["gil_wait"]
+            block.publish(stats)
+        except Exception as e:
+            log.warning("Failed to publish stats: %s", e)
+
+    def publish_ui_lag(self, p99_ns: int, max_ns: int):
+        """Export the UI's event-loop lag to the shared stats block, if any."""
+        block = self.stats_block
+        if block is not None:
+            block.publish({"ui_lag_p99_ns": p99_ns, "ui_lag_max_ns": max_ns})
+
+    def trigger(self, data_getter, row: Optional[int] = None):
+        """Queue an action for execution. Safe to call from a hook callback.
+
+        ``row`` selects a ladder row up front (0-based) instead of waiting
+        for a row key. The action data is read here, so a high-priority
+        action can go straight to the priority lane (or to the front of its
+        window's lane) instead of queuing behind a normal-priority burst.
+        """
+        triggered_ns = self.clock.now_ns()
+        action_data = data_getter() if callable(data_getter) else data_getter
+        if action_data.get('priority', PRIORITY_NORMAL) == PRIORITY_HIGH:
+            key = action_data['window'] if self._uses_lane(action_data) else PRIORITY_LANE
+            with self._queue_cond:
+                self._enqueue_lane(key, self._generation, action_data, triggered_ns, None, row, front=True)
+                depth = len(self._queue)
+        else:
+            self._ensure_worker()
+            with self._queue_cond:
+                self._queue.append((self._generation, action_data, triggered_ns, row))
+                self._queue_cond.notify_all()
+                depth = len(self._queue)
+        self.stats["triggers"] += 1
+        block = self.stats_block
+        if block is not None:
+            block.write_field("triggers", self.stats["triggers"])
+            block.write_field("queue_depth", depth)
+
+    def trigger_hotkey(self, key_combo: str, row: Optional[int] = None) -> bool:
+        """Fire the active profile's action for a hotkey as if it was pressed (IPC trigger)."""
+        data_getter = self._active_table.get(key_combo)
+        if data_getter is None:
+            log.warning("No action for hotkey %s in profile %s", key_combo, self.active_profile)
+            return False
+        self.trigger(data_getter, row)
+        return True
+
+    def set_realtime(self, enabled: bool, core: Optional[int] = None):
+        """Turn real-time mode on or off for the execution thread.
+
+        Priority, affinity and timer settings are per-thread, so the change
+        is handed to the worker and applied there between executions. The
+        jitter before and after is measured on a helper thread, so triggers
+        are not held up by it, and reported through the status callback and
+        get_stats()["realtime"] once known.
+        """
+        def measured(mode):
+            if mode is not self.realtime or not mode.active:
+                return  # Turned off or replaced while measuring
+            log.info("Real-time mode: %s", mode.summary())
+            if self.status_callback:
+                self.status_callback(mode.format_status())
+
+        def apply():
+            if self.realtime:
+                self.realtime.restore()
+            if enabled:
+                self.realtime = RealtimeMode(core, on_measured=measured)
+                self.realtime.apply(wait=False)
+                log.info("Real-time mode steps: %s", self.realtime.steps)
+            if self.status_callback and self.realtime:
+                self.status_callback(self.realtime.format_status() if enabled else "Real-time mode off")
+
+        with self._queue_cond:
+            self._thread_tasks.append(apply)
+            self._queue_cond.notify_all()
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+            self._worker.start()
+
+    def _worker_loop(self):
+        while True:
+            with self._queue_cond:
+                while not self._queue and not self._thread_tasks:
+                    self._queue_cond.wait()
+                tasks, self._thread_tasks = self._thread_tasks, []
+                if not tasks:
+                    generation, data_getter, triggered_ns, row = self._queue.popleft()
+                    if generation != self._generation:
+                        continue  # Queued before a kill
+                    token = threading.Event()
+                    self._active_token = token
+            if tasks:
+                # Thread settings (real-time mode) have to be made on this thread
+                for task in tasks:
+                    try:
+                        task()
+                    except Exception as e:
+                        self._record_error("Worker task failed: %s", e, exc_info=True)
+                continue
             
+            gc_guard = self.gc_guard
+            if gc_guard:
+                gc_guard.begin_execution()
+            try:
+                # Read by trigger() (fresh each time the hotkey is pressed); callables still accepted
+                action_data = data_getter() if callable(data_getter) else data_getter
+                points = None
+                if action_data.get('ladder_table') or ladder_of(action_data):
+                    selected = self._select_ladder_row(action_data, row, token, triggered_ns)
+                    if selected is None:
+                        continue
+                    points, triggered_ns = selected
+                if self._uses_lane(action_data):
+                    with self._queue_cond:
+                        self._enqueue_lane(action_data['window'], generation, action_data, triggered_ns, points)
+                    continue
+                self._run_action(action_data, token, triggered_ns, points)
+            except Exception as e:
+                self._record_error("Execution failed: %s", e, exc_info=True)
+            finally:
+                if gc_guard:
+                    gc_guard.end_execution()
+                with self._queue_cond:
+                    self._active_token = None
+                self._publish_stats()
+
+    def _uses_lane(self, action_data) -> bool:
+        # Groups route each member by its own delivery (see _play_group)
+        return (self.message_backend is not None and bool(action_data.get('window'))
+                and action_data.get('delivery', 'cursor') == 'message' and action_data.get('timeline') is None)
+
+    def _enqueue_lane(self, key, generation, action_data, triggered_ns, points, row=None, front=False):
+        """Hand an execution to a lane, starting the lane on first use. Call with _queue_cond held.
+
+        ``key`` is a window (message delivery) or PRIORITY_LANE, which
+        injects through the real backend next to the main worker. ``front``
+        puts the execution ahead of those already queued in the lane.
+        """
+        lane = self._lanes.get(key)
+        if lane is None:
+            if key is PRIORITY_LANE:
+                lane = _Lane(self.backend)
+            else:
+                lane = _Lane(WindowMessageInput(self.message_backend, key))
+            self._lanes[key] = lane
+            lane.thread = threading.Thread(target=self._lane_loop, args=(lane,), daemon=True,
+                                           name="lane-priority" if key is PRIORITY_LANE else f"lane-{key}")
+            lane.thread.start()
+        entry = (generation, action_data, triggered_ns, points, row)
+        if front:
+            lane.queue.appendleft(entry)
+        else:
+            lane.queue.append(entry)
+        self._queue_cond.notify_all()
+
+    def _lane_loop(self, lane):
+        """Worker of one lane: like _worker_loop, minus routing.
+
+        Ladder rows are selected here for executions that come straight
+        from trigger() (high priority); routed ones arrive with their points.
+        """
+        while True:
+            with self._queue_cond:
+                while not lane.queue:
+                    self._queue_cond.wait()
+                generation, action_data, triggered_ns, points, row = lane.queue.popleft()
+                if generation != self._generation:
+                    continue  # Queued before a kill
+                token = threading.Event()
+                lane.active_token = token
+            gc_guard = self.gc_guard
+            if gc_guard:
+                gc_guard.begin_execution()
             try:
-                coords = action_data.get('coords', [])
-                # Backward compatibility
-                if not coords:
-                    coords = [{"x": action_data.get('x', 0), "y": action_data.get('y', 0)}]
+                if points is None and (action_data.get('ladder_table') or ladder_of(action_data)):
+                    selected = self._select_ladder_row(action_data, row, token, triggered_ns)
+                    if selected is None:
+                        continue
+                    points, triggered_ns = selected
+                self._run_action(action_data, token, triggered_ns, points, lane.backend)
+            except Exception as e:
+                self._record_error("Execution failed: %s", e, exc_info=True)
+            finally:
+                if gc_guard:
+                    gc_guard.end_execution()
+                with self._queue_cond:
+                    lane.active_token = None
+                self._publish_stats()
+
+    def _select_ladder_row(self, action_data, row, token, triggered_ns):
+        """Pick a ladder row's points from the precomputed table.
+
+        Without ``row`` this waits for a row key; latency is then measured
+        from that key press. Returns (points, triggered_ns) or None if no
+        valid row was selected.
+        """
+        name = action_data.get('name', 'Action')
+        # Compiled plans carry the table; raw UI data builds it here
+        table = action_data.get('ladder_table') or ladder_table(coords_of(action_data), ladder_of(action_data))
+        if row is None:
+            row, triggered_ns = self._wait_for_row_key(name, len(table), token)
+            if row is None:
+                return None
+        if not 0 <= row < len(table):
+            if self.status_callback:
+                self.status_callback(f"⚠️ {name}: no row {row + 1} (1-{len(table)})")
+            return None
+        return table[row], triggered_ns
+
+    def _wait_for_row_key(self, name, rows, token):
+        """Wait for a row key. Ladders on the worker and on lanes may wait at
+        once; each has its own pick and row keys go to the oldest waiter."""
+        self._hook_row_keys()
+        pick = [threading.Event(), None, None]
+        with self._row_lock:
+            self._row_picks.append(pick)
+        if self.status_callback:
+            self.status_callback(f"{name}: ☰ Press row 1-{min(rows, 10)}")
+        try:
+            self.clock.wait(pick[0], self.ladder_timeout)
+        finally:
+            with self._row_lock:
+                self._row_picks.remove(pick)
+        if token.is_set():
+            return None, None
+        if pick[1] is None and self.status_callback:
+            self.status_callback(f"{name}: no row selected")
+        return pick[1], pick[2]
+
+    def _on_row_key(self, row):
+        with self._row_lock:
+            pick = next((p for p in self._row_picks if not p[0].is_set()), None)
+            if pick is None:
+                return  # Not waiting: the digit is just typed
+            pick[1] = row
+            pick[2] = self.clock.now_ns()
+            pick[0].set()
+
+    def _waiting_for_row(self) -> bool:
+        """Asked by the keyboard hook: swallow a digit only while a ladder waits for it."""
+        return bool(self._row_picks)
+
+    def _hook_row_keys(self):
+        """Hook the digit keys the first time a ladder needs them; they stay hooked.
+
+        A digit that picks a row is swallowed, so it is not also typed into
+        the focused window (e.g. a quantity field); otherwise it passes.
+        """
+        if self._row_keys_hooked:
+            return
+        for row, key in enumerate("1234567890"):
+            try:
+                self.backend.add_hotkey(key, lambda row=row: self._on_row_key(row), suppress=self._waiting_for_row)
+            except Exception as e:
+                self._record_error("Failed to register row key %s: %s", key, e)
+        self._row_keys_hooked = True
+
+    def run_action(self, action_data, triggered_ns=None, row: Optional[int] = None):
+        """Execute an action synchronously on the calling thread.
+
+        Used for simulations and dry runs; cancel_all() still reaches it.
+        Ladders click ``row`` from their precomputed table (None waits for a
+        row key, as after the hotkey). Returns the execution's cancel event
+        (set if it was cancelled).
+        """
+        token = threading.Event()
+        with self._queue_cond:
+            self._active_token = token
+        try:
+            points = None
+            if action_data.get('ladder_table') or ladder_of(action_data):
+                selected = self._select_ladder_row(action_data, row, token, triggered_ns)
+                if selected is None:
+                    return token
+                points, triggered_ns = selected
+            self._run_action(action_data, token, triggered_ns, points)
+        finally:
+            with self._queue_cond:
+                self._active_token = None
+        return token
+
+    def _run_action(self, action_data, token, triggered_ns=None, points=None, backend=None):
+        """Execute one action. Every wait wakes immediately when ``token`` is set.
+
+        ``planned`` tracks when each click was meant to happen: the trigger
+        time for the first click, then the previous plan plus the fixed
+        delay (or the moment an adaptive wait was satisfied). ``points``
+        overrides the action's own coordinates (a selected ladder row).
+        Actions with a recorded macro replay it instead of the points, and
+        action groups play their merged timeline.
+        ``backend`` replaces the real input backend (message delivery);
+        cancel-on-move only applies when the real cursor is used.
+        """
+        trace_reset = None
+        started = False
+        backend = backend or self.backend
+        watch_mouse = self.cancel_on_mouse_move and backend is self.backend
+        try:
+            macro = None
+            timeline = action_data.get('timeline')
+            if points is None:
+                macro = macro_of(action_data)
+                points = coords_of(action_data)
+            
+            origin = self._resolve_window(action_data, action_data.get('name', 'Action'))
+            if origin is None:
+                return
+            if origin != (0, 0):
+                # Anchored coords are stored relative to the window's top-left corner
+                points = points.translated(origin[0], origin[1])
+            xy = points.xy
+            window = action_data.get('window')
+            focus_only = bool(window) and action_data.get('focus_only', False)
+            priority = action_data.get('priority', PRIORITY_NORMAL)
+            
+            total = len(points)
+            delay_ms = action_data.get('delay_ms', 100)
+            name = action_data.get('name', 'Action')
+            # Fixed waits sleep delay_ms; Change/Match poll the screen with delay_ms as timeout
+            wait_mode = action_data.get('wait_mode', 'Fixed').lower()
+            wait_fallback = action_data.get('wait_fallback', 'click').lower()
+            
+            # The worker and every lane run executions, so ids are handed out under the lock
+            with self._queue_cond:
+                self._execution_id += 1
+                execution_id = self._execution_id
+            trace = (execution_id, name)
+            # Log records from here on carry the same id as this execution's journal entries
+            trace_reset = trace_id.set(execution_id)
+            log.debug("Execution started: %s, %d coords, wait %s", name, total, wait_mode)
+            planned = triggered_ns if triggered_ns is not None else self.clock.now_ns()
+            
+            # Store initial mouse position
+            if watch_mouse:
+                self._arm_mouse_move()
+            
+            # Notify execution start
+            self.stats["executions"] += 1
+            started = True
+            if self.execution_start_callback:
+                self.execution_start_callback()
+            
+            if timeline is not None:
+                clicks = self._play_group(name, timeline, token, trace, triggered_ns, backend, watch_mouse,
+                                          priority)
+                if not token.is_set():
+                    log.info("Group finished: %s (%d clicks)", name, clicks)
+                    if self.status_callback:
+                        self.status_callback(f"Done: {name} ({clicks} clicks)")
+                return
+            
+            if macro is not None:
+                if origin != (0, 0):
+                    macro = macro.translated(origin[0], origin[1])
+                scale = action_data.get('time_scale', 1.0)
+                scale = scale if scale and scale > 0 else 1.0
+                if self.status_callback:
+                    self.status_callback(f"{name}: ⏺ {len(macro)} events at {scale:g}x")
+                events = ((int(t_us * 1000 / scale), kind, x, y, arg, window, backend)
+                          for t_us, kind, x, y, arg in macro.events())
+                clicks = self._play_events(events, macro.keys, token, trace, triggered_ns, watch_mouse, priority)
+                if not token.is_set():
+                    log.info("Macro finished: %s (%d clicks)", name, clicks)
+                    if self.status_callback:
+                        self.status_callback(f"Done: {name} ({clicks} clicks)")
+                return
+            
+            if self.status_callback:
+                if total > 1:
+                    self.status_callback(f"{name}: {total} clicks, {delay_ms}ms delay")
+                else:
+                    self.status_callback(f"Executing: {name}")
+            
+            for i in range(total):
+                x = xy[2 * i]
+                y = xy[2 * i + 1]
+                # Check if cancelled due to mouse movement
+                if watch_mouse and self._check_mouse_moved():
+                    self._cancel(token, "⚠️ Cancelled: Mouse moved")
+                    break
                 
-                total = len(coords)
-                delay_ms = action_data.get('delay_ms', 100)
-                name = action_data.get('name', 'Action')
+                # Focus may have moved to another app during the delay
+                if focus_only and self.window_tracker.foreground != window:
+                    self._cancel(token, f"⚠️ Cancelled: {name} lost focus")
+                    break
                 
-                # Reset cancellation state and store initial mouse position
-                self._execution_cancelled = False
-                if self.cancel_on_mouse_move:
-                    self._initial_mouse_pos = self._get_mouse_pos()
+                if token.is_set():
+                    break
                 
-                # Notify execution start
-                if self.execution_start_callback:
-                    self.execution_start_callback()
+                if self.status_callback and total > 1:
+                    self.status_callback(f"{name}: Click {i+1}/{total} @ {x},{y}")
                 
-                if self.status_callback:
-                    if total > 1:
-                        self.status_callback(f"{name}: {total} clicks, {delay_ms}ms delay")
-                    else:
-                        self.status_callback(f"Executing: {name}")
+                # Show visual indicator at click position
+                if self.click_indicator_callback:
+                    self.click_indicator_callback(x, y)
                 
-                for i, coord in enumerate(coords):
-                    # Check if cancelled due to mouse movement
-                    if self._check_mouse_moved():
-                        self._execution_cancelled = True
-                        if self.status_callback:
-                            self.status_callback(f"⚠️ Cancelled: Mouse moved")
+                if not self.click(
+                    x, 
+                    y, 
+                    action_data.get('button', 'left'), 
+                    action_data.get('mode', 'single').lower(), 
+                    action_data.get('burst_count', 3),
+                    token,
+                    trace,
+                    planned,
+                    triggered_ns if i == 0 else None,
+                    backend,
+                    window,
+                    priority
+                ):
+                    break
+                
+                # Update mouse position tracking after click
+                if watch_mouse:
+                    self._arm_mouse_move()
+                
+                # Sample GIL contention after the click, never in front of one
+                self.gil_stats.probe("performance" if self.performance_mode else "normal")
+                
+                if i < total - 1 and wait_mode in ('change', 'match'):
+                    next_x, next_y = xy[2 * i + 2], xy[2 * i + 3]
+                    next_ref = points.ref(i + 1)
+                    baseline = None
+                    if wait_mode == 'change' or next_ref is None:
+                        baseline = self._get_screen_waiter().snapshot(next_x, next_y)
+                    if not self._wait_for_screen(name, next_x, next_y, next_ref, baseline, wait_mode,
+                                                 delay_ms, wait_fallback, i, total, token):
                         break
+                    planned = self.clock.now_ns()
+                elif i < total - 1:  # Don't delay after last click
+                    # Countdown timer with status updates
+                    remaining_ms = delay_ms
+                    update_interval = 100  # Update every 100ms
                     
-                    if self.status_callback and total > 1:
-                        self.status_callback(f"{name}: Click {i+1}/{total} @ {coord['x']},{coord['y']}")
-                    
-                    # Show visual indicator at click position
-                    if self.click_indicator_callback:
-                        self.click_indicator_callback(coord['x'], coord['y'])
-                    
-                    self.click(
-                        coord['x'], 
-                        coord['y'], 
-                        action_data.get('button', 'left'), 
-                        action_data.get('mode', 'single').lower(), 
-                        action_data.get('burst_count', 3)
-                    )
-                    
-                    # Update mouse position tracking after click
-                    if self.cancel_on_mouse_move:
-                        self._initial_mouse_pos = self._get_mouse_pos()
-                    
-                    if i < total - 1:  # Don't delay after last click
-                        # Countdown timer with status updates
-                        remaining_ms = delay_ms
-                        update_interval = 100  # Update every 100ms
+                    while remaining_ms > 0:
+                        # Check for mouse movement during delay
+                        if watch_mouse and self._check_mouse_moved():
+                            self._cancel(token, "⚠️ Cancelled: Mouse moved")
+                            break
                         
-                        while remaining_ms > 0:
-                            # Check for mouse movement during delay
-                            if self._check_mouse_moved():
-                                self._execution_cancelled = True
-                                if self.status_callback:
-                                    self.status_callback(f"⚠️ Cancelled: Mouse moved")
-                                break
-                            
-                            if self.status_callback:
-                                # Format remaining time nicely
-                                if remaining_ms >= 1000:
-                                    time_str = f"{remaining_ms/1000:.1f}s"
-                                else:
-                                    time_str = f"{remaining_ms}ms"
-                                self.status_callback(f"{name}: ⏱ {time_str} → Click {i+2}/{total}")
-                            
-                            sleep_time = min(update_interval, remaining_ms)
-                            time.sleep(sleep_time / 1000.0)
-                            remaining_ms -= sleep_time
+                        if self.status_callback:
+                            # Format remaining time nicely
+                            if remaining_ms >= 1000:
+                                time_str = f"{remaining_ms/1000:.1f}s"
+                            else:
+                                time_str = f"{remaining_ms}ms"
+                            self.status_callback(f"{name}: ⏱ {time_str} → Click {i+2}/{total}")
                         
-                        # Break outer loop if cancelled
-                        if self._execution_cancelled:
+                        sleep_time = min(update_interval, remaining_ms)
+                        # Event wait instead of sleep: the kill switch wakes it immediately
+                        if self.clock.wait(token, sleep_time / 1000.0):
                             break
-                
-                if not self._execution_cancelled and self.status_callback:
+                        remaining_ms -= sleep_time
+                    
+                    # Break outer loop if cancelled
+                    if token.is_set():
+                        break
+                    planned += delay_ms * 1_000_000
+            
+            if not token.is_set():
+                log.info("Execution finished: %s (%d clicks)", name, total)
+                if self.status_callback:
                     self.status_callback(f"Done: {name} ({total} clicks)")
-            finally:
-                # Notify execution end - ALWAYS call this to clean up UI indicators
-                if self.execution_end_callback:
-                    self.execution_end_callback()
+        finally:
+            if trace_reset is not None:
+                trace_id.reset(trace_reset)
+            # Notify execution end - always once the start was notified, to clean up UI indicators
+            if started and self.execution_end_callback:
+                self.execution_end_callback()
+
+    def _play_group(self, name, timeline, token, trace, triggered_ns, backend, watch_mouse, priority):
+        """Play an action group's merged timeline in one pass under one token.
+
+        Anchored members are resolved once, up front; a member whose window
+        is missing (or not focused, with focus_only) is left out and the
+        rest of the group still plays. Members with message delivery click
+        their own window without the cursor; the rest use ``backend``.
+        Returns the number of clicks made.
+        """
+        origins = [self._resolve_window({'window': window, 'focus_only': focus_only}, member)
+                   for member, window, focus_only, _ in timeline.members]
+        if self.status_callback:
+            self.status_callback(f"{name}: ⧉ {timeline.summary()}")
+        windows = [window for _, window, _, _ in timeline.members]
+        messages = {}
+        routes = []
+        for _, window, _, delivery in timeline.members:
+            if self.message_backend is not None and window and delivery == 'message':
+                if window not in messages:
+                    messages[window] = WindowMessageInput(self.message_backend, window)
+                routes.append(messages[window])
+            else:
+                routes.append(backend)
+        events = ((t_ns, kind, x + origins[m][0], y + origins[m][1], arg, windows[m], routes[m])
+                  for t_ns, m, kind, x, y, arg in timeline.events() if origins[m] is not None)
+        return self._play_events(events, timeline.keys, token, trace, triggered_ns, watch_mouse, priority)
+
+    def _play_events(self, events, keys, token, trace, triggered_ns, watch_mouse, priority=PRIORITY_NORMAL):
+        """Inject a time-sorted event stream (macros and action groups).
+
+        ``events`` yields ``(t_ns, kind, x, y, arg, target, backend)`` with
+        times relative to the trigger; ``backend`` is where the event is
+        injected. Each event is waited for on the cancel token, so a kill
+        stops it between events. Button presses go through the governor
+        with their target window. A button still held when playback stops
+        is always released.
+        Returns the number of clicks made.
+        """
+        start = triggered_ns if triggered_ns is not None else self.clock.now_ns()
+        journal = self.journal
+        governor = self.governor
+        held = []
+        clicks = 0
+        try:
+            for t_ns, kind, x, y, arg, target, backend in events:
+                planned = start + t_ns
+                remaining = planned - self.clock.now_ns()
+                if remaining > 0 and self.clock.wait(token, remaining / 1e9):
+                    break
+                if watch_mouse and self._check_mouse_moved():
+                    self._cancel(token, "⚠️ Cancelled: Mouse moved")
+                    break
+                if kind == KEY:
+                    if not self._inject(token, backend.send_hotkey, keys[arg]):
+                        break
+                    continue
+                if kind == BUTTON_UP and (backend, BUTTONS[arg]) not in held:
+                    continue  # Its press was not recorded (held when recording started): releasing would misclick
+                if kind == BUTTON_DOWN and governor is not None and not governor.acquire(token, target, priority):
+                    break
+                if kind not in (BUTTON_DOWN, BUTTON_UP):
+                    if not self._inject(token, backend.move, x, y):
+                        break
+                else:
+                    button = BUTTONS[arg]
+                    down = kind == BUTTON_DOWN
+                    if not self._inject(token, self._button_at, backend, x, y, button, down):
+                        break
+                    if down:
+                        held.append((backend, button))
+                        actual = self._last_injection_ns
+                        if clicks == 0 and triggered_ns is not None:
+                            self.latency.record(actual - triggered_ns)
+                        clicks += 1
+                        self.stats["clicks"] += 1
+                        if journal is not None:
+                            journal.record(trace[0], trace[1], x, y, button, planned, actual, time.time_ns())
+                        if self.click_indicator_callback:
+                            self.click_indicator_callback(x, y)
+                    else:
+                        held.remove((backend, button))
+                if watch_mouse:
+                    self._arm_mouse_move()
+        finally:
+            for backend, button in held:
+                self._release(token, backend, button)
+        return clicks
+
+    def register_hotkey(self, key_combo: str, data_getter, profile: Optional[str] = None):
+        """Register a hotkey to trigger an action.
+        
+        Args:
+            key_combo: The hotkey combination string (e.g., 'ctrl+shift+a')
+            data_getter: A callable that returns the current action data dict.
+                        This allows reading fresh settings (like delay_ms) 
+                        at execution time, not registration time.
+            profile: Profile whose table gets the hotkey (default: the active one)
+        """
+        table = self.profile_tables.setdefault(profile or self.active_profile, {})
+        table[key_combo] = data_getter
+        return self._hook_combo(key_combo)
+
+    def _hook_combo(self, key_combo: str):
+        """Hook a combo once; its callback dispatches through the active profile table."""
+        if key_combo in self.hotkeys:
+            return True
+        
+        def on_triggered():
+            # Only queue the execution; running it here would block the keyboard hook
+            started = time.perf_counter_ns()
+            data_getter = self._active_table.get(key_combo)
+            if data_getter is not None:
+                self.trigger(data_getter)
+            self.hook_time.record(time.perf_counter_ns() - started)
         
         try:
-            keyboard.add_hotkey(key_combo, on_triggered)
+            self.backend.add_hotkey(key_combo, on_triggered)
             self.hotkeys[key_combo] = on_triggered
             return True
         except Exception as e:
-            print(f"Failed to register hotkey {key_combo}: {e}")
+            self._record_error("Failed to register hotkey %s: %s", key_combo, e)
             return False
 
+    def set_profile_tables(self, tables, active: Optional[str] = None):
+        """Install every profile's hotkey table at once.
+
+        ``tables`` maps profile -> {combo: data_getter}. Only the difference
+        to the currently hooked combos is (un)registered, so rebuilding the
+        tables after an edit does not drop and re-add every hook.
+        """
+        tables = {name: dict(table) for name, table in tables.items()} or {DEFAULT_PROFILE: {}}
+        wanted = set().union(*tables.values())
+        for key_combo in [c for c in self.hotkeys if c not in wanted]:
+            try:
+                self.backend.remove_hotkey(key_combo)
+            except (KeyError, ValueError):
+                pass
+            del self.hotkeys[key_combo]
+        for key_combo in wanted:
+            self._hook_combo(key_combo)
+        if active not in tables:
+            active = self.active_profile if self.active_profile in tables else next(iter(tables))
+        self.profile_tables = tables
+        self.active_profile = active
+        self._active_table = tables[active]
+
+    def switch_profile(self, name: str) -> bool:
+        """Make ``name`` the active profile: one table swap, no hook changes."""
+        started = time.perf_counter_ns()
+        table = self.profile_tables.get(name)
+        if table is None:
+            log.warning("Unknown profile: %s", name)
+            return False
+        self._active_table = table
+        self.active_profile = name
+        elapsed = time.perf_counter_ns() - started
+        self.profile_switch_time.record(elapsed)
+        log.info("Switched to profile %s in %d ns", name, elapsed)
+        if self.profile_callback:
+            self.profile_callback(name, elapsed)
+        self._publish_stats()
+        return True
+
+    def set_profile_hotkeys(self, hotkeys):
+        """Register ``{combo: profile}`` switch hotkeys (kept across unregister_all)."""
+        for key_combo in self.profile_hotkeys:
+            try:
+                self.backend.remove_hotkey(key_combo)
+            except (KeyError, ValueError):
+                pass
+        self.profile_hotkeys = dict(hotkeys)
+        self._register_profile_hotkeys()
+
+    def _register_profile_hotkeys(self):
+        for key_combo, name in self.profile_hotkeys.items():
+            try:
+                self.backend.add_hotkey(key_combo, lambda name=name: self.switch_profile(name))
+            except Exception as e:
+                self._record_error("Failed to register profile hotkey %s: %s", key_combo, e)
+
+    def set_panic_hotkey(self, key_combo: Optional[str]):
+        """Register the global kill switch hotkey (kept across unregister_all)."""
+        if self.panic_hotkey:
+            try:
+                self.backend.remove_hotkey(self.panic_hotkey)
+            except (KeyError, ValueError):
+                pass
+        self.panic_hotkey = key_combo
+        return self._register_panic_hotkey()
+
+    def _register_panic_hotkey(self):
+        if not self.panic_hotkey:
+            return False
+        try:
+            self.backend.add_hotkey(self.panic_hotkey, self.cancel_all)
+            return True
+        except Exception as e:
+            self._record_error("Failed to register panic hotkey %s: %s", self.panic_hotkey, e)
+            return False
+
+    def reinstall_hotkeys(self):
+        """Re-register every hotkey from the registry, e.g. after the hooks were lost."""
+        self.backend.clear_hotkeys()
+        for key_combo, callback in list(self.hotkeys.items()):
+            try:
+                self.backend.add_hotkey(key_combo, callback)
+            except Exception as e:
+                self._record_error("Failed to re-register hotkey %s: %s", key_combo, e)
+        self._register_panic_hotkey()
+        self._register_profile_hotkeys()
+        if self._row_keys_hooked:
+            self._row_keys_hooked = False
+            self._hook_row_keys()
+
+    def set_hook_health(self, state: int, message: Optional[str] = None):
+        """Record the hook watchdog's verdict (HOOK_* state) for the stats surface."""
+        self.hook_health = state
+        if message:
+            self._record_error(message)
+        else:
+            self._publish_stats()
+
     def unregister_all(self):
-        keyboard.unhook_all()
+        self.backend.clear_hotkeys()
         self.hotkeys.clear()
+        self._row_keys_hooked = False
+        # Profiles stay known (and switchable) with empty tables
+        self.profile_tables = {name: {} for name in self.profile_tables}
+        self._active_table = self.profile_tables[self.active_profile]
+        # The kill switch must stay armed even while paused
+        self._register_panic_hotkey()
+        self._register_profile_hotkeys()
 
     def start_listening(self):
-        # keyboard library listens in background automatically once hooks are added
+        # Backends start listening when the first hotkey is added
         pass
 
     def stop_listening(self):
-        self.unregister_all()
+        self.cancel_all()
+        self.backend.clear_hotkeys()
+        self.hotkeys.clear()
+        self._row_keys_hooked = False
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self.stats_block:
+            self.stats_block.close()
+            self.stats_block = None
@@ -0,0 +1,93 @@
+import gc
+import threading
+import time
+from typing import Dict
+
+from histogram import LatencyHistogram
+
+
+class GcGuard:
+    """Keeps cyclic garbage collection pauses out of click sequences.
+
+    Pause times are always recorded through ``gc.callbacks``, split into
+    pauses that hit an execution and pauses outside one, so the effect on
+    trigger latency can be compared with the mode on and off.
+
+    With ``enabled``: freeze() moves everything alive after startup into
+    the permanent generation (gc.freeze), automatic collection is disabled
+    while any execution is in flight, and the deferred work is done by
+    collect_if_idle() once executions have been quiet for ``idle_ms``.
+    """
+
+    def __init__(self, enabled: bool = False, idle_ms: int = 250):
+        self.enabled = enabled
+        self.idle_ns = idle_ms * 1_000_000
+        self.pauses = {"execution": LatencyHistogram(), "idle": LatencyHistogram()}
+        self.deferred = 0       # Executions that ran with collection disabled
+        self.idle_collections = 0
+        self.frozen = 0
+        self._active = 0
+        self._last_end_ns = 0
+        self._collect_pending = False
+        self._gc_started_ns = 0
+        self._lock = threading.Lock()
+        gc.callbacks.append(self._on_gc)
+
+    def close(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if not gc.isenabled():
+            gc.enable()
+
+    def _on_gc(self, phase, info):
+        if phase == "start":
+            self._gc_started_ns = time.perf_counter_ns()
+        elif self._gc_started_ns:
+            pause = time.perf_counter_ns() - self._gc_started_ns
+            self.pauses["execution" if self._active else "idle"].record(pause)
+            self._gc_started_ns = 0
+
+    def freeze(self):
+        """Collect once, then exempt all surviving (long-lived) objects from future scans."""
+        if not self.enabled:
+            return
+        gc.collect()
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+
+    def begin_execution(self):
+        with self._lock:
+            self._active += 1
+            if self.enabled and self._active == 1 and gc.isenabled():
+                gc.disable()
+                self.deferred += 1
+
+    def end_execution(self):
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._last_end_ns = time.perf_counter_ns()
+                if self.enabled:
+                    self._collect_pending = True
+                    gc.enable()
+
+    def collect_if_idle(self) -> bool:
+        """Run the deferred collection if no execution ran for ``idle_ms``."""
+        with self._lock:
+            if (not self._collect_pending or self._active
+                    or time.perf_counter_ns() - self._last_end_ns < self.idle_ns):
+                return False
+            self._collect_pending = False
+        gc.collect()
+        self.idle_collections += 1
+        return True
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "frozen": self.frozen,
+            "deferred": self.deferred,
+            "idle_collections": self.idle_collections,
+            "pause_in_execution": self.pauses["execution"].summary(),
+            "pause_idle": self.pauses["idle"].summary(),
+        }
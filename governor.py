@@ -0,0 +1,137 @@
+import threading
+from typing import Dict, Optional
+
+from clock import Clock, RealClock
+from histogram import LatencyHistogram
+
+PRIORITY_NORMAL = "normal"
+PRIORITY_HIGH = "high"
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``capacity``.
+
+    The balance may go negative when a high-priority click is let through
+    without a token; the clicks after it pay that debt off.
+    """
+
+    def __init__(self, rate: float, capacity: float, now_ns: int):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = self.capacity
+        self.updated_ns = now_ns
+
+    def _refill(self, now_ns: int):
+        elapsed = now_ns - self.updated_ns
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate / 1e9)
+            self.updated_ns = now_ns
+
+    def wait_ns(self, now_ns: int) -> int:
+        """How long until a whole token is available (0 = now)."""
+        self._refill(now_ns)
+        if self.tokens >= 1:
+            return 0
+        return int((1 - self.tokens) * 1e9 / self.rate) + 1
+
+    def take(self, now_ns: int):
+        self._refill(now_ns)
+        self.tokens -= 1
+
+
+class InjectionGovernor:
+    """Global click-rate limit applied before every injected click.
+
+    Two shared buckets shape the stream: one refills at ``sustained_cps``
+    clicks per second and holds up to ``peak_cps`` clicks (how long a burst
+    may last), the other refills at ``peak_cps`` and holds one (how close
+    together clicks may be within a burst). Either rate may be 0 for no
+    limit. ``per_target`` adds a bucket per window key, for targets slower
+    than the global limit. Normal clicks wait on their
+    cancel token, so the kill switch still wakes them at once, until every
+    bucket they pass has a token. High-priority clicks never wait: they
+    take their tokens immediately, going into debt if needed, so they pass
+    any queued normal-priority burst.
+    """
+
+    def __init__(self, sustained_cps: float = 0, peak_cps: float = 0,
+                 per_target: Optional[Dict[Optional[str], float]] = None, clock: Optional[Clock] = None):
+        self.clock = clock or RealClock()
+        now = self.clock.now_ns()
+        self.global_buckets = []
+        if sustained_cps > 0:
+            self.global_buckets.append(TokenBucket(sustained_cps, max(peak_cps, sustained_cps, 1), now))
+        if peak_cps > 0 and (sustained_cps <= 0 or peak_cps > sustained_cps):
+            self.global_buckets.append(TokenBucket(peak_cps, 1, now))
+        self.target_buckets = {
+            target: TokenBucket(cps, 1, now) for target, cps in (per_target or {}).items() if cps > 0
+        }
+        self.delay = LatencyHistogram()  # Wait of every throttled click
+        self.passed = 0
+        self.throttled = 0
+        self.bypassed = 0  # High-priority clicks sent while the buckets were empty
+        self.cancelled = 0  # Throttled clicks whose execution was cancelled while waiting
+        self.throttled_by_target: Dict[Optional[str], int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, options: Optional[dict], clock: Optional[Clock] = None) -> Optional["InjectionGovernor"]:
+        """Build from the config's "governor" section; None when no limit is set."""
+        options = options or {}
+        sustained = float(options.get("sustained_cps", 0) or 0)
+        peak = float(options.get("peak_cps", 0) or 0)
+        per_target = {target: float(cps) for target, cps in (options.get("per_target") or {}).items()}
+        if sustained <= 0 and peak <= 0 and not any(cps > 0 for cps in per_target.values()):
+            return None
+        return cls(sustained, peak, per_target, clock)
+
+    def acquire(self, token: Optional[threading.Event], target: Optional[str] = None,
+                priority: str = PRIORITY_NORMAL) -> bool:
+        """Block until a click to ``target`` may be injected.
+
+        Returns False if ``token`` was set while waiting (the click must
+        not be injected).
+        """
+        buckets = self.global_buckets
+        if target in self.target_buckets:
+            buckets = buckets + [self.target_buckets[target]]
+        if not buckets:
+            return True
+        started = None
+        while True:
+            with self._lock:
+                now = self.clock.now_ns()
+                wait = max(bucket.wait_ns(now) for bucket in buckets)
+                if wait == 0 or priority == PRIORITY_HIGH:
+                    for bucket in buckets:
+                        bucket.take(now)
+                    self.passed += 1
+                    if wait and priority == PRIORITY_HIGH:
+                        self.bypassed += 1
+                    if started is not None:
+                        self.delay.record(now - started)
+                    return True
+                if started is None:
+                    started = now
+                    self.throttled += 1
+                    self.throttled_by_target[target] = self.throttled_by_target.get(target, 0) + 1
+            if token is None:
+                self.clock.sleep(wait / 1e9)
+            elif self.clock.wait(token, wait / 1e9):
+                with self._lock:
+                    self.cancelled += 1
+                    self.delay.record(self.clock.now_ns() - started)
+                return False
+
+    def summary(self) -> Dict[str, object]:
+        delay = self.delay.summary()
+        return {
+            "passed": self.passed,
+            "throttled": self.throttled,
+            "bypassed": self.bypassed,
+            "cancelled": self.cancelled,
+            "delay_p50_ns": delay["p50_ns"],
+            "delay_p99_ns": delay["p99_ns"],
+            "delay_max_ns": delay["max_ns"],
+            "throttled_by_target": {k or "screen": v for k, v in self.throttled_by_target.items()},
+        }
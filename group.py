@@ -0,0 +1,148 @@
+import heapq
+from array import array
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from coord_buffer import coords_of, from_le_bytes, to_le_bytes
+from macro import BUTTONS, BUTTON_DOWN, BUTTON_UP, KEY, macro_of
+
+# Spacing of the presses of a double/burst click, as in Executor.click()
+SUB_CLICK_NS = 10_000_000
+
+Event = Tuple[int, int, int, int, int, int]  # t_ns, member, kind, x, y, arg
+
+
+def group_of(action_data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """Normalized group members ({"action", "offset_ms"}), or None for a plain action."""
+    members = action_data.get("group")
+    if not members:
+        return None
+    return [{"action": str(m["action"]), "offset_ms": max(0, int(m.get("offset_ms", 0)))} for m in members]
+
+
+def parse_group_spec(text: str) -> List[Dict[str, Any]]:
+    """Members from "Cancel all@0, Requote@150" (offset in ms, default 0)."""
+    members = []
+    for part in text.split(","):
+        name, _, offset = part.strip().rpartition("@")
+        if not name:
+            name, offset = offset, "0"
+        name = name.strip()
+        if name:
+            members.append({"action": name, "offset_ms": int(offset.strip() or 0)})
+    return members
+
+
+def format_group_spec(members: List[Dict[str, Any]]) -> str:
+    return ", ".join(f"{m['action']}@{m.get('offset_ms', 0)}" for m in members)
+
+
+def member_events(member: int, plan: Dict[str, Any], offset_ns: int, key_base: int = 0) -> Iterator[Event]:
+    """One compiled action's steps as a time-sorted event stream starting at ``offset_ns``.
+
+    Points are pressed and released on the schedule Executor.click()
+    keeps: a double/burst click takes SUB_CLICK_NS per press (including a
+    pause after the last one) before the next point's delay starts (Change
+    and Match waits use their timeout as the delay, since a merged timeline
+    cannot wait on the screen); macros keep their own timing. Ladders click
+    their first row. KEY arguments are shifted by ``key_base`` into the
+    group's key list.
+    """
+    macro = plan.get("macro") or macro_of(plan)
+    if macro is not None:
+        scale = plan.get("time_scale") or 1.0
+        for t_us, kind, x, y, arg in macro.events():
+            yield offset_ns + int(t_us * 1000 / scale), member, kind, x, y, arg + key_base if kind == KEY else arg
+        return
+    button = BUTTONS.index(plan.get("button", "left")) if plan.get("button", "left") in BUTTONS else 0
+    mode = plan.get("mode", "single")
+    presses = 2 if mode == "double" else int(plan.get("burst_count", 3)) if mode == "burst" else 1
+    delay_ns = int(plan.get("delay_ms", 100)) * 1_000_000
+    point_ns = (presses * SUB_CLICK_NS if presses > 1 else 0) + delay_ns  # One point to the next
+    xy = (plan.get("coords") or coords_of(plan)).xy
+    for i in range(len(xy) // 2):
+        x, y = xy[2 * i], xy[2 * i + 1]
+        for n in range(presses):
+            t = offset_ns + i * point_ns + n * SUB_CLICK_NS
+            yield t, member, BUTTON_DOWN, x, y, button
+            yield t, member, BUTTON_UP, x, y, button
+
+
+class Timeline:
+    """An action group's steps merged into one time-sorted event stream.
+
+    Parallel flat arrays, one entry per event: time from the trigger in ns,
+    member index, kind (macro event kinds), x, y (in ``xy``) and argument
+    (a BUTTONS index or an index into ``keys``). ``members`` holds each
+    member's (name, window, focus_only, delivery); coordinates of anchored
+    members stay window-relative until the group fires.
+    """
+
+    def __init__(self, members: Optional[List[Tuple[str, Optional[str], bool, str]]] = None,
+                 keys: Optional[List[str]] = None):
+        self.members = list(members or [])
+        self.keys = list(keys or [])
+        self.t_ns = array("q")
+        self.member = array("H")
+        self.kind = array("B")
+        self.xy = array("i")
+        self.arg = array("H")
+
+    @classmethod
+    def merge(cls, members: List[Tuple[Dict[str, Any], int]]) -> "Timeline":
+        """K-way merge of compiled member plans, each started ``offset_ms`` after the trigger.
+
+        Every member's stream is already sorted, so heapq.merge produces the
+        combined order in one pass; ties keep member order.
+        """
+        timeline = cls()
+        streams = []
+        for index, (plan, offset_ms) in enumerate(members):
+            timeline.members.append((plan.get("name", "Action"), plan.get("window"), bool(plan.get("focus_only")),
+                                     plan.get("delivery", "cursor")))
+            macro = plan.get("macro") or macro_of(plan)
+            streams.append(member_events(index, plan, offset_ms * 1_000_000, len(timeline.keys)))
+            if macro is not None:
+                timeline.keys.extend(macro.keys)
+        for event in heapq.merge(*streams, key=itemgetter(0)):
+            timeline.append(*event)
+        return timeline
+
+    def append(self, t_ns: int, member: int, kind: int, x: int, y: int, arg: int):
+        self.t_ns.append(t_ns)
+        self.member.append(member)
+        self.kind.append(kind)
+        self.xy.append(x)
+        self.xy.append(y)
+        self.arg.append(arg)
+
+    def __len__(self) -> int:
+        return len(self.t_ns)
+
+    def events(self) -> Iterator[Event]:
+        t_ns, member, kind, xy, arg = self.t_ns, self.member, self.kind, self.xy, self.arg
+        for i in range(len(t_ns)):
+            yield t_ns[i], member[i], kind[i], xy[2 * i], xy[2 * i + 1], arg[i]
+
+    @property
+    def duration_ns(self) -> int:
+        return self.t_ns[-1] if self.t_ns else 0
+
+    def summary(self) -> str:
+        clicks = sum(1 for kind in self.kind if kind == BUTTON_DOWN)
+        return f"{len(self.members)} actions · {clicks} clicks · {self.duration_ns / 1e9:.2f}s"
+
+    def to_bytes(self) -> bytes:
+        """The event arrays, little-endian, one after the other (see from_bytes)."""
+        return b"".join(to_le_bytes(values) for values in (self.t_ns, self.member, self.kind, self.xy, self.arg))
+
+    @classmethod
+    def from_bytes(cls, data: bytes, count: int, members, keys) -> "Timeline":
+        timeline = cls(members, keys)
+        offset = 0
+        for name, typecode, length in (("t_ns", "q", count), ("member", "H", count), ("kind", "B", count),
+                                       ("xy", "i", 2 * count), ("arg", "H", count)):
+            size = length * array(typecode).itemsize
+            setattr(timeline, name, from_le_bytes(typecode, bytes(data[offset:offset + size])))
+            offset += size
+        return timeline
@@ -0,0 +1,78 @@
+import math
+from typing import Dict, List
+
+# Bucket upper bounds grow by ~19% (4 buckets per doubling) from 1 µs to ~1000 s
+_BASE_NS = 1000
+_STEPS_PER_DOUBLING = 4
+_BUCKETS = 4 * 30 + 1
+
+
+class LatencyHistogram:
+    """Fixed-size log-bucketed histogram of durations in nanoseconds.
+
+    record() is O(1) with no allocation, so it can be called on the
+    execution path; percentiles are resolved to a bucket upper bound.
+    """
+
+    def __init__(self):
+        self.counts: List[int] = [0] * _BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    @staticmethod
+    def _bucket(value_ns: int) -> int:
+        if value_ns <= _BASE_NS:
+            return 0
+        index = int(math.ceil(math.log2(value_ns / _BASE_NS) * _STEPS_PER_DOUBLING))
+        return min(index, _BUCKETS - 1)
+
+    @staticmethod
+    def bucket_bound(index: int) -> int:
+        return int(_BASE_NS * 2 ** (index / _STEPS_PER_DOUBLING))
+
+    def record(self, value_ns: int):
+        if value_ns < 0:
+            value_ns = 0
+        self.counts[self._bucket(value_ns)] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    def percentile(self, q: float) -> int:
+        """Upper bound (ns) of the bucket holding the q-th quantile (0..1)."""
+        if not self.count:
+            return 0
+        target = max(1, int(math.ceil(q * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return min(self.bucket_bound(index), self.max_ns)
+        return self.max_ns
+
+    def count_above(self, value_ns: int) -> int:
+        """Samples in buckets entirely above ``value_ns`` (a slight undercount)."""
+        first = self._bucket(value_ns) + 1
+        return sum(self.counts[first:])
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "count": self.count,
+            "mean_ns": self.total_ns // self.count if self.count else 0,
+            "p50_ns": self.percentile(0.50),
+            "p90_ns": self.percentile(0.90),
+            "p99_ns": self.percentile(0.99),
+            "max_ns": self.max_ns,
+        }
+
+    def buckets(self) -> List[tuple]:
+        """Non-empty buckets as (upper bound ns, count) pairs, for export."""
+        return [(self.bucket_bound(i), n) for i, n in enumerate(self.counts) if n]
+
+    def reset(self):
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
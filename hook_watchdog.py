@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from histogram import LatencyHistogram
+from stats_block import HOOK_DEAD, HOOK_DEGRADED, HOOK_OK, HOOK_UNKNOWN
+
+log = logging.getLogger(__name__)
+
+
+class HookWatchdog:
+    """Verifies the low-level hooks still deliver events and repairs them.
+
+    Windows silently removes a low-level hook whose callback overruns
+    LowLevelHooksTimeout. Every ``interval`` seconds the watchdog injects a
+    probe (InputBackend.send_probe) and waits for it to come back through
+    the hub's keyboard and mouse hooks. If it does not, ``reinstall()`` is
+    called to re-install the hooks and re-register every hotkey; a second
+    failed probe marks the hooks dead. Hook callbacks slower than
+    ``slow_ms`` (from the ``timings`` histograms) are reported too.
+
+    ``report(state, message)`` receives the HOOK_* state after every check
+    that changed it or found an incident.
+    """
+
+    def __init__(self, hub, reinstall: Callable[[], None], report: Callable[[int, Optional[str]], None],
+                 timings: Optional[Dict[str, LatencyHistogram]] = None, interval: float = 5.0,
+                 probe_timeout: float = 0.5, slow_ms: float = 200):
+        self.hub = hub
+        self.reinstall = reinstall
+        self.report = report
+        self.timings = timings if timings is not None else dict(hub.hook_time)
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.slow_ns = int(slow_ms * 1_000_000)
+        self.state = HOOK_UNKNOWN
+        self.incidents = deque(maxlen=50)  # (time_ns, message)
+        self.reinstalls = 0
+        self._slow_seen = {name: histogram.count_above(self.slow_ns) for name, histogram in self.timings.items()}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.probe_timeout * 2 + 1.0)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                log.exception("Hook watchdog check failed: %s", e)
+
+    def _probe(self) -> bool:
+        """Inject a probe and wait for both hooks to see it."""
+        before = dict(self.hub.event_counts)
+        self.hub.backend.send_probe()
+        deadline = time.perf_counter() + self.probe_timeout
+        while True:
+            counts = self.hub.event_counts
+            if all(counts[hook] > before[hook] for hook in before):
+                return True
+            if time.perf_counter() >= deadline:
+                return False
+            time.sleep(0.005)
+
+    def check(self) -> int:
+        """Run one probe/timing check now and return the resulting state."""
+        messages = []
+        for name, histogram in self.timings.items():
+            slow = histogram.count_above(self.slow_ns)
+            if slow > self._slow_seen[name]:
+                messages.append(f"{slow - self._slow_seen[name]} slow {name} hook callback(s), "
+                                f"max {histogram.max_ns / 1e6:.0f}ms")
+                self._slow_seen[name] = slow
+
+        if self._probe():
+            state = HOOK_DEGRADED if messages else HOOK_OK
+        else:
+            self.reinstalls += 1
+            try:
+                self.reinstall()
+            except Exception as e:
+                messages.append(f"Hook re-install raised: {e}")
+            if self._probe():
+                state = HOOK_DEGRADED
+                messages.append("Hooks stopped delivering events; re-installed")
+            else:
+                state = HOOK_DEAD
+                messages.append("Hooks stopped delivering events; re-install failed")
+
+        now = time.time_ns()
+        for message in messages:
+            self.incidents.append((now, message))
+            log.warning("Hook incident: %s", message)
+        if messages or state != self.state:
+            self.state = state
+            self.report(state, "; ".join(messages) or None)
+        return state
@@ -0,0 +1,502 @@
+import sys
+import time
+import ctypes
+import contextlib
+import logging
+import queue
+import threading
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# Ctypes definitions for low-level mouse input
+PUL = ctypes.POINTER(ctypes.c_ulong)
+class KeyBdInput(ctypes.Structure):
+    _fields_ = [("wVk", ctypes.c_ushort),
+                ("wScan", ctypes.c_ushort),
+                ("dwFlags", ctypes.c_ulong),
+                ("time", ctypes.c_ulong),
+                ("dwExtraInfo", PUL)]
+
+class HardwareInput(ctypes.Structure):
+    _fields_ = [("uMsg", ctypes.c_ulong),
+                ("wParamL", ctypes.c_ushort),
+                ("wParamH", ctypes.c_ushort)]
+
+class MouseInput(ctypes.Structure):
+    _fields_ = [("dx", ctypes.c_long),
+                ("dy", ctypes.c_long),
+                ("mouseData", ctypes.c_ulong),
+                ("dwFlags", ctypes.c_ulong),
+                ("time", ctypes.c_ulong),
+                ("dwExtraInfo", PUL)]
+
+class Input_I(ctypes.Union):
+    _fields_ = [("ki", KeyBdInput),
+                ("mi", MouseInput),
+                ("hi", HardwareInput)]
+
+class Input(ctypes.Structure):
+    _fields_ = [("type", ctypes.c_ulong),
+                ("ii", Input_I)]
+
+class KbdLLHookStruct(ctypes.Structure):
+    _fields_ = [("vkCode", ctypes.c_ulong),
+                ("scanCode", ctypes.c_ulong),
+                ("flags", ctypes.c_ulong),
+                ("time", ctypes.c_ulong),
+                ("dwExtraInfo", PUL)]
+
+
+# Virtual-key code -> key name as used in hotkey combos ("ctrl+shift+a"); other keys use GetKeyNameText
+VK_NAMES = {
+    0x08: "backspace", 0x09: "tab", 0x0D: "enter", 0x10: "shift", 0x11: "ctrl", 0x12: "alt",
+    0x13: "pause", 0x14: "caps lock", 0x1B: "esc", 0x20: "space", 0x21: "page up", 0x22: "page down",
+    0x23: "end", 0x24: "home", 0x25: "left", 0x26: "up", 0x27: "right", 0x28: "down",
+    0x2C: "print screen", 0x2D: "insert", 0x2E: "delete", 0x5B: "windows", 0x5C: "windows",
+    0x90: "num lock", 0x91: "scroll lock",
+    0xA0: "shift", 0xA1: "shift", 0xA2: "ctrl", 0xA3: "ctrl", 0xA4: "alt", 0xA5: "alt",
+    0xBA: ";", 0xBB: "=", 0xBC: ",", 0xBD: "-", 0xBE: ".", 0xBF: "/", 0xC0: "`",
+    0xDB: "[", 0xDC: "\\", 0xDD: "]", 0xDE: "'",
+}
+VK_NAMES.update({0x30 + i: str(i) for i in range(10)})
+VK_NAMES.update({0x41 + i: chr(ord("a") + i) for i in range(26)})
+VK_NAMES.update({0x70 + i: f"f{i + 1}" for i in range(24)})
+# Reverse direction for injection: the main keyboard's key wins over the numpad's
+_NAME_VKS = {}
+for _vk, _name in VK_NAMES.items():
+    _NAME_VKS.setdefault(_name, _vk)
+# Numpad keys share the main keys' names, so a hotkey on "1" fires from either
+VK_NAMES.update({0x60 + i: str(i) for i in range(10)})
+VK_NAMES.update({0x6A: "*", 0x6B: "plus", 0x6D: "-", 0x6E: ".", 0x6F: "/"})
+_NAME_VKS.setdefault("*", 0x6A)
+_NAME_VKS.setdefault("plus", 0x6B)
+
+
+def combo_keys(key_combo: str) -> FrozenSet[str]:
+    """The set of key names a combo holds down, e.g. "Ctrl+Shift+A" -> {ctrl, shift, a}."""
+    return frozenset(key.strip().lower() for key in key_combo.split("+") if key.strip())
+
+
+class InputBackend:
+    """Platform interface for input injection and global hotkeys.
+
+    The executor only talks to this interface, so it can run against the
+    real OS or against FakeInputBackend.
+    """
+
+    def move(self, x: int, y: int):
+        raise NotImplementedError
+
+    def button(self, button: str, down: bool):
+        raise NotImplementedError
+
+    def cursor_pos(self) -> Tuple[int, int]:
+        raise NotImplementedError
+
+    def add_hotkey(self, key_combo: str, callback: Callable[[], None],
+                   suppress: Optional[Callable[[], bool]] = None):
+        """Call ``callback()`` when the combo is pressed.
+
+        ``suppress`` (single keys only) is asked in the hook when the key
+        goes down; while it returns True the key is swallowed instead of
+        reaching the focused window. Backends that can only observe input
+        ignore it.
+        """
+        raise NotImplementedError
+
+    def remove_hotkey(self, key_combo: str):
+        raise NotImplementedError
+
+    def clear_hotkeys(self):
+        raise NotImplementedError
+
+    def install_hooks(self, on_key: Callable[[str, bool], None],
+                      on_move: Callable[[int, int, bool], None],
+                      on_click: Callable[[int, int, str, bool, bool], None]):
+        """Install the single keyboard hook and single mouse hook.
+
+        ``on_key(name, down)``, ``on_move(x, y, injected)`` and
+        ``on_click(x, y, button, pressed, injected)`` run on the hook threads
+        and must return quickly. Used by InputHub; hotkeys are unaffected.
+        """
+        raise NotImplementedError
+
+    def uninstall_hooks(self):
+        raise NotImplementedError
+
+    def send_hotkey(self, key_combo: str):
+        """Inject a key combo as if the user typed it (used by the self-test)."""
+        raise NotImplementedError
+
+    def send_probe(self):
+        """Inject a harmless key (F24) and a zero-distance mouse move.
+
+        Both must come back through the installed hooks; the hook watchdog
+        uses this to detect hooks the OS has silently removed.
+        """
+        raise NotImplementedError
+
+    def batch(self):
+        """Context manager grouping several injections into one write, where the platform can.
+
+        Backends without batching inject immediately, so the default does nothing.
+        """
+        return contextlib.nullcontext()
+
+
+class WindowsInputBackend(InputBackend):
+    """SendInput/SetCursorPos injection and an owned low-level keyboard hook.
+
+    The WH_KEYBOARD_LL hook lives on its own message-loop thread and only
+    queues each key; a second thread matches the held keys against the
+    registered hotkeys (like X11InputBackend) and feeds the hub, so the
+    hook callback returns well inside LowLevelHooksTimeout. Because the
+    backend owns the hook, uninstall_hooks() really removes it and the
+    next install creates a new one: the watchdog's re-install brings
+    hotkeys back after Windows silently dropped the hook. The mouse hook
+    is a pynput listener, re-created the same way.
+    """
+
+    MOUSEEVENTF_LEFTDOWN = 0x0002
+    MOUSEEVENTF_LEFTUP = 0x0004
+    MOUSEEVENTF_RIGHTDOWN = 0x0008
+    MOUSEEVENTF_RIGHTUP = 0x0010
+    MOUSEEVENTF_MOVE = 0x0001
+    KEYEVENTF_KEYUP = 0x0002
+    VK_F24 = 0x87
+    WH_KEYBOARD_LL = 13
+    HC_ACTION = 0
+    LLKHF_EXTENDED = 0x01
+    LLKHF_INJECTED = 0x10
+    LLKHF_UP = 0x80
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        import ctypes.wintypes
+        self._wintypes = ctypes.wintypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        LowLevelKeyboardProc = ctypes.WINFUNCTYPE(
+            self._wintypes.LPARAM, ctypes.c_int, self._wintypes.WPARAM, self._wintypes.LPARAM
+        )
+        self._user32.SetWindowsHookExW.argtypes = [ctypes.c_int, LowLevelKeyboardProc, ctypes.c_void_p,
+                                                   self._wintypes.DWORD]
+        self._user32.SetWindowsHookExW.restype = ctypes.c_void_p
+        self._user32.CallNextHookEx.argtypes = [ctypes.c_void_p, ctypes.c_int, self._wintypes.WPARAM,
+                                                self._wintypes.LPARAM]
+        self._user32.CallNextHookEx.restype = self._wintypes.LPARAM
+        self._user32.UnhookWindowsHookEx.argtypes = [ctypes.c_void_p]
+        self._kernel32.GetModuleHandleW.restype = ctypes.c_void_p
+        self._key_proc = LowLevelKeyboardProc(self._on_key_hook)  # Must outlive the hook
+        self.hotkeys = {}
+        self._combos = {}
+        self._suppress: Dict[int, Callable[[], bool]] = {}  # vk -> "swallow it now?", read by the hook
+        self._swallowed = set()  # vks whose down was swallowed, so their up is too
+        self._held = set()
+        self._hooks = None
+        self._key_events = queue.SimpleQueue()  # (vk, scan code, flags) from the hook thread
+        self._key_hook = None  # (hook thread id, thread) while the OS hook is installed
+        self._key_worker = None
+        self._mouse_listener = None
+        self._flags = {
+            ("left", True): self.MOUSEEVENTF_LEFTDOWN,
+            ("left", False): self.MOUSEEVENTF_LEFTUP,
+            ("right", True): self.MOUSEEVENTF_RIGHTDOWN,
+            ("right", False): self.MOUSEEVENTF_RIGHTUP,
+        }
+
+    def _send_input(self, flags, data=0, dx=0, dy=0):
+        """Send low-level mouse input via user32.dll"""
+        extra = ctypes.c_ulong(0)
+        ii_ = Input_I()
+        ii_.mi = MouseInput(dx, dy, data, flags, 0, ctypes.pointer(extra))
+        x = Input(ctypes.c_ulong(0), ii_)
+        self._user32.SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+
+    def _send_key(self, vk, flags):
+        extra = ctypes.c_ulong(0)
+        ii_ = Input_I()
+        ii_.ki = KeyBdInput(vk, 0, flags, 0, ctypes.pointer(extra))
+        x = Input(ctypes.c_ulong(1), ii_)
+        self._user32.SendInput(1, ctypes.pointer(x), ctypes.sizeof(x))
+
+    def move(self, x, y):
+        # SetCursorPos is faster than going through pynput
+        self._user32.SetCursorPos(x, y)
+
+    def button(self, button, down):
+        self._send_input(self._flags[(button if button == "right" else "left", down)])
+
+    def cursor_pos(self):
+        pt = self._wintypes.POINT()
+        self._user32.GetCursorPos(ctypes.byref(pt))
+        return (pt.x, pt.y)
+
+    # ----- hotkeys and hooks -----
+
+    def add_hotkey(self, key_combo, callback, suppress=None):
+        keys = combo_keys(key_combo)
+        self.hotkeys[key_combo] = callback
+        self._combos[keys] = callback
+        if suppress is not None and len(keys) == 1:
+            # Swapped, not mutated: the hook thread reads it without a lock
+            swallow = dict(self._suppress)
+            swallow.update({vk: suppress for vk, name in VK_NAMES.items() if frozenset((name,)) == keys})
+            self._suppress = swallow
+        self._start_keyboard_hook()
+
+    def remove_hotkey(self, key_combo):
+        del self.hotkeys[key_combo]
+        keys = combo_keys(key_combo)
+        self._combos.pop(keys, None)
+        self._suppress = {vk: predicate for vk, predicate in self._suppress.items()
+                          if frozenset((VK_NAMES[vk],)) != keys}
+
+    def clear_hotkeys(self):
+        # Only hotkeys: the hub's hooks stay installed
+        self.hotkeys.clear()
+        self._combos = {}
+        self._suppress = {}
+
+    def _start_keyboard_hook(self):
+        if self._key_hook is not None:
+            return
+        if self._key_worker is None:
+            self._key_worker = threading.Thread(target=self._process_keys, name="keyboard-events", daemon=True)
+            self._key_worker.start()
+        ready = threading.Event()
+        installed = []
+
+        def run():
+            user32 = self._user32
+            thread_id = self._kernel32.GetCurrentThreadId()
+            hook = user32.SetWindowsHookExW(self.WH_KEYBOARD_LL, self._key_proc,
+                                            self._kernel32.GetModuleHandleW(None), 0)
+            installed.append((thread_id, hook, ctypes.get_last_error() if not hook else 0))
+            ready.set()
+            if not hook:
+                return
+            # A low-level hook is called on the thread that installed it, while it pumps messages
+            msg = self._wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+            user32.UnhookWindowsHookEx(hook)
+
+        thread = threading.Thread(target=run, name="keyboard-hook", daemon=True)
+        thread.start()
+        ready.wait(1.0)
+        if not installed or not installed[0][1]:
+            raise OSError(f"SetWindowsHookEx(WH_KEYBOARD_LL) failed ({installed[0][2] if installed else 'timeout'})")
+        self._key_hook = (installed[0][0], thread)
+
+    def _stop_keyboard_hook(self):
+        if self._key_hook is None:
+            return
+        thread_id, thread = self._key_hook
+        self._key_hook = None
+        self._user32.PostThreadMessageW(thread_id, self.WM_QUIT, 0, 0)
+        thread.join(timeout=1.0)
+        self._held.clear()
+
+    def _on_key_hook(self, code, wparam, lparam):
+        """Hook thread: queue the key and return at once (1 swallows it)."""
+        if code == self.HC_ACTION:
+            info = ctypes.cast(lparam, ctypes.POINTER(KbdLLHookStruct)).contents
+            vk, flags = info.vkCode, info.flags
+            self._key_events.put((vk, info.scanCode, flags))
+            suppress = self._suppress.get(vk)
+            if suppress is not None and not flags & self.LLKHF_INJECTED:
+                if flags & self.LLKHF_UP:
+                    if vk in self._swallowed:
+                        self._swallowed.discard(vk)
+                        return 1
+                elif suppress():
+                    self._swallowed.add(vk)
+                    return 1
+        return self._user32.CallNextHookEx(None, code, wparam, lparam)
+
+    def _key_name(self, vk, scan_code, flags) -> str:
+        name = VK_NAMES.get(vk)
+        if name is None:
+            buf = ctypes.create_unicode_buffer(64)
+            extended = 1 << 24 if flags & self.LLKHF_EXTENDED else 0
+            if self._user32.GetKeyNameTextW((scan_code << 16) | extended, buf, 64):
+                name = buf.value.lower()
+        return name or f"vk {vk}"
+
+    def _process_keys(self):
+        while True:
+            vk, scan_code, flags = self._key_events.get()
+            try:
+                self._dispatch_key(self._key_name(vk, scan_code, flags), not flags & self.LLKHF_UP)
+            except Exception as e:
+                log.exception("Keyboard event dispatch failed: %s", e)
+
+    def _dispatch_key(self, name: str, down: bool):
+        hooks = self._hooks
+        if hooks:
+            hooks[0](name, down)
+        if not down:
+            self._held.discard(name)
+        elif name not in self._held:  # Auto-repeat does not re-fire a hotkey
+            self._held.add(name)
+            callback = self._combos.get(frozenset(self._held))
+            if callback is not None:
+                callback()
+
+    def install_hooks(self, on_key, on_move, on_click):
+        from pynput import mouse
+
+        self._hooks = (on_key, on_move, on_click)
+        self._start_keyboard_hook()
+
+        # Newer pynput passes ``injected``; older versions call with (x, y) only
+        def moved(x, y, injected=False):
+            on_move(int(x), int(y), injected)
+
+        def clicked(x, y, button, pressed, injected=False):
+            on_click(int(x), int(y), button.name, pressed, injected)
+
+        self._mouse_listener = mouse.Listener(on_move=moved, on_click=clicked)
+        self._mouse_listener.daemon = True
+        self._mouse_listener.start()
+
+    def _vk(self, name: str) -> int:
+        vk = _NAME_VKS.get(name)
+        if vk is None and len(name) == 1:
+            scanned = self._user32.VkKeyScanW(ord(name))
+            vk = scanned & 0xFF if scanned != -1 else None
+        if vk is None:
+            raise ValueError(f"Key '{name}' has no virtual-key code")
+        return vk
+
+    def send_hotkey(self, key_combo):
+        vks = [self._vk(key.strip().lower()) for key in key_combo.split("+") if key.strip()]
+        for vk in vks:
+            self._send_key(vk, 0)
+        for vk in reversed(vks):
+            self._send_key(vk, self.KEYEVENTF_KEYUP)
+
+    def send_probe(self):
+        self._send_key(self.VK_F24, 0)
+        self._send_key(self.VK_F24, self.KEYEVENTF_KEYUP)
+        self._send_input(self.MOUSEEVENTF_MOVE)
+
+    def uninstall_hooks(self):
+        self._hooks = None
+        if self._mouse_listener is not None:
+            self._mouse_listener.stop()
+            self._mouse_listener = None
+        # Always drop the OS hook, so a re-install creates a fresh one; hotkeys get it back at once
+        self._stop_keyboard_hook()
+        if self.hotkeys:
+            self._start_keyboard_hook()
+
+
+class FakeInputBackend(InputBackend):
+    """Records injected input in memory; hotkeys are fired with press().
+
+    ``events`` holds ``(timestamp_ns, kind, x, y, button, down)`` tuples
+    where kind is "move" or "button".
+    """
+
+    def __init__(self, clock=None):
+        self.events: List[tuple] = []
+        self.hotkeys = {}
+        self.suppress = {}  # combo -> predicate given to add_hotkey
+        self.typed: List[str] = []  # Combos pressed that reached the focused window
+        self.position = (0, 0)
+        self.hooks = None
+        self._now_ns = clock.now_ns if clock is not None else time.perf_counter_ns
+        self._lock = threading.Lock()
+
+    def move(self, x, y):
+        with self._lock:
+            self.position = (x, y)
+            self.events.append((self._now_ns(), "move", x, y, None, None))
+        if self.hooks:
+            self.hooks[1](x, y, True)
+
+    def button(self, button, down):
+        with self._lock:
+            x, y = self.position
+            self.events.append((self._now_ns(), "button", x, y, button, down))
+        # Injected clicks pass through the mouse hook, as on the real OS
+        if self.hooks:
+            self.hooks[2](x, y, button, down, True)
+
+    def cursor_pos(self):
+        return self.position
+
+    def add_hotkey(self, key_combo, callback, suppress=None):
+        self.hotkeys[key_combo] = callback
+        if suppress is not None:
+            self.suppress[key_combo] = suppress
+
+    def remove_hotkey(self, key_combo):
+        del self.hotkeys[key_combo]
+        self.suppress.pop(key_combo, None)
+
+    def clear_hotkeys(self):
+        self.hotkeys.clear()
+        self.suppress.clear()
+
+    def install_hooks(self, on_key, on_move, on_click):
+        self.hooks = (on_key, on_move, on_click)
+
+    def uninstall_hooks(self):
+        self.hooks = None
+
+    def send_hotkey(self, key_combo):
+        self.press(key_combo)
+
+    def send_probe(self):
+        # Tests simulate the OS dropping the hooks by setting ``hooks = None``
+        if self.hooks:
+            self.hooks[0]("f24", True)
+            self.hooks[0]("f24", False)
+            self.hooks[1](*self.position, True)
+
+    def press(self, key_combo: str) -> bool:
+        """Simulate the user pressing a combo; returns True if it was a registered hotkey."""
+        if self.hooks:
+            keys = key_combo.split("+")
+            for key in keys:
+                self.hooks[0](key, True)
+            for key in reversed(keys):
+                self.hooks[0](key, False)
+        suppress = self.suppress.get(key_combo)
+        if suppress is None or not suppress():
+            self.typed.append(key_combo)
+        callback = self.hotkeys.get(key_combo)
+        if callback is None:
+            return False
+        callback()
+        return True
+
+    def user_move(self, x: int, y: int):
+        """Simulate the user moving the mouse."""
+        self.position = (x, y)
+        if self.hooks:
+            self.hooks[1](x, y, False)
+
+    def user_click(self, x: int, y: int, button: str = "left"):
+        """Simulate a physical click (press and release) at a point."""
+        self.user_move(x, y)
+        if self.hooks:
+            for pressed in (True, False):
+                self.hooks[2](x, y, button, pressed, False)
+
+    def clicks(self) -> List[tuple]:
+        """Button-down events only: (timestamp_ns, x, y, button)."""
+        return [(t, x, y, b) for t, kind, x, y, b, down in self.events if kind == "button" and down]
+
+
+def default_backend() -> InputBackend:
+    if sys.platform.startswith("linux"):
+        # Imported lazily: it loads libX11/libXtst and opens $DISPLAY
+        from x11_backend import X11InputBackend
+        return X11InputBackend()
+    return WindowsInputBackend()
@@ -0,0 +1,222 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from histogram import LatencyHistogram
+
+log = logging.getLogger(__name__)
+
+KeyCallback = Callable[[str], None]
+MoveCallback = Callable[[int, int, bool], None]
+ClickCallback = Callable[[int, int, str, bool, bool], Optional[bool]]
+
+# Modifiers lead a combo in this order, like keyboard.get_hotkey_name()
+MODIFIERS = ("ctrl", "alt", "shift", "windows")
+
+# Key injected by InputBackend.send_probe(); never reported as a combo
+PROBE_KEY = "f24"
+
+
+def _normalize_key(name: str) -> str:
+    name = (name or "").lower()
+    for prefix in ("left ", "right "):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+    return {"control": "ctrl", "alt gr": "alt", "win": "windows", "cmd": "windows"}.get(name, name)
+
+
+class Subscription:
+    """Handle returned by InputHub.subscribe_*; cancel() stops delivery."""
+
+    def __init__(self, hub: "InputHub", kind: str, callback):
+        self._hub = hub
+        self.kind = kind
+        self.callback = callback
+
+    def cancel(self):
+        self._hub._unsubscribe(self)
+
+    stop = cancel
+
+
+class InputHub:
+    """One keyboard hook and one mouse hook shared by every input consumer.
+
+    The backend installs both hooks once; the hub fans raw events out to
+    typed subscribers: completed key combos, cursor moves and clicks. The
+    time spent dispatching each hook event is recorded per hook, so hook
+    cost is measured in one place.
+
+    Subscriber lists are immutable tuples swapped on change, so dispatch
+    on the hook threads never takes a lock.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.position: Optional[Tuple[int, int]] = None
+        self.hook_time: Dict[str, LatencyHistogram] = {"keyboard": LatencyHistogram(), "mouse": LatencyHistogram()}
+        # Events delivered per hook; the watchdog watches these move after a probe
+        self.event_counts: Dict[str, int] = {"keyboard": 0, "mouse": 0}
+        self._subscribers: Dict[str, tuple] = {"key": (), "move": (), "click": ()}
+        self._lock = threading.Lock()
+        self._capture: Optional[KeyCallback] = None
+        self._held: List[str] = []
+        self._chord: List[str] = []
+        self._chord_reported = False
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self.position = self.backend.cursor_pos()
+        self.backend.install_hooks(self._on_key, self._on_move, self._on_click)
+        self._running = True
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self.backend.uninstall_hooks()
+
+    def restart(self):
+        """Drop and re-install both hooks, e.g. after Windows silently removed them."""
+        self.stop()
+        self._held = []
+        self._chord = []
+        self.start()
+
+    # ----- subscriptions -----
+
+    def _subscribe(self, kind: str, callback) -> Subscription:
+        subscription = Subscription(self, kind, callback)
+        with self._lock:
+            self._subscribers[kind] = self._subscribers[kind] + (subscription,)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            current = self._subscribers[subscription.kind]
+            self._subscribers[subscription.kind] = tuple(s for s in current if s is not subscription)
+
+    def subscribe_keys(self, callback: KeyCallback) -> Subscription:
+        """``callback(combo)`` for every completed key combo, e.g. "ctrl+shift+a"."""
+        return self._subscribe("key", callback)
+
+    def subscribe_moves(self, callback: MoveCallback) -> Subscription:
+        """``callback(x, y, injected)`` for every cursor move."""
+        return self._subscribe("move", callback)
+
+    def subscribe_clicks(self, callback: ClickCallback) -> Subscription:
+        """``callback(x, y, button, pressed, injected)``; returning False unsubscribes."""
+        return self._subscribe("click", callback)
+
+    def capture_hotkey(self, callback: KeyCallback):
+        """Call ``callback(combo)`` once with the next combo; replaces a pending capture."""
+        self._capture = callback
+
+    # ----- hook callbacks (run on the backend's hook threads) -----
+
+    def _on_key(self, name: str, down: bool):
+        started = time.perf_counter_ns()
+        self.event_counts["keyboard"] += 1
+        key = _normalize_key(name)
+        if key == PROBE_KEY:
+            pass  # Watchdog delivery check only
+        elif down:
+            if key not in self._held:
+                self._held.append(key)
+            if key not in self._chord:
+                self._chord.append(key)
+                self._chord_reported = False
+        else:
+            if self._chord and not self._chord_reported:
+                # Like keyboard.read_hotkey(): the combo is complete on the first release
+                self._chord_reported = True
+                self._dispatch_combo(self._combo_name(self._chord))
+            if key in self._held:
+                self._held.remove(key)
+            if not self._held:
+                self._chord = []
+        self.hook_time["keyboard"].record(time.perf_counter_ns() - started)
+
+    @staticmethod
+    def _combo_name(keys: List[str]) -> str:
+        modifiers = [m for m in MODIFIERS if m in keys]
+        return "+".join(modifiers + [k for k in keys if k not in MODIFIERS])
+
+    def _dispatch_combo(self, combo: str):
+        capture, self._capture = self._capture, None
+        if capture is not None:
+            self._call(capture, combo)
+        for subscription in self._subscribers["key"]:
+            self._call(subscription.callback, combo)
+
+    def _on_move(self, x: int, y: int, injected: bool = False):
+        started = time.perf_counter_ns()
+        self.event_counts["mouse"] += 1
+        self.position = (x, y)
+        for subscription in self._subscribers["move"]:
+            self._call(subscription.callback, x, y, injected)
+        self.hook_time["mouse"].record(time.perf_counter_ns() - started)
+
+    def _on_click(self, x: int, y: int, button: str, pressed: bool, injected: bool = False):
+        started = time.perf_counter_ns()
+        self.event_counts["mouse"] += 1
+        self.position = (x, y)
+        for subscription in self._subscribers["click"]:
+            if self._call(subscription.callback, x, y, button, pressed, injected) is False:
+                subscription.cancel()
+        self.hook_time["mouse"].record(time.perf_counter_ns() - started)
+
+    @staticmethod
+    def _call(callback, *args):
+        # A failing subscriber must never take the shared hook down
+        try:
+            return callback(*args)
+        except Exception as e:
+            log.exception("Input subscriber failed: %s", e)
+            return None
+
+    def get_stats(self) -> Dict[str, dict]:
+        """Per-hook dispatch time summaries and current subscriber counts."""
+        stats = {hook: histogram.summary() for hook, histogram in self.hook_time.items()}
+        stats["subscribers"] = {kind: len(subs) for kind, subs in self._subscribers.items()}
+        return stats
+
+
+class MovementDetector:
+    """Cancel-on-move detector fed by the hub instead of polling the cursor.
+
+    arm() records an anchor; any physical move further than the threshold
+    from it (even one that comes back before the executor checks) flags
+    ``moved`` until the next arm(). Injected moves are ignored when the
+    backend can tell them apart; otherwise the executor re-arms at its own
+    click position, so its own moves land on the anchor.
+    """
+
+    def __init__(self, hub: InputHub):
+        self.hub = hub
+        self._anchor: Optional[Tuple[int, int]] = None
+        self._threshold = 0
+        self.moved = False
+        self._subscription = hub.subscribe_moves(self._on_move)
+
+    def arm(self, position: Tuple[int, int], threshold: int):
+        self._threshold = threshold
+        self.moved = False
+        self._anchor = position
+
+    def disarm(self):
+        self._anchor = None
+        self.moved = False
+
+    def _on_move(self, x, y, injected):
+        anchor = self._anchor
+        if anchor is None or injected:
+            return
+        if abs(x - anchor[0]) > self._threshold or abs(y - anchor[1]) > self._threshold:
+            self.moved = True
+
+    def close(self):
+        self._subscription.cancel()
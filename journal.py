@@ -0,0 +1,126 @@
+import os
+import json
+import logging
+import threading
+import uuid
+from collections import deque
+from typing import Iterator, Dict, Any
+
+log = logging.getLogger(__name__)
+
+# Record tuple layout (kept as a tuple on the hot path, formatted by the writer)
+# (execution id, action name, x, y, button, planned ns, actual ns, wall clock ns)
+FIELDS = ("e", "a", "x", "y", "b", "p", "t", "w")
+# Every line also carries the journal's run id ("r"): execution ids restart at 1 each
+# launch while the file is appended to, so (r, e) identifies an execution. Lines
+# {"r": run, "dropped": n} note records lost to a full ring since the previous batch.
+
+
+class ExecutionJournal:
+    """Append-only JSONL journal of every injected click.
+
+    record() only appends a tuple to an in-memory ring; a background thread
+    formats and writes batches, rotating the file once it exceeds
+    ``max_bytes`` (journal.jsonl -> journal.1.jsonl -> ...). ``run`` is a
+    random id for this journal's session, written into every line.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 5 * 1024 * 1024, backups: int = 5,
+                 capacity: int = 65536, flush_interval: float = 0.25):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self.run = uuid.uuid4().hex[:8]
+        self._ring = deque(maxlen=capacity)
+        self.dropped = 0   # Records overwritten before the writer caught up
+        self._dropped_written = 0
+        self.written = 0
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        self._thread.start()
+
+    def record(self, execution_id: int, name: str, x: int, y: int, button: str,
+               planned_ns: int, actual_ns: int, wall_ns: int):
+        """Queue one click. Cheap enough for the execution path."""
+        ring = self._ring
+        if len(ring) == ring.maxlen:
+            self.dropped += 1
+        ring.append((execution_id, name, x, y, button, planned_ns, actual_ns, wall_ns))
+        if len(ring) >= 1024:
+            self._wake.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        ring = self._ring
+        dropped = self.dropped - self._dropped_written
+        if not ring and not dropped:
+            return
+        lines = []
+        if dropped:
+            self._dropped_written += dropped
+            lines.append(json.dumps({"r": self.run, "dropped": dropped}, separators=(",", ":")))
+        while ring:
+            try:
+                entry = ring.popleft()
+            except IndexError:
+                break
+            record = {"r": self.run}
+            record.update(zip(FIELDS, entry))
+            lines.append(json.dumps(record, separators=(",", ":")))
+        data = "\n".join(lines) + "\n"
+        try:
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data.encode("utf-8"))
+            self.written += len(lines) - (1 if dropped else 0)
+            if self._size >= self.max_bytes:
+                self._rotate()
+        except Exception as e:
+            log.error("Error writing execution journal: %s", e)
+
+    def _rotate(self):
+        self._file.close()
+        root, ext = os.path.splitext(self.path)
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{root}.{i}{ext}"
+            if os.path.exists(src):
+                os.replace(src, f"{root}.{i + 1}{ext}")
+        if self.backups > 0:
+            os.replace(self.path, f"{root}.1{ext}")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = 0
+
+    def close(self):
+        """Flush everything still in memory and close the file."""
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=2.0)
+        self._file.close()
+
+
+def read_journal(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield journal records as dicts, skipping a torn last line."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
@@ -0,0 +1,86 @@
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Optional
+
+# Execution trace id of the current thread's work ("-" outside executions);
+# the same id is written to the execution journal as "e".
+trace_id = contextvars.ContextVar("trace_id", default="-")
+
+
+class _TraceFilter(logging.Filter):
+    def filter(self, record):
+        record.trace = trace_id.get()
+        return True
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record as is; the listener thread does all formatting.
+
+    The stock prepare() formats the message on the calling thread, which
+    is exactly the cost we want off the hook and execution paths.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, trace, msg (and exc)."""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "trace": getattr(record, "trace", "-"),
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(path: Optional[str] = "logs/strade.log", level: str = "INFO",
+                  max_bytes: int = 2 * 1024 * 1024, backups: int = 3,
+                  console: bool = True) -> logging.handlers.QueueListener:
+    """Route all logging through a queue to a background writer thread.
+
+    Callers only pay for the level check and an enqueue; the listener
+    writes JSON lines to a rotating file and a short form to the console.
+    Returns the started listener; call stop() on shutdown to flush it.
+    """
+    handlers = []
+    if path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(logging.Formatter("%(levelname)s [%(trace)s] %(name)s: %(message)s"))
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = _LazyQueueHandler(log_queue)
+    queue_handler.addFilter(_TraceFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
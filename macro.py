@@ -0,0 +1,232 @@
+import base64
+import threading
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# Event kinds (low 2 bits of each record's first varint; the rest is the argument)
+MOVE = 0
+BUTTON_DOWN = 1
+BUTTON_UP = 2
+KEY = 3
+
+BUTTONS = ["left", "right"]
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, offset: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -(value >> 1) - 1
+
+
+class MacroBuffer:
+    """Recorded input as one packed byte string.
+
+    Each event is four varints: kind | argument << 2, microseconds since
+    the previous event, and x and y as zigzag deltas from the previous
+    event. Mouse paths and quick click sequences take 4-6 bytes per event.
+    The argument is a BUTTONS index or an index into ``keys`` (key combos).
+    """
+
+    def __init__(self, data: Optional[bytes] = None, keys: Optional[List[str]] = None):
+        self.data = bytearray(data or b"")
+        self.keys = list(keys or [])
+        self.count = 0
+        self.duration_us = 0
+        self._last = (0, 0)
+        for event in self.events():
+            pass  # Restores count, duration and the last position
+
+    def append(self, t_us: int, kind: int, x: int, y: int, arg: int = 0):
+        """Append an event at ``t_us`` microseconds from the start of the recording."""
+        last_x, last_y = self._last
+        _write_varint(self.data, kind | arg << 2)
+        _write_varint(self.data, max(0, t_us - self.duration_us))
+        _write_varint(self.data, _zigzag(x - last_x))
+        _write_varint(self.data, _zigzag(y - last_y))
+        self.duration_us = max(t_us, self.duration_us)
+        self._last = (x, y)
+        self.count += 1
+
+    def append_key(self, t_us: int, combo: str, x: int, y: int):
+        if combo not in self.keys:
+            self.keys.append(combo)
+        self.append(t_us, KEY, x, y, self.keys.index(combo))
+
+    def events(self) -> Iterator[Tuple[int, int, int, int, int]]:
+        """Decode to ``(t_us, kind, x, y, arg)`` with absolute time and position."""
+        t = x = y = count = 0
+        offset = 0
+        data = self.data
+        while offset < len(data):
+            head, offset = _read_varint(data, offset)
+            dt, offset = _read_varint(data, offset)
+            dx, offset = _read_varint(data, offset)
+            dy, offset = _read_varint(data, offset)
+            t += dt
+            x += _unzigzag(dx)
+            y += _unzigzag(dy)
+            count += 1
+            yield t, head & 3, x, y, head >> 2
+        self.count = count
+        self.duration_us = t
+        self._last = (x, y)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def simplified(self, drag_step: int = 8) -> "MacroBuffer":
+        """A copy without redundant moves.
+
+        Clicks and keys carry their own position, so moves only matter
+        while a button is held (drags); those are thinned to one per
+        ``drag_step`` pixels plus the last one before each event.
+        """
+        out = MacroBuffer(keys=self.keys)
+        held = 0
+        kept = None
+        pending = None
+        for t, kind, x, y, arg in self.events():
+            if kind == MOVE:
+                if not held:
+                    continue
+                if kept is None or abs(x - kept[0]) >= drag_step or abs(y - kept[1]) >= drag_step:
+                    out.append(t, kind, x, y)
+                    kept, pending = (x, y), None
+                else:
+                    pending = (t, x, y)
+                continue
+            if pending is not None:
+                out.append(pending[0], MOVE, pending[1], pending[2])
+                pending = None
+            if kind == BUTTON_DOWN:
+                held += 1
+            elif kind == BUTTON_UP:
+                held = max(0, held - 1)
+            out.append(t, kind, x, y, arg)
+            kept = (x, y)
+        return out
+
+    def translated(self, dx: int, dy: int) -> "MacroBuffer":
+        out = MacroBuffer(keys=self.keys)
+        for t, kind, x, y, arg in self.events():
+            out.append(t, kind, x + dx, y + dy, arg)
+        return out
+
+    def summary(self) -> str:
+        clicks = sum(1 for _, kind, _, _, _ in self.events() if kind == BUTTON_DOWN)
+        return f"{self.count} events · {clicks} clicks · {self.duration_us / 1e6:.1f}s"
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.data)
+
+    def to_json(self):
+        return {
+            "events": self.count,
+            "duration_ms": self.duration_us // 1000,
+            "data": base64.b64encode(bytes(self.data)).decode("ascii"),
+            "keys": self.keys,
+        }
+
+    @classmethod
+    def from_json(cls, data) -> "MacroBuffer":
+        return cls(base64.b64decode(data.get("data", "")), data.get("keys", []))
+
+
+def macro_of(action_data) -> Optional[MacroBuffer]:
+    """The action's recording, whichever form it was saved in, or None."""
+    macro = action_data.get("macro")
+    if not macro:
+        return None
+    return macro if isinstance(macro, MacroBuffer) else MacroBuffer.from_json(macro)
+
+
+class MacroRecorder:
+    """Records clicks, key combos and cursor paths from the shared input hub.
+
+    Uses the hub's existing hooks (no hooks of its own). Injected moves and
+    clicks (e.g. an action firing while recording) are skipped, and ``ignore(x, y)`` can drop clicks on the app's own window,
+    such as the one that stops the recording. ``stop_key`` is never
+    recorded; it calls ``on_stop()`` instead. Time starts at the first
+    recorded event.
+    """
+
+    def __init__(self, hub, ignore: Optional[Callable[[int, int], bool]] = None,
+                 stop_key: Optional[str] = "esc", on_stop: Optional[Callable[[], None]] = None):
+        self.hub = hub
+        self.ignore = ignore
+        self.stop_key = stop_key
+        self.on_stop = on_stop
+        self.buffer = MacroBuffer()
+        self._start_ns = None
+        self._lock = threading.Lock()
+        self._subscriptions = []
+
+    @property
+    def recording(self) -> bool:
+        return bool(self._subscriptions)
+
+    def start(self):
+        if self._subscriptions:
+            return
+        self.buffer = MacroBuffer()
+        self._start_ns = None
+        self._subscriptions = [
+            self.hub.subscribe_moves(self._on_move),
+            self.hub.subscribe_clicks(self._on_click),
+            self.hub.subscribe_keys(self._on_key),
+        ]
+
+    def stop(self) -> MacroBuffer:
+        """Stop and return the recording (unsimplified)."""
+        for subscription in self._subscriptions:
+            subscription.cancel()
+        self._subscriptions = []
+        return self.buffer
+
+    def _t_us(self) -> int:
+        now = time.perf_counter_ns()
+        if self._start_ns is None:
+            self._start_ns = now
+        return (now - self._start_ns) // 1000
+
+    def _on_move(self, x, y, injected):
+        if injected:
+            return
+        with self._lock:
+            if self.buffer.count:  # Moves before the first click or key are not replayed
+                self.buffer.append(self._t_us(), MOVE, x, y)
+
+    def _on_click(self, x, y, button, pressed, injected):
+        if injected or button not in BUTTONS or (self.ignore and self.ignore(x, y)):
+            return
+        with self._lock:
+            self.buffer.append(self._t_us(), BUTTON_DOWN if pressed else BUTTON_UP, x, y, BUTTONS.index(button))
+
+    def _on_key(self, combo):
+        if combo == self.stop_key:
+            if self.on_stop:
+                self.on_stop()
+            return
+        position = self.hub.position or (0, 0)
+        with self._lock:
+            self.buffer.append_key(self._t_us(), combo, position[0], position[1])
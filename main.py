@@ -1,12 +1,36 @@
 import customtkinter as ctk
+import json
+import logging
+import os
 import threading
 import time
 import ctypes
 import ctypes.wintypes
 import tkinter as tk
-from pynput import mouse, keyboard
+from tkinter import filedialog, messagebox
 from executor import Executor
-from config_manager import ConfigManager
+from input_backend import default_backend
+from message_backend import default_message_backend
+from governor import InjectionGovernor, PRIORITY_HIGH, PRIORITY_NORMAL
+from input_hub import InputHub, MovementDetector
+from hook_watchdog import HookWatchdog
+from ui_lag import LagMonitor
+from gc_guard import GcGuard
+from log_setup import setup_logging
+from control_channel import ControlServer, CTL_PROFILE, CTL_TRIGGER, unpack_trigger
+from plan import compile_action, compile_group, ladder_of
+from config_watcher import ConfigChange, ConfigWatcher, LIVE_SETTINGS
+from engine_process import EngineClient
+from journal import ExecutionJournal
+from stats_block import StatsBlock
+from simulation import dry_run
+from config_manager import ConfigManager, digest_of
+from coord_buffer import CoordBuffer, coords_of, INLINE_LIMIT
+from macro import BUTTON_DOWN, MacroRecorder, macro_of
+from group import format_group_spec, group_of, parse_group_spec
+from window_tracker import WindowTracker, WinEventWindowProvider, key_label
+
+log = logging.getLogger(__name__)
 
 # ========== THEME CONFIGURATION ==========
 ctk.set_appearance_mode("Dark")
@@ -29,10 +53,11 @@ COLORS = {
 
 class CoordRow(ctk.CTkFrame):
     """A compact coordinate chip with pick and delete buttons."""
-    def __init__(self, master, x=0, y=0, on_pick=None, on_delete=None, **kwargs):
+    def __init__(self, master, x=0, y=0, on_pick=None, on_delete=None, ref=None, **kwargs):
         super().__init__(master, fg_color="transparent", **kwargs)
         self.on_pick = on_pick
         self.on_delete = on_delete
+        self.ref = ref  # Screen hash captured at pick time, used by "Match" waits
         
         # Compact coordinate chip
         coord_text = f"{x},{y}" if x != 0 or y != 0 else "Pick"
@@ -81,12 +106,13 @@ class CoordRow(ctk.CTkFrame):
         parts = text.split(',')
         return (int(parts[0]), int(parts[1]))
     
-    def set_coord(self, x, y):
+    def set_coord(self, x, y, ref=None):
+        self.ref = ref
         self.coord_btn.configure(text=f"{x},{y}", fg_color=COLORS["bg_card_hover"])
 
 class ActionFrame(ctk.CTkFrame):
     """Card-style action frame with modern styling."""
-    def __init__(self, master, action_data, delete_callback, pick_callback, bind_callback, test_callback, on_change_callback=None, **kwargs):
+    def __init__(self, master, action_data, delete_callback, pick_callback, bind_callback, test_callback, on_change_callback=None, anchor_callback=None, dry_run_callback=None, import_callback=None, record_callback=None, **kwargs):
         super().__init__(
             master, 
             fg_color=COLORS["bg_card"],
@@ -101,7 +127,11 @@ class ActionFrame(ctk.CTkFrame):
         self.bind_callback = bind_callback
         self.test_callback = test_callback
         self.on_change_callback = on_change_callback
+        self.anchor_callback = anchor_callback
         self.coord_rows = []
+        # Large point sets live only here, shown as a summary instead of chips
+        self.coord_buffer = None
+        self.coords_summary = None
         self._burst_notified = action_data.get("mode", "Single") == "Burst"  # Already notified if loaded as Burst
         self._burst_pulse_running = False
 
@@ -156,6 +186,21 @@ class ActionFrame(ctk.CTkFrame):
         )
         self.test_btn.pack(side="left", padx=2)
 
+        # Dry run - show the computed timeline without clicking
+        self.dry_run_btn = ctk.CTkButton(
+            self.header_frame, 
+            text="⏱", 
+            width=28,
+            height=28,
+            fg_color=COLORS["bg_card_hover"],
+            hover_color=COLORS["accent_secondary"],
+            text_color=COLORS["text_primary"],
+            corner_radius=6,
+            font=ctk.CTkFont(size=12),
+            command=lambda: dry_run_callback(self) if dry_run_callback else None
+        )
+        self.dry_run_btn.pack(side="left", padx=2)
+
         # Delete button - compact
         self.del_btn = ctk.CTkButton(
             self.header_frame, 
@@ -300,6 +345,57 @@ class ActionFrame(ctk.CTkFrame):
         )
         self.delay_display.pack(side="left")
 
+        # Wait mode - Fixed sleeps the delay, Change/Match poll the screen (delay = timeout)
+        self.wait_menu = ctk.CTkOptionMenu(
+            self.settings_frame,
+            values=["Fixed", "Change", "Match"],
+            width=70,
+            height=24,
+            fg_color=COLORS["bg_dark"],
+            button_color=COLORS["bg_card_hover"],
+            button_hover_color=COLORS["accent"],
+            dropdown_fg_color=COLORS["bg_card"],
+            corner_radius=6,
+            font=ctk.CTkFont(size=11),
+            command=self._on_wait_mode_change
+        )
+        self.wait_menu.set(action_data.get("wait_mode", "Fixed"))
+        self.wait_menu.pack(side="left", padx=(2, 0))
+
+        # What a Change/Match wait does when the screen never responds: click anyway or abort
+        self.wait_fallback_menu = ctk.CTkOptionMenu(
+            self.settings_frame,
+            values=["click", "abort"],
+            width=62,
+            height=24,
+            fg_color=COLORS["bg_dark"],
+            button_color=COLORS["bg_card_hover"],
+            button_hover_color=COLORS["accent"],
+            dropdown_fg_color=COLORS["bg_card"],
+            corner_radius=6,
+            font=ctk.CTkFont(size=11),
+            command=lambda _: self._on_change()
+        )
+        self.wait_fallback_menu.set(action_data.get("wait_fallback", "click").lower())
+        self._update_wait_fallback_visibility()
+
+        # Priority - high-priority clicks skip the rate governor's wait
+        self.priority_var = ctk.BooleanVar(value=action_data.get("priority", PRIORITY_NORMAL) == PRIORITY_HIGH)
+        self.priority_check = ctk.CTkCheckBox(
+            self.settings_frame,
+            text="Priority",
+            variable=self.priority_var,
+            width=20,
+            checkbox_width=14,
+            checkbox_height=14,
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"],
+            fg_color=COLORS["accent"],
+            hover_color=COLORS["accent_hover"],
+            command=self._on_change
+        )
+        self.priority_check.pack(side="left", padx=(6, 0))
+
         # Coordinates section - wrap/flow layout
         self.coords_section = ctk.CTkFrame(self, fg_color=COLORS["bg_dark"], corner_radius=6)
         self.coords_section.pack(fill="x", padx=10, pady=(4, 8))
@@ -330,29 +426,351 @@ class ActionFrame(ctk.CTkFrame):
         )
         self.add_coord_btn.pack(side="right")
         
+        # Bulk import from clipboard / CSV
+        self.import_btn = ctk.CTkButton(
+            self.coords_header, 
+            text="⇪", 
+            width=24,
+            height=24,
+            fg_color=COLORS["bg_card_hover"],
+            hover_color=COLORS["accent_secondary"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=12,
+            font=ctk.CTkFont(size=12),
+            command=lambda: import_callback(self) if import_callback else None
+        )
+        self.import_btn.pack(side="right", padx=(0, 4))
+        
+        # Ladder - the points are row 1, repeated every step for N rows
+        self.ladder_btn = ctk.CTkButton(
+            self.coords_header, 
+            text="☰", 
+            width=24,
+            height=24,
+            fg_color=COLORS["bg_card_hover"],
+            hover_color=COLORS["accent_secondary"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=12,
+            font=ctk.CTkFont(size=12),
+            command=self._toggle_ladder
+        )
+        self.ladder_btn.pack(side="right", padx=(0, 4))
+        
+        # Group - run other actions of this profile from one hotkey, each at an offset
+        self.group_btn = ctk.CTkButton(
+            self.coords_header, 
+            text="⧉", 
+            width=24,
+            height=24,
+            fg_color=COLORS["bg_card_hover"],
+            hover_color=COLORS["accent_secondary"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=12,
+            font=ctk.CTkFont(size=12),
+            command=self._toggle_group
+        )
+        self.group_btn.pack(side="right", padx=(0, 4))
+        
+        # Macro - record clicks/keys with their timing and replay them instead of the points
+        self.record_btn = ctk.CTkButton(
+            self.coords_header, 
+            text="⏺", 
+            width=24,
+            height=24,
+            fg_color=COLORS["bg_card_hover"],
+            hover_color=COLORS["danger"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=12,
+            font=ctk.CTkFont(size=12),
+            command=lambda: record_callback(self) if record_callback else None
+        )
+        self.record_btn.pack(side="right", padx=(0, 4))
+        
+        # Window anchor - when set, coordinates are relative to the target window
+        self.window = action_data.get("window")
+        self.anchor_btn = ctk.CTkButton(
+            self.coords_header,
+            text="",
+            width=90,
+            height=24,
+            fg_color=COLORS["bg_card_hover"],
+            hover_color=COLORS["accent_secondary"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=12,
+            font=ctk.CTkFont(size=10),
+            command=lambda: anchor_callback(self) if anchor_callback else None
+        )
+        self.anchor_btn.pack(side="right", padx=(0, 6))
+        
+        # Focus gating - only fire while the anchored window is in the foreground
+        self.focus_var = ctk.BooleanVar(value=action_data.get("focus_only", False))
+        self.focus_check = ctk.CTkCheckBox(
+            self.coords_header,
+            text="Focus only",
+            variable=self.focus_var,
+            width=20,
+            checkbox_width=14,
+            checkbox_height=14,
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"],
+            fg_color=COLORS["accent"],
+            hover_color=COLORS["accent_hover"],
+            command=self._on_change
+        )
+        self.focus_check.pack(side="right", padx=(0, 6))
+        
+        # Background delivery - click the anchored window with window messages, cursor untouched
+        self.background_var = ctk.BooleanVar(value=action_data.get("delivery", "cursor") == "message")
+        self.background_check = ctk.CTkCheckBox(
+            self.coords_header,
+            text="Background",
+            variable=self.background_var,
+            width=20,
+            checkbox_width=14,
+            checkbox_height=14,
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"],
+            fg_color=COLORS["accent"],
+            hover_color=COLORS["accent_hover"],
+            command=self._on_change
+        )
+        self.background_check.pack(side="right", padx=(0, 6))
+        self.set_window(self.window)
+        
+        # Ladder settings row, shown only for ladder actions
+        ladder = action_data.get("ladder") or {}
+        self.ladder_frame = ctk.CTkFrame(self.coords_section, fg_color="transparent")
+        self.ladder_entries = {}
+        for key, label, value in (("rows", "Rows", ladder.get("rows", 5)),
+                                  ("dx", "Step x", ladder.get("offset", (0, 20))[0]),
+                                  ("dy", "y", ladder.get("offset", (0, 20))[1])):
+            ctk.CTkLabel(
+                self.ladder_frame,
+                text=label,
+                font=ctk.CTkFont(size=11),
+                text_color=COLORS["text_secondary"]
+            ).pack(side="left", padx=(4, 2))
+            entry = ctk.CTkEntry(
+                self.ladder_frame,
+                width=45,
+                height=24,
+                fg_color=COLORS["bg_dark"],
+                border_color=COLORS["border"],
+                corner_radius=6,
+                font=ctk.CTkFont(size=11)
+            )
+            entry.insert(0, str(value))
+            entry.pack(side="left")
+            entry.bind("<FocusOut>", lambda e: self._on_change())
+            entry.bind("<Return>", lambda e: self._on_change())
+            self.ladder_entries[key] = entry
+        self.is_ladder = bool(action_data.get("ladder"))
+        
+        # Group row: member actions as "Name@offset_ms, ...", shown only for groups
+        self.group_frame = ctk.CTkFrame(self.coords_section, fg_color="transparent")
+        ctk.CTkLabel(
+            self.group_frame,
+            text="Actions",
+            font=ctk.CTkFont(size=11),
+            text_color=COLORS["text_secondary"]
+        ).pack(side="left", padx=(4, 2))
+        self.group_entry = ctk.CTkEntry(
+            self.group_frame,
+            height=24,
+            fg_color=COLORS["bg_dark"],
+            border_color=COLORS["border"],
+            corner_radius=6,
+            font=ctk.CTkFont(size=11),
+            placeholder_text="Cancel all@0, Requote@150"
+        )
+        group = group_of(action_data)
+        if group:
+            self.group_entry.insert(0, format_group_spec(group))
+        self.group_entry.pack(side="left", fill="x", expand=True)
+        self.group_entry.bind("<FocusOut>", lambda e: self._on_change())
+        self.group_entry.bind("<Return>", lambda e: self._on_change())
+        self.is_group = bool(group)
+        
+        # Macro row: recording summary, playback speed and clear, shown only with a recording
+        self.macro = macro_of(action_data)
+        self.macro_frame = ctk.CTkFrame(self.coords_section, fg_color="transparent")
+        self.macro_label = ctk.CTkLabel(
+            self.macro_frame,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=COLORS["text_primary"]
+        )
+        self.macro_label.pack(side="left", padx=(4, 6))
+        ctk.CTkLabel(
+            self.macro_frame,
+            text="Speed ×",
+            font=ctk.CTkFont(size=11),
+            text_color=COLORS["text_secondary"]
+        ).pack(side="left", padx=(0, 2))
+        self.time_scale_entry = ctk.CTkEntry(
+            self.macro_frame,
+            width=40,
+            height=24,
+            fg_color=COLORS["bg_dark"],
+            border_color=COLORS["border"],
+            corner_radius=6,
+            font=ctk.CTkFont(size=11)
+        )
+        self.time_scale_entry.insert(0, str(action_data.get("time_scale", 1.0)))
+        self.time_scale_entry.pack(side="left")
+        self.time_scale_entry.bind("<FocusOut>", lambda e: self._on_change())
+        self.time_scale_entry.bind("<Return>", lambda e: self._on_change())
+        ctk.CTkButton(
+            self.macro_frame, 
+            text="×", 
+            width=20, 
+            height=24,
+            fg_color="transparent",
+            hover_color=COLORS["danger"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=12,
+            font=ctk.CTkFont(size=14),
+            command=self._clear_macro
+        ).pack(side="left", padx=(4, 0))
+        
         # Wrap frame for coordinates (using grid layout)
         self.coords_frame = ctk.CTkFrame(self.coords_section, fg_color="transparent")
         self.coords_frame.pack(fill="x", padx=6, pady=(2, 6))
         self.COORDS_PER_ROW = 4  # Max coordinates per row
         
         # Load existing coords or add default
-        coords = action_data.get("coords", [])
-        if not coords:
-            coords = [{"x": action_data.get("x", 0), "y": action_data.get("y", 0)}]
-        
-        for c in coords:
-            self._add_coord_row_internal(c.get("x", 0), c.get("y", 0))
+        self.set_coords(coords_of(action_data))
+        self._show_ladder()
+        self._show_group()
+        self.set_macro(self.macro)
+
+    def set_macro(self, macro):
+        """Attach a recording (MacroBuffer) or None; a macro replaces the points on playback."""
+        self.macro = macro if macro is not None and len(macro) else None
+        if self.macro is not None:
+            self.macro_label.configure(text=f"⏺ {self.macro.summary()}")
+            self.macro_frame.pack(fill="x", padx=6, pady=(0, 2), before=self.coords_frame)
+        else:
+            self.macro_frame.pack_forget()
+
+    def set_recording(self, recording):
+        if recording:
+            self.record_btn.configure(text="⏹", fg_color=COLORS["danger"], text_color="#09090b")
+        else:
+            self.record_btn.configure(text="⏺", fg_color=COLORS["bg_card_hover"], text_color=COLORS["text_secondary"])
+
+    def _clear_macro(self):
+        self.set_macro(None)
+        self._on_change()
+
+    def _time_scale(self):
+        try:
+            scale = float(self.time_scale_entry.get())
+        except ValueError:
+            return 1.0
+        return scale if scale > 0 else 1.0
+
+    def _toggle_ladder(self):
+        self.is_ladder = not self.is_ladder
+        self._show_ladder()
+        self._on_change()
+
+    def _show_ladder(self):
+        if self.is_ladder:
+            self.ladder_frame.pack(fill="x", padx=6, pady=(0, 2), before=self.coords_frame)
+            self.ladder_btn.configure(fg_color=COLORS["accent"], text_color="#09090b")
+        else:
+            self.ladder_frame.pack_forget()
+            self.ladder_btn.configure(fg_color=COLORS["bg_card_hover"], text_color=COLORS["text_secondary"])
+
+    def _toggle_group(self):
+        self.is_group = not self.is_group
+        self._show_group()
+        self._on_change()
+
+    def _show_group(self):
+        if self.is_group:
+            self.group_frame.pack(fill="x", padx=6, pady=(0, 2), before=self.coords_frame)
+            self.group_btn.configure(fg_color=COLORS["accent"], text_color="#09090b")
+        else:
+            self.group_frame.pack_forget()
+            self.group_btn.configure(fg_color=COLORS["bg_card_hover"], text_color=COLORS["text_secondary"])
+
+    def _ladder_value(self, key, default):
+        try:
+            return int(self.ladder_entries[key].get())
+        except ValueError:
+            return default
 
     def add_coord_row(self):
         self._add_coord_row_internal(0, 0)
         self._reflow_coords()
         self._on_change()
     
-    def _add_coord_row_internal(self, x, y):
-        row = CoordRow(self.coords_frame, x, y, on_pick=self._on_coord_pick, on_delete=self._on_coord_delete)
+    def _add_coord_row_internal(self, x, y, ref=None):
+        row = CoordRow(self.coords_frame, x, y, on_pick=self._on_coord_pick, on_delete=self._on_coord_delete, ref=ref)
         self.coord_rows.append(row)
         self._reflow_coords()
     
+    def set_coords(self, points):
+        """Replace all points; more than INLINE_LIMIT collapse into a summary row."""
+        for row in self.coord_rows:
+            row.destroy()
+        self.coord_rows = []
+        if len(points) > INLINE_LIMIT:
+            self.coord_buffer = points
+            if self.coords_summary is None:
+                self.coords_summary = ctk.CTkFrame(self.coords_frame, fg_color="transparent")
+                self.coords_summary_label = ctk.CTkLabel(
+                    self.coords_summary,
+                    text="",
+                    font=ctk.CTkFont(size=11),
+                    text_color=COLORS["text_primary"]
+                )
+                self.coords_summary_label.pack(side="left", padx=(2, 4))
+                ctk.CTkButton(
+                    self.coords_summary, 
+                    text="×", 
+                    width=20, 
+                    height=24,
+                    fg_color="transparent",
+                    hover_color=COLORS["danger"],
+                    text_color=COLORS["text_secondary"],
+                    corner_radius=12,
+                    font=ctk.CTkFont(size=14),
+                    command=self._clear_coords
+                ).pack(side="left")
+            self.coords_summary_label.configure(text=f"📍 {points.summary()}")
+            self.coords_summary.grid(row=0, column=0, columnspan=self.COORDS_PER_ROW, sticky="w", padx=2, pady=2)
+            self.add_coord_btn.configure(state="disabled")
+        else:
+            self.coord_buffer = None
+            if self.coords_summary is not None:
+                self.coords_summary.grid_forget()
+            self.add_coord_btn.configure(state="normal")
+            for i in range(len(points)):
+                x, y = points.point(i)
+                self._add_coord_row_internal(x, y, points.ref(i))
+
+    def _clear_coords(self):
+        self.set_coords(CoordBuffer.from_points([(0, 0)]))
+        self._on_change()
+
+    def get_coords(self):
+        """All points as a CoordBuffer (a copy)."""
+        if self.coord_buffer is not None:
+            return self.coord_buffer.copy()
+        return CoordBuffer.from_points(r.get_coord() + (r.ref,) for r in self.coord_rows)
+
+    def translate_coords(self, dx, dy):
+        """Shift every point, e.g. when switching between screen and window coordinates."""
+        if self.coord_buffer is not None:
+            self.set_coords(self.coord_buffer.translated(dx, dy))
+            return
+        for row in self.coord_rows:
+            x, y = row.get_coord()
+            row.set_coord(x + dx, y + dy, row.ref)
+
     def _reflow_coords(self):
         """Reposition all coord chips in a wrap/grid layout."""
         for widget in self.coords_frame.winfo_children():
@@ -373,12 +791,32 @@ class ActionFrame(ctk.CTkFrame):
             self._reflow_coords()
             self._on_change()
 
+    def set_window(self, window):
+        """Anchor coordinates to a window (by window key), or to the screen if None."""
+        self.window = window
+        if window:
+            label = key_label(window)
+            label = label if len(label) <= 10 else label[:9] + "…"
+            self.anchor_btn.configure(text=f"⚓ {label}", text_color="#09090b", fg_color=COLORS["accent"])
+            self.focus_check.configure(state="normal")
+            self.background_check.configure(state="normal")
+        else:
+            self.anchor_btn.configure(text="⚓ Screen", text_color=COLORS["text_secondary"], fg_color=COLORS["bg_card_hover"])
+            self.focus_check.configure(state="disabled")
+            self.background_check.configure(state="disabled")
+    
     def bind_hotkey(self):
         self.hotkey_btn.configure(text="⌨ ...", fg_color=COLORS["warning"])
         self.bind_callback(self)
 
     def get_data(self):
-        coords = [{"x": r.get_coord()[0], "y": r.get_coord()[1]} for r in self.coord_rows]
+        coords = []
+        for r in self.coord_rows:
+            x, y = r.get_coord()
+            coord = {"x": x, "y": y}
+            if r.ref is not None:
+                coord["ref"] = r.ref
+            coords.append(coord)
         try:
             delay_ms = int(self.delay_entry.get())
         except ValueError:
@@ -389,15 +827,39 @@ class ActionFrame(ctk.CTkFrame):
                 burst_count = 1
         except ValueError:
             burst_count = 5
-        return {
+        data = {
             "name": self.name_entry.get(),
             "hotkey": self.hotkey_btn.cget("text").replace("⌨️ ", "").replace("⌨ ", ""),
             "coords": coords,
             "mode": self.mode_menu.get(),
             "delay_ms": delay_ms,
             "burst_count": burst_count,
+            "wait_mode": self.wait_menu.get(),
+            "wait_fallback": self.wait_fallback_menu.get(),
+            "window": self.window,
+            "focus_only": self.focus_var.get() if self.window else False,
+            "delivery": "message" if self.window and self.background_var.get() else "cursor",
+            "priority": PRIORITY_HIGH if self.priority_var.get() else PRIORITY_NORMAL,
             "enabled": self.is_enabled
         }
+        if self.is_ladder:
+            data["ladder"] = {
+                "rows": max(1, self._ladder_value("rows", 1)),
+                "offset": [self._ladder_value("dx", 0), self._ladder_value("dy", 0)],
+            }
+        if self.coord_buffer is not None:
+            # Saved packed (see CoordBuffer.to_json) instead of one dict per point
+            del data["coords"]
+            data["coord_buffer"] = self.coord_buffer.copy()
+        if self.macro is not None:
+            data["macro"] = self.macro
+            data["time_scale"] = self._time_scale()
+        if self.is_group:
+            try:
+                data["group"] = parse_group_spec(self.group_entry.get())
+            except ValueError:
+                data["group"] = []  # Bad offset: left out until fixed
+        return data
     
     def _toggle_enabled(self):
         """Toggle action enabled/disabled state."""
@@ -488,6 +950,19 @@ class ActionFrame(ctk.CTkFrame):
         except:
             pass
     
+    def pause_animation(self):
+        """Temporarily stop the burst pulse (performance mode)."""
+        if self._burst_pulse_running:
+            self._stop_burst_pulse()
+            self._burst_pulse_paused = True
+    
+    def resume_animation(self):
+        """Restart the burst pulse if it was paused."""
+        if getattr(self, '_burst_pulse_paused', False):
+            self._burst_pulse_paused = False
+            if self.mode_menu.get() == "Burst":
+                self._start_burst_pulse()
+    
     def _stop_burst_pulse(self):
         """Stop the burst pulse animation."""
         self._burst_pulse_running = False
@@ -525,6 +1000,17 @@ class ActionFrame(ctk.CTkFrame):
     def _on_change(self):
         if self.on_change_callback:
             self.on_change_callback()
+
+    def _update_wait_fallback_visibility(self):
+        """The timeout fallback only applies to Change/Match waits."""
+        if self.wait_menu.get() == "Fixed":
+            self.wait_fallback_menu.pack_forget()
+        else:
+            self.wait_fallback_menu.pack(side="left", padx=(2, 0), after=self.wait_menu)
+
+    def _on_wait_mode_change(self, _):
+        self._update_wait_fallback_visibility()
+        self._on_change()
     
     def _format_delay(self, ms):
         """Format milliseconds with seconds conversion."""
@@ -595,7 +1081,7 @@ class CustomTitleBar(ctk.CTkFrame):
         window.geometry(f"+{x}+{y}")
 
 class App(ctk.CTk):
-    def __init__(self):
+    def __init__(self, config_manager=None, backend=None, window_provider=None):
         super().__init__()
         self.title("S-Trade-Executor")
         self.overrideredirect(True) # Remove default title bar
@@ -614,24 +1100,84 @@ class App(ctk.CTk):
         self.CARD_PADDING = 12
         self.MIN_HEIGHT = 300
         self.MAX_CARDS_VISIBLE = 3
-        
-        self.executor = Executor()
-        self.config_manager = ConfigManager()
+        self.MAX_TEST_CROSSHAIRS = 50
+        
+        self.config_manager = config_manager or ConfigManager()
+        self.log_listener = None  # Set by the entry point; flushed on close
+        self.gc_guard = GcGuard(self.config_manager.config.get("gc_pause_free", False))
+        self.input_backend = backend or default_backend()
+        # Single keyboard + mouse hook shared by binding, picking, cancel-on-move and the glow
+        self.input_hub = InputHub(self.input_backend)
+        try:
+            self.input_hub.start()
+        except Exception as e:
+            log.error("Failed to start input hooks: %s", e)
+        self.executor = self._create_executor()
+        self.window_tracker = None
+        self._start_window_tracker(window_provider)
+        # One card list and one container per profile; self.actions is the active one
+        self.active_profile = self.config_manager.get_active_profile()
+        self.profile_actions = {}
+        self.profile_frames = {}
         self.actions = []
+        self._loading = False
         
         self.picking_coord_row = None
+        self.mouse_listener = None
+        self.recorder = None
+        self.recording_frame = None
         self.binding_action = None
         self.is_paused = False
+        # Executions in flight: window lanes and the priority lane run several at once
+        self._executing = 0
+        self._executing_lock = threading.Lock()
+        self._pending_status = None
+        
+        # Event-loop lag monitor; stalls are blamed on these callbacks
+        self.lag_monitor = LagMonitor(self)
+        for name in ("auto_save", "refresh_executor", "_create_click_ripple", "_update_window_height"):
+            setattr(self, name, self.lag_monitor.track(getattr(self, name), name))
         
         self.setup_ui()
         self.load_config()
         self._update_window_height()  # Set initial height
         
+        # Pick up edits made to config.json by other tools while running
+        self.config_watcher = None
+        self.config_manager.conflict_callback = self._on_config_conflict
+        if self.config_manager.config.get("config_watch", True):
+            self.config_watcher = ConfigWatcher(self.config_manager, self._on_config_changed)
+            try:
+                self.config_watcher.start()
+            except Exception as e:
+                log.error("Failed to start config watcher: %s", e)
+        
         self.executor.set_status_callback(self.update_status_safe)
         self.executor.click_indicator_callback = self._show_click_indicator
         self.executor.execution_start_callback = self._on_execution_start
         self.executor.execution_end_callback = self._on_execution_end
+        self.executor.profile_callback = self._on_profile_switched
+        self.executor.set_panic_hotkey(
+            self.config_manager.config.get("panic_hotkey", self.config_manager.default_config["panic_hotkey"])
+        )
+        self.executor.set_profile_hotkeys(self.config_manager.get_profile_hotkeys())
         self.executor.start_listening()
+        # Lets other processes (strade_ctl.py) switch profiles
+        self.control_server = ControlServer({
+            CTL_PROFILE: lambda payload: self.executor.switch_profile(payload.decode("utf-8")),
+            CTL_TRIGGER: lambda payload: self.executor.trigger_hotkey(*unpack_trigger(payload)),
+        })
+        try:
+            self.control_server.start()
+        except Exception as e:
+            log.error("Failed to start control channel: %s", e)
+        self.hook_watchdog = None
+        self._start_hook_watchdog()
+        self.lag_monitor.start()
+        self.after(500, self._update_lag_display)
+        # Everything alive now (widgets, model, executor) is long-lived
+        self.after(1000, self.gc_guard.freeze)
+        self.after(250, self._collect_garbage_when_idle)
         self.update_state_display()
         # Setup taskbar visibility for overrideredirect window
         self.after(100, self.setup_taskbar)
@@ -639,11 +1185,16 @@ class App(ctk.CTk):
         
         # Glow effect for cursor during execution
         self._cursor_glow = None
+        self._glow_failsafe_id = None
+        self._glow_subscription = None
+        self._glow_target = None
+        self._glow_move_pending = False
         self._glow_running = False
         self._is_setting_up_taskbar = False
         
         # Test indicators
         self.test_indicators = []
+        self._crosshair_after_ids = []
         self.active_test_card = None
 
     def setup_ui(self):
@@ -682,6 +1233,65 @@ class App(ctk.CTk):
         )
         self.pause_btn.pack(side="left", padx=15, pady=12)
 
+        # Kill switch - cancels running and queued executions
+        self.kill_btn = ctk.CTkButton(
+            self.header_frame, 
+            text="🛑 Kill", 
+            width=70,
+            height=32,
+            fg_color=COLORS["danger"],
+            hover_color="#c42b1c",
+            text_color=COLORS["text_primary"],
+            corner_radius=16,
+            font=ctk.CTkFont(size=12, weight="bold"),
+            command=self.kill_all
+        )
+        self.kill_btn.pack(side="left", pady=12)
+
+        # Profile selector - every profile is precompiled, switching only swaps tables
+        self.profile_menu = ctk.CTkOptionMenu(
+            self.header_frame,
+            values=[self.active_profile],
+            width=100,
+            height=32,
+            fg_color=COLORS["bg_dark"],
+            button_color=COLORS["bg_card_hover"],
+            button_hover_color=COLORS["accent"],
+            dropdown_fg_color=COLORS["bg_card"],
+            corner_radius=8,
+            font=ctk.CTkFont(size=12),
+            command=self.select_profile
+        )
+        self.profile_menu.pack(side="left", padx=(10, 2), pady=12)
+
+        self.add_profile_btn = ctk.CTkButton(
+            self.header_frame, 
+            text="+", 
+            width=28,
+            height=32,
+            fg_color="transparent",
+            hover_color=COLORS["bg_card_hover"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=8,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            command=self.add_profile
+        )
+        self.add_profile_btn.pack(side="left", pady=12)
+
+        self.delete_profile_btn = ctk.CTkButton(
+            self.header_frame, 
+            text="−", 
+            width=28,
+            height=32,
+            fg_color="transparent",
+            hover_color=COLORS["bg_card_hover"],
+            text_color=COLORS["text_secondary"],
+            corner_radius=8,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            command=self.delete_profile
+        )
+        self.delete_profile_btn.pack(side="left", pady=12)
+
         self.add_btn = ctk.CTkButton(
             self.header_frame, 
             text="+ New Action", 
@@ -747,6 +1357,15 @@ class App(ctk.CTk):
         )
         self.version_label.pack(side="right", padx=15, pady=8)
         
+        # Current / worst event-loop lag
+        self.lag_label = ctk.CTkLabel(
+            self.status_frame, 
+            text="",
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"]
+        )
+        self.lag_label.pack(side="right", padx=(0, 6), pady=8)
+        
         # Cancel on mouse move toggle
         self.cancel_mouse_var = ctk.BooleanVar(value=False)
         self.cancel_mouse_switch = ctk.CTkSwitch(
@@ -763,7 +1382,215 @@ class App(ctk.CTk):
             button_hover_color=COLORS["accent"]
         )
         self.cancel_mouse_switch.pack(side="right", padx=(0, 10), pady=8)
+        
+        # Performance mode - suspend cosmetic animation while an execution runs
+        self.perf_mode_var = ctk.BooleanVar(value=self.config_manager.config.get("performance_mode", False))
+        self.perf_mode_switch = ctk.CTkSwitch(
+            self.status_frame,
+            text="Perf",
+            variable=self.perf_mode_var,
+            command=self._toggle_performance_mode,
+            width=40,
+            height=20,
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"],
+            progress_color=COLORS["accent"],
+            button_color=COLORS["text_primary"],
+            button_hover_color=COLORS["accent"]
+        )
+        self.perf_mode_switch.pack(side="right", padx=(0, 6), pady=8)
+        self.executor.performance_mode = self.perf_mode_var.get()
+        
+        # Real-time mode - priority, core pinning and timer resolution for the execution thread
+        self.realtime_var = ctk.BooleanVar(value=self.config_manager.config.get("realtime_mode", False))
+        self.realtime_switch = ctk.CTkSwitch(
+            self.status_frame,
+            text="RT",
+            variable=self.realtime_var,
+            command=self._toggle_realtime_mode,
+            width=40,
+            height=20,
+            font=ctk.CTkFont(size=10),
+            text_color=COLORS["text_secondary"],
+            progress_color=COLORS["accent"],
+            button_color=COLORS["text_primary"],
+            button_hover_color=COLORS["accent"]
+        )
+        self.realtime_switch.pack(side="right", padx=(0, 6), pady=8)
+        if self.realtime_var.get():
+            self.executor.set_realtime(True, self.config_manager.config.get("realtime_core"))
     
+    def _create_executor(self):
+        """Run the executor in-process, or in a separate engine process if configured."""
+        config = self.config_manager.config
+        journal_options = None
+        if config.get("journal_enabled", True):
+            journal_options = {
+                "path": config.get("journal_path", "journal/executions.jsonl"),
+                "max_bytes": config.get("journal_max_bytes", 5 * 1024 * 1024),
+                "backups": config.get("journal_backups", 5),
+            }
+        stats_block_name = config.get("stats_block_name", "strade_stats")
+        
+        if config.get("engine_mode", "thread") == "process":
+            try:
+                return EngineClient(
+                    stop_with_ui=config.get("engine_stop_with_ui", False),
+                    journal_options=journal_options,
+                    stats_block_name=stats_block_name,
+                    gc_pause_free=self.gc_guard.enabled,
+                    log_options=self._engine_log_options(),
+                    governor_options=config.get("governor")
+                )
+            except Exception as e:
+                log.error("Failed to start engine process, running in-process: %s", e)
+        
+        executor = Executor(self.input_backend)
+        executor.movement_detector = MovementDetector(self.input_hub)
+        executor.message_backend = default_message_backend()
+        executor.governor = InjectionGovernor.from_config(config.get("governor"))
+        executor.gc_guard = self.gc_guard
+        if journal_options:
+            try:
+                executor.journal = ExecutionJournal(**journal_options)
+            except Exception as e:
+                log.error("Failed to open execution journal: %s", e)
+        if stats_block_name:
+            try:
+                executor.stats_block = StatsBlock.create(stats_block_name)
+            except Exception as e:
+                log.error("Failed to create stats block: %s", e)
+        return executor
+
+    def _engine_log_options(self):
+        """The engine process logs next to the UI log, e.g. logs/strade_engine.log."""
+        config = self.config_manager.config
+        path = config.get("log_path", "logs/strade.log")
+        if path:
+            root, ext = os.path.splitext(path)
+            path = f"{root}_engine{ext}"
+        return {"path": path, "level": config.get("log_level", "INFO")}
+
+    def _toggle_performance_mode(self):
+        """Toggle performance mode and show the GIL wait measured so far."""
+        enabled = self.perf_mode_var.get()
+        self.executor.performance_mode = enabled
+        self.config_manager.config["performance_mode"] = enabled
+        self.config_manager.save_config()
+        
+        gil = self.executor.get_stats().get("gil_wait", {})
+        parts = [f"{label} {gil[label]['avg_us']:.0f}µs" for label in ("normal", "performance") if label in gil]
+        summary = f" | GIL wait avg: {', '.join(parts)}" if parts else ""
+        self.status_label.configure(text=f"Performance mode {'on' if enabled else 'off'}{summary}")
+    
+    def _toggle_realtime_mode(self):
+        """Toggle real-time mode; the executor reports the measured jitter in the status bar."""
+        enabled = self.realtime_var.get()
+        self.executor.set_realtime(enabled, self.config_manager.config.get("realtime_core"))
+        self.config_manager.config["realtime_mode"] = enabled
+        self.config_manager.save_config()
+        if enabled:
+            self.status_label.configure(text="Real-time mode: measuring jitter...")
+    
+    def _animations_suspended(self):
+        """True while an execution is running with performance mode on."""
+        return self._executing > 0 and self.perf_mode_var.get()
+    
+    def _suspend_animations(self):
+        """Pause all cosmetic animation for the duration of an execution."""
+        for action in self._all_actions():
+            action.pause_animation()
+    
+    def _resume_animations(self):
+        for action in self._all_actions():
+            action.resume_animation()
+        self._flush_status()
+
+    def _start_window_tracker(self, provider=None):
+        """Start the event-driven window cache used for anchoring and focus gating."""
+        try:
+            tracker = WindowTracker(provider or WinEventWindowProvider())
+            tracker.start()
+            self.window_tracker = tracker
+            self.executor.window_tracker = tracker
+        except Exception as e:
+            log.warning("Failed to start window tracker: %s", e)
+
+    def _start_hook_watchdog(self):
+        """Probe the shared hooks periodically and repair them if Windows dropped them."""
+        timings = dict(self.input_hub.hook_time)
+        if hasattr(self.executor, "hook_time"):
+            timings["hotkey"] = self.executor.hook_time
+        try:
+            self.hook_watchdog = HookWatchdog(
+                self.input_hub, self._reinstall_hooks, self._on_hook_health, timings
+            )
+            self.hook_watchdog.start()
+        except Exception as e:
+            log.error("Failed to start hook watchdog: %s", e)
+
+    def _reinstall_hooks(self):
+        """Watchdog thread: re-install the hub's hooks and every hotkey."""
+        self.input_hub.restart()
+        self.executor.reinstall_hotkeys()
+
+    def _on_hook_health(self, state, message):
+        """Watchdog thread: record the verdict and surface incidents in the status bar."""
+        self.executor.set_hook_health(state, message)
+        if message:
+            self.update_status_safe(f"⚠️ Hooks: {message}")
+
+    def _update_lag_display(self):
+        """Refresh the lag readout and export the lag histogram to the stats block (in either engine mode)."""
+        if not self._animations_suspended():
+            self.lag_label.configure(text=self.lag_monitor.format_status())
+        try:
+            self.executor.publish_ui_lag(self.lag_monitor.histogram.percentile(0.99),
+                                         self.lag_monitor.histogram.max_ns)
+        except Exception as e:
+            log.warning("Failed to publish UI lag: %s", e)
+        self.after(500, self._update_lag_display)
+
+    def _collect_garbage_when_idle(self):
+        """Run collection deferred by the GC guard once executions have been quiet."""
+        self.gc_guard.collect_if_idle()
+        self.after(250, self._collect_garbage_when_idle)
+
+    def _window_origin(self, action_frame):
+        """Current screen origin of an action's anchor window, (0, 0) if unanchored."""
+        if not action_frame or not action_frame.window:
+            return (0, 0)
+        if not self.window_tracker:
+            return None
+        return self.window_tracker.origins.get(action_frame.window)
+
+    def toggle_anchor(self, action_frame):
+        """Anchor an action to the window under its first coordinate, or release it."""
+        if not self.window_tracker:
+            self.status_label.configure(text="⚠️ Window tracking unavailable")
+            return
+        
+        if action_frame.window:
+            origin = self._window_origin(action_frame)
+            if origin is None:
+                self.status_label.configure(text=f"⚠️ Window '{action_frame.window}' not found")
+                return
+            action_frame.translate_coords(origin[0], origin[1])
+            action_frame.set_window(None)
+            self.status_label.configure(text="Coordinates anchored to screen")
+        else:
+            x, y = action_frame.get_coords().point(0)
+            key, origin = self.window_tracker.window_at(x, y)
+            if not key:
+                self.status_label.configure(text="⚠️ No window under first coordinate")
+                return
+            action_frame.translate_coords(-origin[0], -origin[1])
+            action_frame.set_window(key)
+            self.status_label.configure(text=f"⚓ Anchored to '{key}'")
+        
+        self.refresh_executor()
+        self.auto_save()
+
     def _toggle_cancel_on_move(self):
         """Toggle cancel on mouse move feature."""
         self.executor.cancel_on_mouse_move = self.cancel_mouse_var.get()
@@ -792,7 +1619,7 @@ class App(ctk.CTk):
             self.withdraw()
             self.after(10, self._finish_setup_taskbar)
         except Exception as e:
-            print(f"Failed to setup taskbar: {e}")
+            log.warning("Failed to setup taskbar: %s", e)
 
     def _finish_setup_taskbar(self):
         """Finalize taskbar setup and release the guard flag."""
@@ -824,22 +1651,32 @@ class App(ctk.CTk):
             # Re-apply taskbar styling after restoration
             self.after(10, self.setup_taskbar)
 
-    def add_action(self, data=None, is_new=False):
+    def add_action(self, data=None, is_new=False, profile=None, index=None):
         if data is None:
             data = {"name": "New Action", "hotkey": "Bind Key", "coords": [{"x": 0, "y": 0}], "mode": "Single", "delay_ms": 1000}
             is_new = True
+        profile = profile or self.active_profile
         
         frame = ActionFrame(
-            self.scroll_frame, 
+            self.profile_frames[profile], 
             data, 
             self.delete_action, 
             self.start_picking, 
             self.wait_for_hotkey, 
             self.test_action, 
-            on_change_callback=self._on_action_change
+            on_change_callback=self._on_action_change,
+            anchor_callback=self.toggle_anchor,
+            dry_run_callback=self.show_dry_run,
+            import_callback=self.import_coords,
+            record_callback=self.toggle_recording
         )
-        frame.pack(fill="x", pady=6)
-        self.actions.append(frame)
+        actions = self.profile_actions[profile]
+        if index is not None and index < len(actions):
+            frame.pack(fill="x", pady=6, before=actions[index])
+            actions.insert(index, frame)
+        else:
+            frame.pack(fill="x", pady=6)
+            actions.append(frame)
         self._update_window_height()
         self.auto_save()
         
@@ -859,17 +1696,189 @@ class App(ctk.CTk):
         self._clear_test_indicators()
         self.active_test_card = action_frame
         
-        data = action_frame.get_data()
-        coords = data.get('coords', [])
+        points = action_frame.get_coords()
+        if action_frame.is_ladder:
+            # Preview every row of the ladder
+            points = CoordBuffer()
+            for row in compile_action(action_frame.get_data())["ladder_table"]:
+                points.extend(row)
+        if action_frame.macro is not None:
+            # Preview where the recording clicks
+            points = CoordBuffer.from_points(
+                (x, y) for _, kind, x, y, _ in action_frame.macro.events() if kind == BUTTON_DOWN
+            )
+        origin = self._window_origin(action_frame)
+        if origin is None:
+            self.active_test_card = None
+            self.status_label.configure(text=f"⚠️ Window '{action_frame.window}' not found")
+            return
+        ox, oy = origin
         
-        for i, coord in enumerate(coords):
+        # A crosshair is a window each; large point sets only show the first ones
+        shown = min(len(points), self.MAX_TEST_CROSSHAIRS)
+        for i in range(shown):
+            x, y = points.point(i)
             # No delay for showing all at once, or small delay for effect
-            self.after(i * 50, lambda c=coord, idx=i+1: self._show_crosshair(c['x'], c['y'], idx))
+            self._crosshair_after_ids.append(
+                self.after(i * 50, lambda x=x, y=y, idx=i+1: self._show_crosshair(x + ox, y + oy, idx))
+            )
+        
+        count = f"{shown} of {len(points):,}" if shown < len(points) else f"{shown}"
+        self.status_label.configure(text=f"Testing {count} coordinate(s) - Click Test again to hide")
+
+    def import_coords(self, action_frame):
+        """Offer the import sources (clipboard or CSV file) under the action's ⇪ button."""
+        menu = tk.Menu(self, tearoff=0)
+        menu.add_command(label="From clipboard…", command=lambda: self._import_coords_from_clipboard(action_frame))
+        menu.add_command(label="From file…", command=lambda: self._import_coords_from_file(action_frame))
+        button = action_frame.import_btn
+        try:
+            menu.tk_popup(button.winfo_rootx(), button.winfo_rooty() + button.winfo_height())
+        finally:
+            menu.grab_release()
+
+    def _import_coords_from_clipboard(self, action_frame):
+        try:
+            points = CoordBuffer.from_csv(self.clipboard_get())
+        except tk.TclError:
+            self.status_label.configure(text="⚠️ Import failed: the clipboard is empty")
+            return
+        except ValueError as e:
+            self.status_label.configure(text=f"⚠️ Import failed: {e}")
+            return
+        self._replace_coords(action_frame, points, "clipboard")
+
+    def _import_coords_from_file(self, action_frame):
+        path = filedialog.askopenfilename(
+            parent=self,
+            title="Import coordinates",
+            filetypes=[("CSV", "*.csv *.txt"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            with open(path, encoding="utf-8-sig") as f:
+                points = CoordBuffer.from_csv(f.read())
+        except (OSError, ValueError) as e:
+            self.status_label.configure(text=f"⚠️ Import failed: {e}")
+            return
+        self._replace_coords(action_frame, points, os.path.basename(path))
+
+    def _replace_coords(self, action_frame, points, source):
+        """Replace an action's points with imported ones, asking first if it already has some."""
+        current = action_frame.get_coords()
+        if any(current.xy) and not messagebox.askyesno(
+            "Replace coordinates",
+            f"Replace the {len(current):,} existing point(s) with {len(points):,} from {source}?",
+            parent=self
+        ):
+            return
+        action_frame.set_coords(points)
+        action_frame._on_change()
+        self.status_label.configure(text=f"Imported {len(points):,} point(s) from {source}")
+
+    def toggle_recording(self, action_frame):
+        """Start recording a macro into an action, or stop the running recording."""
+        recording = self.recording_frame
+        if recording is not None:
+            self._stop_recording()
+            if recording is action_frame:
+                return
+        # Clicks on this window (like the ⏹ that ends the recording) are not part of the macro
+        left, top = self.winfo_rootx(), self.winfo_rooty()
+        right, bottom = left + self.winfo_width(), top + self.winfo_height()
+        self.recorder = MacroRecorder(
+            self.input_hub,
+            ignore=lambda x, y: left <= x < right and top <= y < bottom,
+            on_stop=lambda: self.after(0, self._stop_recording)
+        )
+        self.recording_frame = action_frame
+        # Hotkeys pressed while recording are recorded, not executed
+        self.executor.unregister_all()
+        self.recorder.start()
+        action_frame.set_recording(True)
+        self.status_label.configure(text="⏺ Recording... press Esc or ⏹ to stop", text_color=COLORS["danger"])
+
+    def _stop_recording(self):
+        action_frame, self.recording_frame = self.recording_frame, None
+        if action_frame is None:
+            return
+        macro = self.recorder.stop().simplified()
+        self.recorder = None
+        action_frame.set_recording(False)
+        # Anchored actions replay relative to their window
+        origin = self._window_origin(action_frame) or (0, 0)
+        if origin != (0, 0):
+            macro = macro.translated(-origin[0], -origin[1])
+        action_frame.set_macro(macro)
+        if len(macro):
+            self.status_label.configure(text=f"✅ Recorded {macro.summary()}", text_color=COLORS["success"])
+        else:
+            self.status_label.configure(text="Nothing recorded", text_color=COLORS["text_secondary"])
+        self.after(2000, lambda: self.status_label.configure(text_color=COLORS["text_secondary"]))
+        self.refresh_executor()
+        self.auto_save()
+
+    def show_dry_run(self, action_frame):
+        """Simulate an action on a virtual clock and show its timeline."""
+        data = action_frame.get_data()
+        try:
+            if group_of(data):
+                data = compile_group(data, {a.get_data()["name"]: a.get_data() for a in self.actions})
+            lines = dry_run(data, self.window_tracker)
+        except Exception as e:
+            self.status_label.configure(text=f"⚠️ Dry run failed: {e}")
+            return
+        
+        window = ctk.CTkToplevel(self)
+        window.geometry("420x360")
+        window.overrideredirect(True)
+        window.attributes("-topmost", True)
+        window.configure(fg_color=COLORS["border"])
+        window.transient(self)
+        
+        container = ctk.CTkFrame(window, fg_color=COLORS["bg_dark"], corner_radius=0)
+        container.pack(fill="both", expand=True, padx=1, pady=1)
+        
+        title_bar = CustomTitleBar(
+            container, 
+            title=f"Dry Run - {data['name']}", 
+            height=30,
+            close_command=window.destroy
+        )
+        title_bar.pack(fill="x")
+        
+        note = "Change/Match waits are shown at their timeout (worst case)"
+        if data.get("wait_mode", "Fixed") == "Fixed":
+            note = "Simulated timeline, no clicks sent"
+        if ladder_of(data):
+            note += " · ladder row 1"
+        ctk.CTkLabel(
+            container,
+            text=note,
+            font=ctk.CTkFont(size=11),
+            text_color=COLORS["text_secondary"]
+        ).pack(fill="x", padx=10, pady=(6, 2))
+        
+        textbox = ctk.CTkTextbox(
+            container,
+            fg_color=COLORS["bg_card"],
+            text_color=COLORS["text_primary"],
+            font=ctk.CTkFont(family="Consolas", size=11),
+            corner_radius=6
+        )
+        textbox.pack(fill="both", expand=True, padx=10, pady=(2, 10))
+        textbox.insert("end", "\n".join(lines))
+        textbox.configure(state="disabled")
         
-        self.status_label.configure(text=f"Testing {len(coords)} coordinate(s) - Click Test again to hide")
+        self.status_label.configure(text=f"Dry run: {data['name']} ({len(lines)} events)")
 
     def _clear_test_indicators(self):
         """Clear all active test indicators."""
+        # Crosshairs still waiting to be shown would otherwise outlive the clear
+        for after_id in self._crosshair_after_ids:
+            self.after_cancel(after_id)
+        self._crosshair_after_ids.clear()
         for indicator in self.test_indicators:
             try:
                 indicator.destroy()
@@ -931,6 +1940,8 @@ class App(ctk.CTk):
     
     def _show_click_indicator(self, x, y):
         """Show a quick visual indicator at click position during autoclick."""
+        if self._animations_suspended():
+            return
         # Use after to run on main thread since this is called from executor thread
         self.after(0, lambda: self._create_click_ripple(x, y))
     
@@ -942,7 +1953,7 @@ class App(ctk.CTk):
         try:
             indicator = ctk.CTkToplevel(self)
             # Hard safety timeout to ensure destruction even if animation fails
-            self.after(1000, lambda: self._safe_destroy(indicator))
+            failsafe_id = self.after(1000, lambda: self._safe_destroy(indicator))
             
             indicator.geometry(f"{size}x{size}+{x-half}+{y-half}")
             indicator.overrideredirect(True)
@@ -959,6 +1970,7 @@ class App(ctk.CTk):
             
             def expand(step=0):
                 if step >= 15: # Slightly more steps for smoother finish
+                    self.after_cancel(failsafe_id)
                     self._safe_destroy(indicator)
                     return
                 try:
@@ -981,14 +1993,28 @@ class App(ctk.CTk):
             pass
     
     def _on_execution_start(self):
-        """Called when autoclick execution starts."""
+        """Called when autoclick execution starts (any thread); effects start with the first one."""
+        with self._executing_lock:
+            self._executing += 1
+            first = self._executing == 1
+        if not first:
+            return
+        if self.perf_mode_var.get():
+            # No glow, ripples or pulses: keep the Tk thread off the GIL
+            self.after(0, self._suspend_animations)
+            return
         self._glow_running = True
         self.after(0, self._create_cursor_glow)
     
     def _on_execution_end(self):
-        """Called when autoclick execution ends."""
+        """Called when autoclick execution ends; effects stop with the last one."""
+        with self._executing_lock:
+            self._executing = max(0, self._executing - 1)
+            if self._executing:
+                return
         self._glow_running = False
         self.after(0, self._destroy_cursor_glow)
+        self.after(0, self._resume_animations)
     
     def _create_cursor_glow(self):
         """Create a glow effect that follows the cursor."""
@@ -1003,13 +2029,11 @@ class App(ctk.CTk):
         
         try:
             # Get current mouse position for initial placement
-            pt = ctypes.wintypes.POINT()
-            ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
-            x, y = pt.x, pt.y
+            x, y = self.input_hub.position or self.input_backend.cursor_pos()
             
             glow = ctk.CTkToplevel(self)
             # Safety timeout - destroy glow if it stays longer than 10s (failsafe)
-            self.after(10000, lambda: self._safe_destroy(glow))
+            self._glow_failsafe_id = self.after(10000, lambda: self._safe_destroy(glow))
             
             # Check if execution already ended while we were creating the window
             if not self._glow_running:
@@ -1037,17 +2061,25 @@ class App(ctk.CTk):
             self._glow_canvas = canvas
             self._glow_size = size
             
-            # Start position update loop
-            self._update_glow_position()
+            # Follow the cursor from hub move events instead of polling it
+            self._glow_subscription = self.input_hub.subscribe_moves(self._on_glow_move)
             
             # Start pulsing effect
             self._glow_pulse_state = 0
             self._pulse_glow()
         except Exception as e:
-            print(f"Failed to create cursor glow: {e}")
+            log.warning("Failed to create cursor glow: %s", e)
     
+    def _on_glow_move(self, x, y, injected):
+        """Hub move event (hook thread): schedule at most one pending glow update."""
+        self._glow_target = (x, y)
+        if not self._glow_move_pending:
+            self._glow_move_pending = True
+            self.after(0, self._update_glow_position)
+
     def _update_glow_position(self):
-        """Update glow position to follow cursor."""
+        """Move the glow to the latest cursor position."""
+        self._glow_move_pending = False
         if not self._glow_running or not self._cursor_glow or self._cursor_glow == "placeholder":
             return
         
@@ -1057,16 +2089,9 @@ class App(ctk.CTk):
                 self._glow_running = False
                 return
 
-            # Get current mouse position
-            pt = ctypes.wintypes.POINT()
-            ctypes.windll.user32.GetCursorPos(ctypes.byref(pt))
-            x, y = pt.x, pt.y
-            
+            x, y = self._glow_target
             half = self._glow_size // 2
             self._cursor_glow.geometry(f"{self._glow_size}x{self._glow_size}+{x-half}+{y-half}")
-            
-            # Continue updating
-            self.after(16, self._update_glow_position)  # ~60fps
         except:
             # If update fails multiple times, cleanup
             self._safe_destroy(self._cursor_glow)
@@ -1091,13 +2116,19 @@ class App(ctk.CTk):
     def _destroy_cursor_glow(self):
         """Destroy the cursor glow effect."""
         self._glow_running = False
+        if self._glow_subscription:
+            self._glow_subscription.cancel()
+            self._glow_subscription = None
         if self._cursor_glow:
             if self._cursor_glow == "placeholder":
                 # Race condition: Window is being created right now.
                 # Schedule another attempt to destroy it once it's finished.
                 self.after(50, self._destroy_cursor_glow)
                 return
-                
+            
+            if self._glow_failsafe_id:
+                self.after_cancel(self._glow_failsafe_id)
+                self._glow_failsafe_id = None
             try:
                 self._cursor_glow.destroy()
             except:
@@ -1150,14 +2181,17 @@ class App(ctk.CTk):
         self.picking_coord_row = coord_row
         self.status_label.configure(text="🎯 Middle-click to pick coordinate...")
         
-        self.mouse_listener = mouse.Listener(on_click=self.on_pick_click)
-        self.mouse_listener.start()
+        # Re-picking replaces the previous listener instead of stacking another
+        if self.mouse_listener:
+            self.mouse_listener.stop()
+        self.mouse_listener = self.input_hub.subscribe_clicks(self.on_pick_click)
 
-    def on_pick_click(self, x, y, button, pressed):
-        if not pressed:
+    def on_pick_click(self, x, y, button, pressed, injected):
+        if not pressed or injected:
             return
         
-        if button == mouse.Button.middle:
+        if button == "middle":
+            self.mouse_listener = None
             if self.picking_coord_row:
                 # Stop blinking animations if running
                 if hasattr(self, '_blinking_coord_row') and self._blinking_coord_row:
@@ -1165,7 +2199,12 @@ class App(ctk.CTk):
                     self._blinking_coord_row = None
                 self._stop_status_blinking()
                 
-                self.picking_coord_row.set_coord(int(x), int(y))
+                # Remember what the screen looks like here for "Match" wait steps
+                ref = self.executor.capture_reference(int(x), int(y))
+                # Anchored actions store coordinates relative to their window
+                owner = next((a for a in self.actions if self.picking_coord_row in a.coord_rows), None)
+                origin = self._window_origin(owner) or (0, 0)
+                self.picking_coord_row.set_coord(int(x) - origin[0], int(y) - origin[1], ref)
                 self.picking_coord_row = None
                 self.status_label.configure(text="✅ Coordinate set! Setup complete.", text_color=COLORS["success"])
                 
@@ -1179,7 +2218,7 @@ class App(ctk.CTk):
     def wait_for_hotkey(self, action_frame):
         self.binding_action = action_frame
         self.status_label.configure(text="⌨️ Press any key to bind...")
-        threading.Thread(target=self._listen_for_key).start()
+        self.input_hub.capture_hotkey(self._listen_for_key)
     
     def _start_blinking(self, widget, attr="fg_color", color1=None, color2=None, interval=400):
         """Start blinking animation on a widget. Returns animation ID."""
@@ -1263,12 +2302,10 @@ class App(ctk.CTk):
         self._start_blinking(action_frame.hotkey_btn, "fg_color", COLORS["warning"], COLORS["accent_secondary"])
         self._start_status_blinking("Step 1/2: ⌨️ Press hotkey to bind...")
         
-        threading.Thread(target=self._listen_for_key_guided).start()
+        self.input_hub.capture_hotkey(self._listen_for_key_guided)
     
-    def _listen_for_key_guided(self):
-        """Listen for hotkey during guided setup."""
-        import keyboard
-        key = keyboard.read_hotkey(suppress=False)
+    def _listen_for_key_guided(self, key):
+        """Receive the hotkey captured during guided setup."""
         if hasattr(self, '_guided_action') and self._guided_action:
             action_frame = self._guided_action
             
@@ -1304,11 +2341,11 @@ class App(ctk.CTk):
             self._blinking_coord_row = coord_row
             self.start_picking(coord_row)
 
-    def _listen_for_key(self):
-        import keyboard
-        key = keyboard.read_hotkey(suppress=False)
-        if self.binding_action:
-            self.after(0, lambda: self.binding_action.hotkey_btn.configure(
+    def _listen_for_key(self, key):
+        action_frame = self.binding_action
+        if action_frame:
+            # binding_action is cleared below, before the UI callbacks run
+            self.after(0, lambda: action_frame.hotkey_btn.configure(
                 text=f"⌨ {key}", 
                 fg_color=COLORS["accent"]
             ))
@@ -1318,19 +2355,118 @@ class App(ctk.CTk):
             self.after(0, self.auto_save)
 
     def update_status_safe(self, message):
+        if self._animations_suspended():
+            # Coalesce status updates: keep only the latest and flush at most every 100ms
+            pending = self._pending_status is not None
+            self._pending_status = message
+            if not pending:
+                self.after(100, self._flush_status)
+            return
         self.after(0, lambda: self.status_label.configure(text=message))
+    
+    def _flush_status(self):
+        message, self._pending_status = self._pending_status, None
+        if message is not None:
+            self.status_label.configure(text=message)
 
     def refresh_executor(self):
-        self.executor.unregister_all()
-        if not self.is_paused:
-            for action in self.actions:
+        if self.is_paused:
+            self.executor.unregister_all()
+            self.update_state_display()
+            return
+        # Build every profile's table up front; the executor only hooks new combos
+        tables = {}
+        for profile, actions in self.profile_actions.items():
+            table = tables[profile] = {}
+            by_name = {data["name"]: data for data in (action.get_data() for action in actions)}
+            for action in actions:
                 data = action.get_data()
+                if data.get("window") and self.window_tracker:
+                    self.window_tracker.watch(data["window"])
                 # Only register enabled actions with valid hotkeys
                 if data.get("enabled", True) and data["hotkey"] and data["hotkey"] not in ["None", "Bind Key", "Press..."]:
-                    # Pass get_data callback instead of static data
-                    # This allows reading fresh settings at execution time
-                    self.executor.register_hotkey(data["hotkey"], action.get_data)
+                    if group_of(data):
+                        # Members are merged into one timeline now; edits to them re-run this
+                        try:
+                            table[data["hotkey"]] = compile_group(data, by_name)
+                        except ValueError as e:
+                            log.warning("%s", e)
+                            self.status_label.configure(text=f"⚠️ {e}")
+                    elif data.get("ladder"):
+                        # Ladder rows are precomputed once here, not per trigger
+                        table[data["hotkey"]] = compile_action(data)
+                    else:
+                        # Pass get_data callback instead of static data
+                        # This allows reading fresh settings at execution time
+                        table[data["hotkey"]] = action.get_data
+        self.executor.set_profile_tables(tables, self.active_profile)
+        self.update_state_display()
+
+    def _all_actions(self):
+        return [action for actions in self.profile_actions.values() for action in actions]
+
+    def _create_profile(self, name):
+        self.profile_actions[name] = []
+        self.profile_frames[name] = ctk.CTkFrame(self.scroll_frame, fg_color="transparent")
+        self.profile_menu.configure(values=list(self.profile_actions))
+
+    def select_profile(self, name):
+        """Profile menu: ask the executor to switch; the UI follows in _on_profile_switched."""
+        if name == self.active_profile:
+            return
+        if not self.executor.switch_profile(name):
+            self.profile_menu.set(self.active_profile)
+
+    def _on_profile_switched(self, name, elapsed_ns):
+        """Executor callback (any thread, incl. hotkey and control channel switches)."""
+        self.after(0, lambda: self._show_profile(name, elapsed_ns))
+
+    def _show_profile(self, name, elapsed_ns=None):
+        """Show an already built profile: its container is swapped in, nothing is rebuilt."""
+        if name not in self.profile_frames:
+            return
+        if name != self.active_profile:
+            self.profile_frames[self.active_profile].pack_forget()
+            self.active_profile = name
+        self.profile_frames[name].pack(fill="x")
+        self.actions = self.profile_actions[name]
+        self.profile_menu.set(name)
+        self._update_window_height()
         self.update_state_display()
+        if not self._loading:
+            self.config_manager.config["active_profile"] = name
+            self.config_manager.save_config()
+        if elapsed_ns is not None:
+            self.status_label.configure(text=f"Profile {name} (switch {elapsed_ns / 1000:.1f}µs)")
+
+    def add_profile(self):
+        dialog = ctk.CTkInputDialog(text="Profile name:", title="New Profile")
+        name = (dialog.get_input() or "").strip()
+        if not name or name in self.profile_actions:
+            return
+        self._create_profile(name)
+        self.auto_save()
+        self.refresh_executor()
+        self.select_profile(name)
+
+    def delete_profile(self):
+        """Delete the active profile (the last one is kept)."""
+        if len(self.profile_actions) < 2:
+            self.status_label.configure(text="⚠️ The last profile cannot be deleted")
+            return
+        name = self.active_profile
+        for action in self.profile_actions.pop(name):
+            action._stop_burst_pulse()
+        self.profile_frames.pop(name).destroy()
+        self.profile_menu.configure(values=list(self.profile_actions))
+        self.active_profile = next(iter(self.profile_actions))
+        self._show_profile(self.active_profile)
+        self.refresh_executor()
+        self.auto_save()
+    
+    def kill_all(self):
+        """Kill switch: stop every running and queued execution."""
+        self.executor.cancel_all()
     
     def toggle_pause(self):
         self.is_paused = not self.is_paused
@@ -1368,14 +2504,94 @@ class App(ctk.CTk):
 
     def auto_save(self):
         """Automatically save current configuration."""
-        data = [a.get_data() for a in self.actions]
-        self.config_manager.save_actions(data)
+        if self._loading:
+            return  # Profiles not loaded yet would be dropped from the file
+        data = {
+            profile: [a.get_data() for a in actions]
+            for profile, actions in self.profile_actions.items()
+        }
+        self.config_manager.save_profiles(data, self.active_profile)
+
+    def _on_config_changed(self, change):
+        """Watcher thread: the change is parsed and diffed already, apply it on the UI thread."""
+        self.after(0, lambda: self._apply_config_change(change))
+
+    def _on_config_conflict(self, path, data):
+        """Our save lost to an external edit: adopt that edit, as the watcher would."""
+        self.update_status_safe(f"⚠️ config.json edited externally, local copy: {os.path.basename(path)}")
+        try:
+            config = json.loads(data)
+        except ValueError as e:
+            log.warning("External config not parseable, keeping ours: %s", e)
+            return
+        change = ConfigChange(config, digest_of(data), None, self.config_manager.version)
+        self.after(0, lambda: self._apply_config_change(change))
+
+    def _apply_config_change(self, change):
+        """Apply an external config edit: only added, removed or changed cards are touched."""
+        diff = change.diff_for(self.config_manager)
+        self.config_manager.apply_external(change.config, change.digest)
+        if diff.is_empty():
+            return
+        self._loading = True  # The file already holds this state; don't save it back
+        try:
+            for profile, actions in diff.added_profiles.items():
+                self._create_profile(profile)
+                for action_data in actions:
+                    self.add_action(action_data, profile=profile)
+            for profile, ops in diff.actions.items():
+                actions = self.profile_actions[profile]
+                # Back to front, so earlier indices stay valid
+                for tag, i1, i2, new in reversed(ops):
+                    for frame in actions[i1:i2]:
+                        self._discard_action_frame(frame)
+                    del actions[i1:i2]
+                    for offset, action_data in enumerate(new):
+                        self.add_action(action_data, profile=profile, index=i1 + offset)
+            if self.active_profile in diff.removed_profiles:
+                self._show_profile(self.config_manager.get_active_profile())
+            for profile in diff.removed_profiles:
+                for frame in self.profile_actions.pop(profile):
+                    self._discard_action_frame(frame)
+                self.profile_frames.pop(profile).destroy()
+            self.profile_menu.configure(values=list(self.profile_actions))
+        finally:
+            self._loading = False
+        
+        if "panic_hotkey" in diff.settings:
+            self.executor.set_panic_hotkey(diff.settings["panic_hotkey"])
+        if "profile_hotkeys" in diff.settings:
+            self.executor.set_profile_hotkeys(diff.settings["profile_hotkeys"])
+        pending = sorted(key for key in diff.settings if key not in LIVE_SETTINGS)
+        if pending:
+            log.info("Config settings take effect after restart: %s", ", ".join(pending))
+        self.refresh_executor()
+        active = self.config_manager.get_active_profile()
+        if active != self.active_profile:
+            self.executor.switch_profile(active)
+        added, removed, changed = diff.counts()
+        self.status_label.configure(text=f"Config reloaded: +{added} −{removed} ~{changed}")
+
+    def _discard_action_frame(self, frame):
+        if self.binding_action is frame:
+            self.binding_action = None
+        if self.active_test_card is frame:
+            self._clear_test_indicators()
+            self.active_test_card = None
+        frame._stop_burst_pulse()
+        frame.destroy()
 
     def load_config(self):
         """Load saved configuration."""
-        actions = self.config_manager.get_actions()
-        for action_data in actions:
-            self.add_action(action_data)
+        self._loading = True
+        try:
+            for profile, actions in self.config_manager.get_profiles().items():
+                self._create_profile(profile)
+                for action_data in actions:
+                    self.add_action(action_data, profile=profile)
+            self._show_profile(self.active_profile)
+        finally:
+            self._loading = False
         self.refresh_executor()
 
     def show_help(self):
@@ -1437,22 +2653,93 @@ class App(ctk.CTk):
              "• Klik tombol koordinat, lalu middle-click\n"
              "  di posisi target di layar\n"
              "• Klik '+' untuk menambah koordinat\n"
-             "• Klik '×' untuk menghapus koordinat"),
+             "• Klik '×' untuk menghapus koordinat\n"
+             "• Klik '⚓' untuk mengikat koordinat ke jendela\n"
+             "  (tetap tepat walau jendela dipindah)\n"
+             "• 'Focus only': hanya eksekusi jika jendela\n"
+             "  target sedang aktif\n"
+             "• 'Background': klik jendela ter-anchor tanpa\n"
+             "  menggeser kursor, paralel per jendela"),
             
             ("⚙️ Pengaturan", 
              "• Mode: Single (1x), Double (2x), Burst (5x)\n"
              "• Delay: Jeda antar klik (dalam ms)\n"
-             "  1000 ms = 1 detik"),
+             "  1000 ms = 1 detik\n"
+             "• Wait: Fixed = tunggu delay penuh\n"
+             "  Change = lanjut saat layar berubah\n"
+             "  Match = lanjut saat layar sama seperti\n"
+             "  waktu koordinat dipilih (delay = timeout)"),
             
             ("▶ Test (Toggle)", 
              "• Klik 'Test' untuk menampilkan crosshair (Show)\n"
              "• Klik lagi untuk menyembunyikan (Hide)\n"
-             "• Klik pada crosshair untuk menghapusnya"),
+             "• Klik pada crosshair untuk menghapusnya\n"
+             "• Klik '⏱' untuk dry run: lihat urutan klik\n"
+             "  & waktunya tanpa benar-benar mengklik"),
             
             ("⏸ Pause/Resume", 
              "• Klik tombol 'Active/Resume' untuk\n"
              "  menghentikan sementara semua hotkey\n"
              "• Indikator merah = Paused (Aman)"),
+            
+            ("🛑 Kill Switch", 
+             "• Klik '🛑 Kill' atau tekan Ctrl+Alt+K untuk\n"
+             "  membatalkan semua eksekusi (berjalan & antre)\n"
+             "• Hotkey bisa diubah lewat 'panic_hotkey'\n"
+             "  di config.json"),
+            
+            ("⚡ Perf Mode", 
+             "• Saat eksekusi berjalan, animasi (glow,\n"
+             "  ripple, pulse) dihentikan sementara agar\n"
+             "  eksekusi tidak terganggu UI"),
+            
+            ("⏱ Real-Time (RT)", 
+             "• Prioritas tinggi, thread eksekusi dikunci\n"
+             "  ke satu core & resolusi timer 1ms\n"
+             "• Jitter sebelum → sesudah tampil di status"),
+            
+            ("🚦 Batas Laju Klik", 
+             "• Atur \"governor\" di config.json: klik/detik\n"
+             "  rata-rata, burst maksimum & per jendela\n"
+             "• Centang Priority agar aksi tidak ikut antre\n"
+             "• Kill switch tetap langsung membatalkan"),
+            
+            ("🩺 Hook Watchdog", 
+             "• Hook keyboard & mouse dicek tiap 5 detik\n"
+             "• Jika Windows mencabut hook, hook dipasang\n"
+             "  ulang & semua hotkey didaftarkan kembali\n"
+             "• Insiden tampil di status bar"),
+            
+            ("⇪ Impor Koordinat", 
+             "• Salin daftar 'x,y' (satu per baris) lalu\n"
+             "  klik '⇪', atau pilih file CSV\n"
+             "• Lebih dari 16 titik tampil sebagai ringkasan\n"
+             "  dan disimpan ringkas di config.json"),
+            
+            ("☰ Ladder", 
+             "• Klik '☰': koordinat = baris 1, diulang\n"
+             "  tiap Step x/y sebanyak Rows baris\n"
+             "• Tekan hotkey lalu angka 1-9 (0 = 10)\n"
+             "  untuk mengklik baris tersebut"),
+            
+            ("⧉ Grup Aksi", 
+             "• Klik '⧉', isi Actions: Nama@ms, Nama@ms\n"
+             "  (mis. Cancel all@0, Requote@150)\n"
+             "• Satu hotkey menjalankan semua aksi itu\n"
+             "  dalam satu timeline, satu kill switch"),
+            
+            ("⏺ Rekam Makro", 
+             "• Klik '⏺', lakukan klik/tombol, Esc = stop\n"
+             "• Hotkey memutar ulang dengan jeda asli\n"
+             "• Speed × 4 = empat kali lebih cepat"),
+            
+            ("🗂 Profil", 
+             "• Pilih profil di header, '+' untuk profil\n"
+             "  baru, '−' untuk menghapus profil aktif\n"
+             "• Semua profil sudah siap di background,\n"
+             "  pindah profil hanya menukar tabel hotkey\n"
+             "• Hotkey profil: 'hotkey' di config.json\n"
+             "  atau: python strade_ctl.py profile NAMA"),
              
              ("ℹ️ Tentang",
               "S-Trade-Executor v1.0\n"
@@ -1488,12 +2775,26 @@ class App(ctk.CTk):
             # Stop all animations and timers
             self._destroy_cursor_glow()
             
+            if self.window_tracker:
+                self.window_tracker.stop()
+            
             # Stop burst pulse animations for all action cards
-            for action in self.actions:
+            for action in self._all_actions():
                 if hasattr(action, '_stop_burst_pulse'):
                     action._stop_burst_pulse()
             
             # Unregister all keyboard hooks
+            if self.mouse_listener:
+                self.mouse_listener.stop()
+            if self.recorder:
+                self.recorder.stop()
+            if self.hook_watchdog:
+                self.hook_watchdog.stop()
+            self.control_server.stop()
+            if self.config_watcher:
+                self.config_watcher.stop()
+            self.lag_monitor.stop()
+            self.input_hub.stop()
             self.executor.stop_listening()
             
             # Clear all callbacks to prevent any pending calls
@@ -1507,8 +2808,9 @@ class App(ctk.CTk):
         except:
             pass
         finally:
+            if self.log_listener:
+                self.log_listener.stop()
             # Force exit the process to ensure no hanging threads
-            import os
             os._exit(0)
 
 if __name__ == "__main__":
@@ -1521,6 +2823,12 @@ if __name__ == "__main__":
         except:
             pass
             
-    app = App()
+    config_manager = ConfigManager()
+    log_listener = setup_logging(
+        config_manager.config.get("log_path", "logs/strade.log"),
+        config_manager.config.get("log_level", "INFO")
+    )
+    app = App(config_manager=config_manager)
+    app.log_listener = log_listener
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
@@ -0,0 +1,167 @@
+import ctypes
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from input_backend import InputBackend
+from window_tracker import Rect, shared_window_index
+
+
+class MessageBackend:
+    """Delivers clicks to a window as window messages instead of real input.
+
+    The cursor is never moved, so actions aimed at different windows do
+    not compete for it and can run at the same time. Windows are
+    identified by the same key as window anchors (see window_key());
+    points are screen coordinates and are converted to the target's
+    client area by the backend.
+    """
+
+    def post_move(self, window: str, x: int, y: int):
+        raise NotImplementedError
+
+    def post_button(self, window: str, x: int, y: int, button: str, down: bool):
+        raise NotImplementedError
+
+    def post_key(self, window: str, key_combo: str):
+        """Press and release a combo in the window (messages only: GetKeyState does not see it)."""
+        raise NotImplementedError
+
+
+class WindowsMessageBackend(MessageBackend):
+    """PostMessageW to a cached window handle; the child control under the point gets the message."""
+
+    WM_MOUSEMOVE = 0x0200
+    WM_KEYDOWN = 0x0100
+    WM_KEYUP = 0x0101
+    BUTTON_MESSAGES = {"left": (0x0201, 0x0202, 0x0001), "right": (0x0204, 0x0205, 0x0002)}  # down, up, MK_*
+    CWP_SKIPINVISIBLE_DISABLED_TRANSPARENT = 0x0001 | 0x0002 | 0x0004
+    VIRTUAL_KEYS = {
+        "ctrl": 0x11, "alt": 0x12, "shift": 0x10, "windows": 0x5B, "enter": 0x0D, "esc": 0x1B,
+        "tab": 0x09, "space": 0x20, "backspace": 0x08, "delete": 0x2E, "page up": 0x21, "page down": 0x22,
+        "up": 0x26, "down": 0x28, "left": 0x25, "right": 0x27,
+    }
+
+    def __init__(self):
+        import ctypes.wintypes
+        self._wintypes = ctypes.wintypes
+        self._user32 = ctypes.windll.user32
+        self._index = shared_window_index()
+
+    def _handle(self, window: str) -> int:
+        """The handle the window's key is pinned to (shared with the window tracker)."""
+        hwnd = self._index.handle(window)
+        if not hwnd:
+            raise OSError(f"Window '{window}' not found")
+        return hwnd
+
+    def _target(self, window: str, x: int, y: int) -> Tuple[int, int]:
+        """(handle, lParam) of the control under a screen point, in its client coordinates."""
+        hwnd = self._handle(window)
+        point = self._wintypes.POINT(x, y)
+        self._user32.ScreenToClient(hwnd, ctypes.byref(point))
+        child = self._user32.ChildWindowFromPointEx(hwnd, point, self.CWP_SKIPINVISIBLE_DISABLED_TRANSPARENT)
+        if child and child != hwnd:
+            self._user32.MapWindowPoints(hwnd, child, ctypes.byref(point), 1)
+            hwnd = child
+        return hwnd, (point.y & 0xFFFF) << 16 | (point.x & 0xFFFF)
+
+    def post_move(self, window, x, y):
+        hwnd, lparam = self._target(window, x, y)
+        self._user32.PostMessageW(hwnd, self.WM_MOUSEMOVE, 0, lparam)
+
+    def post_button(self, window, x, y, button, down):
+        down_message, up_message, mk = self.BUTTON_MESSAGES[button]
+        hwnd, lparam = self._target(window, x, y)
+        self._user32.PostMessageW(hwnd, down_message if down else up_message, mk if down else 0, lparam)
+
+    def _virtual_key(self, key: str) -> int:
+        if key in self.VIRTUAL_KEYS:
+            return self.VIRTUAL_KEYS[key]
+        if len(key) > 1 and key[0] == "f" and key[1:].isdigit():
+            return 0x70 + int(key[1:]) - 1  # VK_F1..VK_F24
+        scan = self._user32.VkKeyScanW(ord(key[0])) if len(key) == 1 else -1
+        if scan == -1:
+            raise ValueError(f"No virtual key for '{key}'")
+        return scan & 0xFF
+
+    def post_key(self, window, key_combo):
+        hwnd = self._handle(window)
+        keys = [self._virtual_key(key) for key in key_combo.lower().split("+")]
+        for vk in keys:
+            self._user32.PostMessageW(hwnd, self.WM_KEYDOWN, vk, 1)
+        for vk in reversed(keys):
+            self._user32.PostMessageW(hwnd, self.WM_KEYUP, vk, 0xC0000001)
+
+
+class FakeMessageBackend(MessageBackend):
+    """Records posted messages in memory; never touches the cursor.
+
+    ``events`` holds ``(timestamp_ns, window, kind, x, y, button, down)``
+    tuples with client coordinates (screen point minus the window's
+    top-left from ``windows``). Posting to a window not in ``windows``
+    fails like a closed window does.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, Rect]] = None, clock=None):
+        self.windows = windows if windows is not None else {}
+        self.events: List[tuple] = []
+        self._now_ns = clock.now_ns if clock is not None else time.perf_counter_ns
+        self._lock = threading.Lock()
+
+    def _client(self, window, x, y):
+        rect = self.windows.get(window)
+        if rect is None:
+            raise OSError(f"Window '{window}' not found")
+        return x - rect[0], y - rect[1]
+
+    def _record(self, window, kind, x, y, button=None, down=None):
+        with self._lock:
+            self.events.append((self._now_ns(), window, kind, x, y, button, down))
+
+    def post_move(self, window, x, y):
+        self._record(window, "move", *self._client(window, x, y))
+
+    def post_button(self, window, x, y, button, down):
+        self._record(window, "button", *self._client(window, x, y), button, down)
+
+    def post_key(self, window, key_combo):
+        self._client(window, 0, 0)
+        self._record(window, "key", 0, 0, key_combo)
+
+    def clicks(self, window: Optional[str] = None) -> List[tuple]:
+        """Button-down events only: (timestamp_ns, window, x, y, button)."""
+        return [(t, w, x, y, b) for t, w, kind, x, y, b, down in self.events
+                if kind == "button" and down and (window is None or w == window)]
+
+
+class WindowMessageInput(InputBackend):
+    """The executor's injection interface on top of a MessageBackend, for one window.
+
+    move() only remembers the point (and posts WM_MOUSEMOVE); button()
+    clicks there. Hotkeys and hooks stay with the real backend.
+    """
+
+    def __init__(self, messages: MessageBackend, window: str):
+        self.messages = messages
+        self.window = window
+        self.position = (0, 0)
+
+    def move(self, x, y):
+        self.position = (x, y)
+        self.messages.post_move(self.window, x, y)
+
+    def button(self, button, down):
+        self.messages.post_button(self.window, self.position[0], self.position[1], button, down)
+
+    def cursor_pos(self):
+        return self.position
+
+    def send_hotkey(self, key_combo):
+        self.messages.post_key(self.window, key_combo)
+
+
+def default_message_backend() -> Optional[MessageBackend]:
+    """The platform's message backend, or None where there is none."""
+    return WindowsMessageBackend() if sys.platform == "win32" else None
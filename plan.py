@@ -0,0 +1,234 @@
+import struct
+from array import array
+from typing import Any, Dict, List, Optional
+
+from coord_buffer import CoordBuffer, coords_of, from_le_bytes, to_le_bytes
+from group import Timeline, group_of
+from macro import MacroBuffer, macro_of
+
+# Compiled plans are plain dicts with every default filled in and every
+# enum lowercased, so the executor never has to normalize at fire time.
+# Coordinates are a CoordBuffer (flat int arrays, never per-point dicts).
+# Plans can also be packed into bytes for the out-of-process engine.
+
+BUTTONS = ["left", "right"]
+MODES = ["single", "double", "burst"]
+WAIT_MODES = ["fixed", "change", "match"]
+WAIT_FALLBACKS = ["click", "abort"]
+DELIVERIES = ["cursor", "message"]
+PRIORITIES = ["normal", "high"]
+
+# button, mode, wait_mode, wait_fallback, delivery, priority, focus_only, enabled, has refs, burst_count,
+# delay_ms, coord count
+_HEADER = struct.Struct("<BBBBBBBBBHII")
+_STR_LEN = struct.Struct("<H")
+# ladder offset x, offset y, row count (0 = not a ladder)
+_LADDER = struct.Struct("<iiI")
+# macro time scale, packed event bytes (0 = no macro), key name count
+_MACRO = struct.Struct("<fII")
+# group timeline event count (0 = not a group), member count, key name count
+_TIMELINE = struct.Struct("<IHH")
+
+
+def ladder_of(action_data: Dict[str, Any]) -> Optional[Dict[str, int]]:
+    """Normalized ladder parameters, or None for a plain action.
+
+    A ladder repeats the action's points (row 0) every ``offset`` pixels,
+    ``rows`` times; each execution clicks one selected row. Accepts both
+    the saved form (``offset``) and a compiled plan's (``dx``/``dy``), so
+    compiling a plan again keeps its ladder.
+    """
+    ladder = action_data.get("ladder")
+    if not ladder or int(ladder.get("rows", 0)) < 1:
+        return None
+    if "offset" in ladder:
+        dx, dy = ladder["offset"]
+    else:
+        dx, dy = ladder.get("dx", 0), ladder.get("dy", 0)
+    return {"dx": int(dx), "dy": int(dy), "rows": int(ladder["rows"])}
+
+
+def ladder_table(points: CoordBuffer, ladder: Dict[str, int]) -> List[CoordBuffer]:
+    """Every row's points, precomputed so firing a row is one indexed read."""
+    return [points.translated(ladder["dx"] * row, ladder["dy"] * row) for row in range(ladder["rows"])]
+
+
+def compile_action(action_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize raw action data (as saved by the UI) into an execution plan."""
+    coords = coords_of(action_data).copy()
+    ladder = ladder_of(action_data)
+    return {
+        "name": action_data.get("name", "Action"),
+        "hotkey": action_data.get("hotkey", ""),
+        "coords": coords,
+        "ladder": ladder,
+        "ladder_table": ladder_table(coords, ladder) if ladder else None,
+        "macro": macro_of(action_data),
+        "time_scale": float(action_data.get("time_scale", 1.0)),
+        "button": action_data.get("button", "left").lower(),
+        "mode": action_data.get("mode", "single").lower(),
+        # Clamped to what the plan header can hold (a negative delay just means none)
+        "burst_count": min(max(0, int(action_data.get("burst_count", 3))), 0xFFFF),
+        "delay_ms": max(0, int(action_data.get("delay_ms", 100))),
+        "wait_mode": action_data.get("wait_mode", "Fixed").lower(),
+        "wait_fallback": action_data.get("wait_fallback", "click").lower(),
+        "window": action_data.get("window"),
+        "delivery": action_data.get("delivery", "cursor").lower(),
+        "priority": action_data.get("priority", "normal").lower(),
+        "focus_only": bool(action_data.get("focus_only", False)),
+        "enabled": bool(action_data.get("enabled", True)),
+        "timeline": action_data.get("timeline"),
+    }
+
+
+def compile_group(action_data: Dict[str, Any], actions: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Compile an action group: its members' timelines merged into one plan.
+
+    ``actions`` maps action names to their raw data (the group's profile).
+    Raises ValueError for a missing member or a member that is a group.
+    """
+    members = []
+    for member in group_of(action_data) or []:
+        data = actions.get(member["action"])
+        if data is None:
+            raise ValueError(f"Group '{action_data.get('name', 'Action')}': no action named '{member['action']}'")
+        if group_of(data):
+            raise ValueError(f"Group '{action_data.get('name', 'Action')}': '{member['action']}' is a group")
+        members.append((compile_action(data), member["offset_ms"]))
+    plan = compile_action(action_data)
+    plan["timeline"] = Timeline.merge(members)
+    return plan
+
+
+def _index(values: List[str], value: str) -> int:
+    try:
+        return values.index(value)
+    except ValueError:
+        return 0
+
+
+def _pack_str(value) -> bytes:
+    raw = (value or "").encode("utf-8")
+    return _STR_LEN.pack(len(raw)) + raw
+
+
+def _unpack_str(data, offset):
+    (length,) = _STR_LEN.unpack_from(data, offset)
+    offset += _STR_LEN.size
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def encode_plan(plan: Dict[str, Any]) -> bytes:
+    """Pack a compiled plan into a compact binary record."""
+    coords = plan["coords"]
+    parts = [
+        _HEADER.pack(
+            _index(BUTTONS, plan["button"]),
+            _index(MODES, plan["mode"]),
+            _index(WAIT_MODES, plan["wait_mode"]),
+            _index(WAIT_FALLBACKS, plan["wait_fallback"]),
+            _index(DELIVERIES, plan["delivery"]),
+            _index(PRIORITIES, plan["priority"]),
+            int(plan["focus_only"]),
+            int(plan["enabled"]),
+            int(coords.refs is not None),
+            plan["burst_count"],
+            plan["delay_ms"],
+            len(coords),
+        ),
+        _pack_str(plan["name"]),
+        _pack_str(plan["hotkey"]),
+        _pack_str(plan["window"]),
+        to_le_bytes(coords.xy),
+    ]
+    if coords.refs is not None:
+        parts.append(to_le_bytes(coords.refs))
+    ladder = plan["ladder"] or {"dx": 0, "dy": 0, "rows": 0}
+    parts.append(_LADDER.pack(ladder["dx"], ladder["dy"], ladder["rows"]))
+    macro = plan.get("macro")
+    if macro is not None:
+        data = macro.to_bytes()
+        parts.append(_MACRO.pack(plan["time_scale"], len(data), len(macro.keys)))
+        parts.append(data)
+        parts.extend(_pack_str(key) for key in macro.keys)
+    else:
+        parts.append(_MACRO.pack(plan.get("time_scale", 1.0), 0, 0))
+    timeline = plan.get("timeline")
+    if timeline is not None:
+        parts.append(_TIMELINE.pack(len(timeline), len(timeline.members), len(timeline.keys)))
+        for name, window, focus_only, delivery in timeline.members:
+            parts.extend((_pack_str(name), _pack_str(window), bytes((int(focus_only), _index(DELIVERIES, delivery)))))
+        parts.extend(_pack_str(key) for key in timeline.keys)
+        parts.append(timeline.to_bytes())
+    else:
+        parts.append(_TIMELINE.pack(0, 0, 0))
+    return b"".join(parts)
+
+
+def decode_plan(data: bytes) -> Dict[str, Any]:
+    """Inverse of encode_plan()."""
+    (button, mode, wait_mode, wait_fallback, delivery, priority, focus_only, enabled, has_refs,
+     burst_count, delay_ms, count) = _HEADER.unpack_from(data, 0)
+    offset = _HEADER.size
+    name, offset = _unpack_str(data, offset)
+    hotkey, offset = _unpack_str(data, offset)
+    window, offset = _unpack_str(data, offset)
+
+    end = offset + count * 2 * array("i").itemsize
+    xy = from_le_bytes("i", bytes(data[offset:end]))
+    refs = None
+    if has_refs:
+        refs = from_le_bytes("q", bytes(data[end:end + count * array("q").itemsize]))
+        end += count * array("q").itemsize
+    coords = CoordBuffer(xy, refs)
+    dx, dy, rows = _LADDER.unpack_from(data, end)
+    ladder = {"dx": dx, "dy": dy, "rows": rows} if rows else None
+    offset = end + _LADDER.size
+    time_scale, size, key_count = _MACRO.unpack_from(data, offset)
+    offset += _MACRO.size
+    macro = None
+    if size:
+        events = bytes(data[offset:offset + size])
+        offset += size
+        keys = []
+        for _ in range(key_count):
+            key, offset = _unpack_str(data, offset)
+            keys.append(key)
+        macro = MacroBuffer(events, keys)
+    count, member_count, key_count = _TIMELINE.unpack_from(data, offset)
+    offset += _TIMELINE.size
+    timeline = None
+    if member_count:
+        members = []
+        for _ in range(member_count):
+            member, offset = _unpack_str(data, offset)
+            window, offset = _unpack_str(data, offset)
+            members.append((member, window or None, bool(data[offset]), DELIVERIES[data[offset + 1]]))
+            offset += 2
+        keys = []
+        for _ in range(key_count):
+            key, offset = _unpack_str(data, offset)
+            keys.append(key)
+        timeline = Timeline.from_bytes(data[offset:], count, members, keys)
+
+    return {
+        "name": name,
+        "hotkey": hotkey,
+        "coords": coords,
+        "ladder": ladder,
+        "ladder_table": ladder_table(coords, ladder) if ladder else None,
+        "macro": macro,
+        "time_scale": time_scale,
+        "button": BUTTONS[button],
+        "mode": MODES[mode],
+        "burst_count": burst_count,
+        "delay_ms": delay_ms,
+        "wait_mode": WAIT_MODES[wait_mode],
+        "wait_fallback": WAIT_FALLBACKS[wait_fallback],
+        "window": window or None,
+        "delivery": DELIVERIES[delivery],
+        "priority": PRIORITIES[priority],
+        "focus_only": bool(focus_only),
+        "enabled": bool(enabled),
+        "timeline": timeline,
+    }
@@ -0,0 +1,325 @@
+"""Real-time mode for the execution thread: priority, CPU pinning and timer resolution.
+
+Each OS has its own RealtimePlatform; RealtimeMode applies whatever the
+platform supports from the thread that should run real-time (the
+executor's worker) and records scheduler jitter before and after, so the
+effect is measured rather than assumed. The executor measures on a helper
+thread, so the worker is free again as soon as the settings are applied.
+Steps that fail, typically for lack of privileges, are reported and
+skipped.
+
+Run directly to measure the effect on this machine (works unprivileged
+on Linux, so it can run in CI):
+    python realtime.py [--core N] [--samples 500] [--interval-ms 1] [--json]
+"""
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from histogram import LatencyHistogram
+
+Restore = Callable[[], None]
+
+# Step names, in the order they are applied
+STEPS = ("process_priority", "thread_priority", "affinity", "timer_resolution")
+# Steps that only affect the calling thread, repeated on a helper thread to measure them there
+THREAD_STEPS = ("thread_priority", "affinity", "timer_resolution")
+
+
+def measure_jitter(samples: int = 200, interval_s: float = 0.001) -> LatencyHistogram:
+    """Oversleep of ``samples`` short timed waits on the calling thread.
+
+    Waits on an Event like the executor's delays do, so the result is the
+    scheduling error the executor actually sees.
+    """
+    histogram = LatencyHistogram()
+    event = threading.Event()
+    requested_ns = int(interval_s * 1e9)
+    for _ in range(samples):
+        started = time.perf_counter_ns()
+        event.wait(interval_s)
+        histogram.record(time.perf_counter_ns() - started - requested_ns)
+    return histogram
+
+
+class RealtimePlatform:
+    """OS-specific steps. Each applies to the calling thread (or its process)
+    and returns a callable that undoes it; it raises OSError when the OS
+    refuses and NotImplementedError when the platform has no such control.
+    """
+
+    name = "unsupported"
+
+    def default_core(self) -> int:
+        """The core to pin to by default: the last one, usually least busy with OS work."""
+        return (os.cpu_count() or 1) - 1
+
+    def raise_process_priority(self) -> Restore:
+        raise NotImplementedError
+
+    def raise_thread_priority(self) -> Restore:
+        raise NotImplementedError
+
+    def pin_thread(self, core: int) -> Restore:
+        raise NotImplementedError
+
+    def raise_timer_resolution(self) -> Restore:
+        raise NotImplementedError
+
+
+class LinuxRealtime(RealtimePlatform):
+    """Linux: nice values / SCHED_FIFO, sched_setaffinity and per-thread timer slack.
+
+    Linux has no process-wide priority for running threads (a nice value
+    belongs to one thread), so the process step is unsupported and the
+    thread step does the work. Timers are already high resolution; what
+    delays wake-ups is the default 50µs timer slack, which is set to 1ns.
+    """
+
+    name = "linux"
+    PR_SET_TIMERSLACK = 29
+    PR_GET_TIMERSLACK = 30
+    NICE = -10
+    FIFO_PRIORITY = 10
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+
+    def default_core(self) -> int:
+        return max(os.sched_getaffinity(0))
+
+    def raise_thread_priority(self) -> Restore:
+        tid = threading.get_native_id()
+        policy = os.sched_getscheduler(tid)
+        param = os.sched_getparam(tid)
+        try:
+            os.sched_setscheduler(tid, os.SCHED_FIFO, os.sched_param(self.FIFO_PRIORITY))
+            return lambda: os.sched_setscheduler(tid, policy, param)
+        except PermissionError:
+            # Without CAP_SYS_NICE / RLIMIT_RTPRIO a lower nice value is the next best thing
+            previous = os.getpriority(os.PRIO_PROCESS, tid)
+            os.setpriority(os.PRIO_PROCESS, tid, min(previous, self.NICE))
+            return lambda: os.setpriority(os.PRIO_PROCESS, tid, previous)
+
+    def pin_thread(self, core: int) -> Restore:
+        tid = threading.get_native_id()
+        previous = os.sched_getaffinity(tid)
+        os.sched_setaffinity(tid, {core})
+        return lambda: os.sched_setaffinity(tid, previous)
+
+    def raise_timer_resolution(self) -> Restore:
+        prctl = self._libc.prctl
+        previous = prctl(self.PR_GET_TIMERSLACK, 0, 0, 0, 0)
+        if previous < 0 or prctl(self.PR_SET_TIMERSLACK, 1, 0, 0, 0) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        return lambda: prctl(self.PR_SET_TIMERSLACK, previous, 0, 0, 0)
+
+
+class WindowsRealtime(RealtimePlatform):
+    """Windows: priority classes, SetThreadAffinityMask and timeBeginPeriod(1)."""
+
+    name = "windows"
+    HIGH_PRIORITY_CLASS = 0x80
+    THREAD_PRIORITY_TIME_CRITICAL = 15
+
+    def __init__(self):
+        self._kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self._winmm = ctypes.WinDLL("winmm")
+        self._kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+        self._kernel32.GetCurrentThread.restype = ctypes.c_void_p
+        self._kernel32.SetPriorityClass.argtypes = [ctypes.c_void_p, ctypes.c_uint32]
+        self._kernel32.GetPriorityClass.argtypes = [ctypes.c_void_p]
+        self._kernel32.SetThreadPriority.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        self._kernel32.GetThreadPriority.argtypes = [ctypes.c_void_p]
+        self._kernel32.SetThreadAffinityMask.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        self._kernel32.SetThreadAffinityMask.restype = ctypes.c_size_t
+
+    def _check(self, ok):
+        if not ok:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def raise_process_priority(self) -> Restore:
+        k32 = self._kernel32
+        process = k32.GetCurrentProcess()
+        previous = k32.GetPriorityClass(process)
+        self._check(previous)
+        self._check(k32.SetPriorityClass(process, self.HIGH_PRIORITY_CLASS))
+        return lambda: k32.SetPriorityClass(process, previous)
+
+    def raise_thread_priority(self) -> Restore:
+        k32 = self._kernel32
+        thread = k32.GetCurrentThread()  # Pseudo-handle: only valid on this thread
+        previous = k32.GetThreadPriority(thread)
+        self._check(k32.SetThreadPriority(thread, self.THREAD_PRIORITY_TIME_CRITICAL))
+        return lambda: k32.SetThreadPriority(k32.GetCurrentThread(), previous)
+
+    def pin_thread(self, core: int) -> Restore:
+        k32 = self._kernel32
+        previous = k32.SetThreadAffinityMask(k32.GetCurrentThread(), 1 << core)
+        self._check(previous)
+        return lambda: k32.SetThreadAffinityMask(k32.GetCurrentThread(), previous)
+
+    def raise_timer_resolution(self) -> Restore:
+        winmm = self._winmm
+        if winmm.timeBeginPeriod(1) != 0:
+            raise OSError("timeBeginPeriod(1) failed")
+        return lambda: winmm.timeEndPeriod(1)
+
+
+def default_platform() -> RealtimePlatform:
+    if sys.platform == "win32":
+        return WindowsRealtime()
+    if sys.platform.startswith("linux"):
+        return LinuxRealtime()
+    return RealtimePlatform()
+
+
+class RealtimeMode:
+    """Applies the real-time steps to one thread and measures their effect.
+
+    apply() and restore() must run on the thread being tuned, since thread
+    priority, affinity and timer slack are per-thread. ``core`` None pins
+    to the platform's default core.
+
+    The jitter measurement takes ``2 * jitter_samples`` timed waits (about
+    3s at 1ms on Windows). apply(wait=False) does it on a helper thread
+    instead: once untuned, then with the same per-thread steps applied to
+    the helper, and calls ``on_measured(mode)`` when done.
+    """
+
+    def __init__(self, core: Optional[int] = None, platform: Optional[RealtimePlatform] = None,
+                 jitter_samples: int = 200, jitter_interval_s: float = 0.001,
+                 on_measured: Optional[Callable[["RealtimeMode"], None]] = None):
+        self.platform = platform or default_platform()
+        self.core = core
+        self.jitter_samples = jitter_samples
+        self.jitter_interval_s = jitter_interval_s
+        self.on_measured = on_measured
+        self.measurer: Optional[threading.Thread] = None
+        self.active = False
+        self.steps: Dict[str, str] = {}  # step -> "ok", "unsupported" or the error
+        self.jitter_before: Optional[Dict[str, int]] = None
+        self.jitter_after: Optional[Dict[str, int]] = None
+        self._restore: List[Restore] = []
+
+    def _actions(self, core: int) -> Dict[str, Callable[[], Restore]]:
+        return {
+            "process_priority": self.platform.raise_process_priority,
+            "thread_priority": self.platform.raise_thread_priority,
+            "affinity": lambda: self.platform.pin_thread(core),
+            "timer_resolution": self.platform.raise_timer_resolution,
+        }
+
+    def apply(self, wait: bool = True) -> Dict[str, object]:
+        """Apply every step to the calling thread; ``wait`` False measures jitter in the background."""
+        if self.active:
+            return self.summary()
+        if wait:
+            self.jitter_before = self._measure()
+        core = self.core if self.core is not None else self.platform.default_core()
+        actions = self._actions(core)
+        for step in STEPS:
+            try:
+                self._restore.append(actions[step]())
+                self.steps[step] = "ok"
+            except NotImplementedError:
+                self.steps[step] = "unsupported"
+            except (OSError, ValueError) as e:
+                self.steps[step] = str(e) or type(e).__name__
+        self.steps["core"] = str(core)
+        self.active = True
+        if wait:
+            self.jitter_after = self._measure()
+        elif self.jitter_samples:
+            self.measurer = threading.Thread(target=self._measure_on_helper, args=(core,), daemon=True,
+                                             name="realtime-jitter")
+            self.measurer.start()
+        return self.summary()
+
+    def _measure_on_helper(self, core: int):
+        """Jitter of this (helper) thread untuned, then with the steps that succeeded on the tuned one."""
+        self.jitter_before = self._measure()
+        actions = self._actions(core)
+        undo = []
+        try:
+            for step in THREAD_STEPS:
+                if self.steps.get(step) == "ok":
+                    undo.append(actions[step]())
+            self.jitter_after = self._measure()
+        except (OSError, ValueError):
+            pass  # Refused this time: leave "after" unmeasured
+        finally:
+            for restore in reversed(undo):
+                try:
+                    restore()
+                except (OSError, ValueError):
+                    pass
+        if self.on_measured:
+            self.on_measured(self)
+
+    def restore(self):
+        for undo in reversed(self._restore):
+            try:
+                undo()
+            except (OSError, ValueError):
+                pass  # Best effort: the thread may be going away
+        self._restore = []
+        self.active = False
+
+    def _measure(self) -> Optional[Dict[str, int]]:
+        if not self.jitter_samples:
+            return None
+        return measure_jitter(self.jitter_samples, self.jitter_interval_s).summary()
+
+    def summary(self) -> Dict[str, object]:
+        return {
+            "platform": self.platform.name,
+            "active": self.active,
+            "steps": dict(self.steps),
+            "jitter_before": self.jitter_before,
+            "jitter_after": self.jitter_after,
+        }
+
+    def format_status(self) -> str:
+        applied = sum(1 for step in STEPS if self.steps.get(step) == "ok")
+        status = f"Real-time {applied}/{len(STEPS)}"
+        if self.jitter_before and self.jitter_after:
+            status += (f" · jitter p99 {self.jitter_before['p99_ns'] / 1e3:.0f}µs"
+                       f" → {self.jitter_after['p99_ns'] / 1e3:.0f}µs")
+        return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--core", type=int, help="Core to pin to (default: the platform's choice)")
+    parser.add_argument("--samples", type=int, default=500, help="Timed waits per jitter measurement")
+    parser.add_argument("--interval-ms", type=float, default=1.0, help="Length of each timed wait")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    args = parser.parse_args()
+
+    mode = RealtimeMode(args.core, jitter_samples=args.samples, jitter_interval_s=args.interval_ms / 1000)
+    try:
+        result = mode.apply()
+    finally:
+        mode.restore()
+    if args.json:
+        print(json.dumps(result))
+        return
+    print(f"platform {result['platform']}")
+    for step, outcome in result["steps"].items():
+        print(f"  {step:<17} {outcome}")
+    for key in ("jitter_before", "jitter_after"):
+        s = result[key]
+        print(f"{key:<14} n={s['count']:<5} mean {s['mean_ns'] / 1e3:7.1f}µs  p50 {s['p50_ns'] / 1e3:7.1f}µs  "
+              f"p99 {s['p99_ns'] / 1e3:7.1f}µs  max {s['max_ns'] / 1e3:7.1f}µs")
+
+
+if __name__ == "__main__":
+    main()
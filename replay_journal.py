@@ -0,0 +1,108 @@
+"""Replay an execution journal through a fake input backend and diff timings.
+
+Usage:
+    python replay_journal.py journal/executions.jsonl [--speed 1.0] [--limit N]
+
+Each recorded execution (a run id and execution id pair; ids restart
+every launch) is replayed on the recorded planned schedule (relative to
+its first click). Records the journal dropped are reported per run. Clicks are injected into FakeInputBackend
+using the same event-wait scheduling the executor uses, and the lateness
+(actual - planned) of the recording is compared with that of the replay.
+"""
+import argparse
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from input_backend import FakeInputBackend
+from journal import read_journal
+
+
+def load_executions(path: str) -> Tuple["OrderedDict[Tuple[Optional[str], int], List[dict]]", Dict[Optional[str], int]]:
+    """Records grouped by (run, execution id), and the number of dropped records per run.
+
+    Journals written before run ids existed group under run None.
+    """
+    executions = OrderedDict()
+    dropped = {}
+    for record in read_journal(path):
+        run = record.get("r")
+        if "dropped" in record:
+            dropped[run] = dropped.get(run, 0) + record["dropped"]
+        else:
+            executions.setdefault((run, record["e"]), []).append(record)
+    return executions, dropped
+
+
+def replay_execution(records: List[dict], backend: FakeInputBackend, speed: float = 1.0) -> List[int]:
+    """Inject one execution's clicks on its planned schedule; return replay lateness in ns."""
+    wake = threading.Event()  # Never set: waits behave like the executor's cancel token
+    first_planned = records[0]["p"]
+    start = time.perf_counter_ns()
+    lateness = []
+
+    for record in records:
+        planned = start + int((record["p"] - first_planned) / speed)
+        remaining = planned - time.perf_counter_ns()
+        if remaining > 0:
+            wake.wait(remaining / 1e9)
+        backend.move(record["x"], record["y"])
+        backend.button(record["b"], True)
+        actual = backend.events[-1][0]
+        backend.button(record["b"], False)
+        lateness.append(actual - planned)
+    return lateness
+
+
+def _summary(values: List[int]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] / 1e6
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) / 1e6,
+        "p50_ms": pick(0.50),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("journal")
+    parser.add_argument("--speed", type=float, default=1.0, help="Time scale for the replay (2.0 = twice as fast)")
+    parser.add_argument("--limit", type=int, default=0, help="Replay only the first N executions")
+    args = parser.parse_args()
+
+    executions, dropped = load_executions(args.journal)
+    if args.limit:
+        executions = OrderedDict(list(executions.items())[:args.limit])
+
+    backend = FakeInputBackend()
+    recorded_all, replayed_all = [], []
+    print(f"{'run:exec':>16} {'action':<20} {'clicks':>6} {'rec late ms':>12} {'replay late ms':>15} {'diff ms':>9}")
+    for (run, execution_id), records in executions.items():
+        recorded = [r["t"] - r["p"] for r in records]
+        replayed = replay_execution(records, backend, args.speed)
+        recorded_all.extend(recorded)
+        replayed_all.extend(replayed)
+        rec_ms = sum(recorded) / len(recorded) / 1e6
+        rep_ms = sum(replayed) / len(replayed) / 1e6
+        label = f"{run or '-'}:{execution_id}"
+        print(f"{label:>16} {records[0]['a'][:20]:<20} {len(records):>6} "
+              f"{rec_ms:>12.3f} {rep_ms:>15.3f} {rep_ms - rec_ms:>9.3f}")
+
+    print()
+    for label, values in (("recorded", recorded_all), ("replayed", replayed_all)):
+        s = _summary(values)
+        print(f"{label:<9} n={s['count']} mean={s['mean_ms']:.3f}ms p50={s['p50_ms']:.3f}ms "
+              f"p99={s['p99_ms']:.3f}ms max={s['max_ms']:.3f}ms")
+    for run, count in dropped.items():
+        print(f"dropped   {count} record(s) in run {run or '-'}: the journal ring overflowed, "
+              f"those clicks are missing above")
+
+
+if __name__ == "__main__":
+    main()
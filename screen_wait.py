@@ -0,0 +1,144 @@
+import zlib
+import ctypes
+import threading
+from typing import Callable, Optional
+from clock import Clock, RealClock
+
+# Wait step results
+WAIT_MATCHED = "matched"
+WAIT_CHANGED = "changed"
+WAIT_TIMEOUT = "timeout"
+WAIT_CANCELLED = "cancelled"
+
+
+def region_hash(pixels: bytes) -> int:
+    """Cheap fingerprint of a captured region."""
+    return zlib.crc32(pixels)
+
+
+class ScreenSource:
+    """Base class for anything that can return raw pixels of a screen region."""
+
+    def grab(self, x: int, y: int, width: int, height: int) -> bytes:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class GdiScreenSource(ScreenSource):
+    """Windows screen source using BitBlt.
+
+    The screen DC, memory DC, bitmap and pixel buffer are created once per
+    region size and reused, so a grab is a single BitBlt + GetBitmapBits.
+    """
+
+    SRCCOPY = 0x00CC0020
+
+    def __init__(self):
+        self._user32 = ctypes.windll.user32
+        self._gdi32 = ctypes.windll.gdi32
+        self._lock = threading.Lock()
+        self._screen_dc = self._user32.GetDC(0)
+        self._mem_dc = self._gdi32.CreateCompatibleDC(self._screen_dc)
+        self._bitmap = None
+        self._old_bitmap = None
+        self._size = None
+        self._buffer = None
+
+    def _ensure_context(self, width, height):
+        if self._size == (width, height):
+            return
+        if self._bitmap:
+            self._gdi32.SelectObject(self._mem_dc, self._old_bitmap)
+            self._gdi32.DeleteObject(self._bitmap)
+        self._bitmap = self._gdi32.CreateCompatibleBitmap(self._screen_dc, width, height)
+        self._old_bitmap = self._gdi32.SelectObject(self._mem_dc, self._bitmap)
+        self._buffer = ctypes.create_string_buffer(width * height * 4)
+        self._size = (width, height)
+
+    def grab(self, x: int, y: int, width: int, height: int) -> bytes:
+        with self._lock:
+            self._ensure_context(width, height)
+            self._gdi32.BitBlt(self._mem_dc, 0, 0, width, height,
+                               self._screen_dc, x, y, self.SRCCOPY)
+            self._gdi32.GetBitmapBits(self._bitmap, len(self._buffer), self._buffer)
+            return self._buffer.raw
+
+    def close(self):
+        with self._lock:
+            if self._bitmap:
+                self._gdi32.SelectObject(self._mem_dc, self._old_bitmap)
+                self._gdi32.DeleteObject(self._bitmap)
+                self._bitmap = None
+            if self._mem_dc:
+                self._gdi32.DeleteDC(self._mem_dc)
+                self._mem_dc = None
+            if self._screen_dc:
+                self._user32.ReleaseDC(0, self._screen_dc)
+                self._screen_dc = None
+            self._size = None
+
+
+class SyntheticScreenSource(ScreenSource):
+    """Screen source backed by a frame provider, for tests without a display.
+
+    The provider is called as ``provider(x, y, width, height)`` and returns
+    the pixel bytes for that region, so a test can switch what the "screen"
+    shows at any moment.
+    """
+
+    def __init__(self, frame_provider: Callable[[int, int, int, int], bytes]):
+        self.frame_provider = frame_provider
+        self.grab_count = 0
+
+    def grab(self, x: int, y: int, width: int, height: int) -> bytes:
+        self.grab_count += 1
+        return self.frame_provider(x, y, width, height)
+
+
+class RegionWaiter:
+    """Polls a small region around a coordinate until it changes or matches."""
+
+    def __init__(self, source: ScreenSource, region_size: int = 16, poll_interval_ms: float = 2,
+                 clock: Optional[Clock] = None):
+        self.source = source
+        self.clock = clock or RealClock()
+        self.region_size = region_size
+        self.poll_interval_ms = poll_interval_ms
+
+    def snapshot(self, x: int, y: int) -> int:
+        """Hash the region centered on (x, y)."""
+        half = self.region_size // 2
+        pixels = self.source.grab(x - half, y - half, self.region_size, self.region_size)
+        return region_hash(pixels)
+
+    def wait(self, x: int, y: int, timeout_ms: int, baseline: Optional[int] = None,
+             reference: Optional[int] = None, should_cancel: Optional[Callable[[], bool]] = None,
+             cancel_event: Optional[threading.Event] = None) -> str:
+        """Block until the region matches ``reference`` or differs from ``baseline``.
+
+        With a reference hash the step waits for a match; otherwise it waits
+        for any change from the baseline. Setting ``cancel_event`` wakes the
+        wait immediately. Returns one of the WAIT_* results.
+        """
+        deadline = self.clock.now_ns() + int(timeout_ms * 1_000_000)
+        interval = self.poll_interval_ms / 1000.0
+
+        while True:
+            current = self.snapshot(x, y)
+            if reference is not None:
+                if current == reference:
+                    return WAIT_MATCHED
+            elif baseline is not None and current != baseline:
+                return WAIT_CHANGED
+
+            if should_cancel and should_cancel():
+                return WAIT_CANCELLED
+            if self.clock.now_ns() >= deadline:
+                return WAIT_TIMEOUT
+            if cancel_event is not None:
+                if self.clock.wait(cancel_event, interval):
+                    return WAIT_CANCELLED
+            else:
+                self.clock.sleep(interval)
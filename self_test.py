@@ -0,0 +1,111 @@
+"""End-to-end latency self-test: synthetic hotkey in, observed click out.
+
+Injects a hotkey through the input backend, lets the normal hook ->
+executor -> injection path run, and timestamps the resulting button press
+as seen by the low-level mouse hook. On Windows this really clicks at the
+chosen point (default: where the cursor is); elsewhere, or with --fake, it
+runs entirely against the fake backends.
+
+Usage:
+    python self_test.py [--iterations 200] [--hotkey f23] [--x X --y Y] [--fake] [--json]
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+
+from executor import Executor
+from histogram import LatencyHistogram
+from input_backend import FakeInputBackend, default_backend
+from input_hub import InputHub
+
+
+def run_self_test(backend, iterations: int = 200, hotkey: str = "f23", x: int = 0, y: int = 0,
+                  timeout: float = 1.0, interval: float = 0.02) -> dict:
+    """Run the loopback ``iterations`` times and return latency summaries (ns)."""
+    hub = InputHub(backend)
+    hub.start()
+    executor = Executor(backend)
+
+    observed = threading.Event()
+    observed_ns = [0]
+
+    def on_click(cx, cy, button, pressed, injected):
+        if pressed and not observed.is_set():
+            observed_ns[0] = time.perf_counter_ns()
+            observed.set()
+
+    subscription = hub.subscribe_clicks(on_click)
+    action = {"name": "Self-test", "coords": [{"x": x, "y": y}], "mode": "Single", "delay_ms": 0}
+    executor.register_hotkey(hotkey, action)
+
+    end_to_end = LatencyHistogram()
+    missed = 0
+    try:
+        for _ in range(iterations):
+            observed.clear()
+            sent_ns = time.perf_counter_ns()
+            backend.send_hotkey(hotkey)
+            if observed.wait(timeout):
+                end_to_end.record(observed_ns[0] - sent_ns)
+            else:
+                missed += 1
+            # Let the release and the executor finish before the next round
+            deadline = time.perf_counter() + timeout
+            while not executor.is_idle() and time.perf_counter() < deadline:
+                time.sleep(0.001)
+            time.sleep(interval)
+    finally:
+        subscription.cancel()
+        executor.stop_listening()
+        hub.stop()
+
+    return {
+        "iterations": iterations,
+        "missed": missed,
+        "end_to_end": end_to_end.summary(),
+        "trigger_to_injection": executor.latency.summary(),
+        "hotkey_callback": executor.hook_time.summary(),
+        "mouse_hook": hub.hook_time["mouse"].summary(),
+    }
+
+
+def format_result(result: dict) -> str:
+    lines = [f"{result['iterations']} iterations, {result['missed']} missed"]
+    for key in ("end_to_end", "trigger_to_injection", "hotkey_callback", "mouse_hook"):
+        s = result[key]
+        lines.append(
+            f"{key:<22} n={s['count']:<5} mean {s['mean_ns'] / 1e6:7.3f}ms  p50 {s['p50_ns'] / 1e6:7.3f}ms  "
+            f"p90 {s['p90_ns'] / 1e6:7.3f}ms  p99 {s['p99_ns'] / 1e6:7.3f}ms  max {s['max_ns'] / 1e6:7.3f}ms"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--hotkey", default="f23", help="Hotkey used for the loopback (must be unused)")
+    parser.add_argument("--x", type=int, help="Click target (default: current cursor position)")
+    parser.add_argument("--y", type=int)
+    parser.add_argument("--fake", action="store_true", help="Use the fake backends (default off Windows)")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    args = parser.parse_args()
+
+    fake = args.fake or sys.platform != "win32"
+    backend = FakeInputBackend() if fake else default_backend()
+    x, y = backend.cursor_pos()
+    x = args.x if args.x is not None else x
+    y = args.y if args.y is not None else y
+    if not fake:
+        print(f"Self-test will left-click {args.iterations} times at {x},{y}")
+
+    result = run_self_test(backend, args.iterations, args.hotkey, x, y)
+    result["backend"] = "fake" if fake else type(backend).__name__
+    print(json.dumps(result) if args.json else format_result(result))
+    if result["missed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
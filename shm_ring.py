@@ -0,0 +1,121 @@
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+# Header: head (write counter), tail (read counter), producer heartbeat (ns), capacity
+_HEADER = struct.Struct("<QQQQ")
+_HEAD = struct.Struct("<Q")
+_RECORD = struct.Struct("<IH")  # payload length, message type
+_WRAP = 0xFFFFFFFF
+_ALIGN = 8
+
+
+def _align(size: int) -> int:
+    return (size + _ALIGN - 1) & ~(_ALIGN - 1)
+
+
+class ShmRing:
+    """Single-producer / single-consumer message ring in shared memory.
+
+    Messages are ``(type, payload bytes)`` records written in place with
+    struct; nothing is pickled. Head and tail are monotonically increasing
+    byte counters stored in the header, so each side only ever writes its
+    own counter. Pushes from several threads of the producing process are
+    serialized with a local lock.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.buf = shm.buf
+        self.owner = owner
+        self.capacity = _HEADER.unpack_from(self.buf, 0)[3]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, name: str, capacity: int) -> "ShmRing":
+        capacity = _align(capacity)
+        try:
+            # A stale segment from a crashed run would otherwise block creation
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=_HEADER.size + capacity)
+        _HEADER.pack_into(shm.buf, 0, 0, 0, time.time_ns(), capacity)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "ShmRing":
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # Only the creating process may unlink the segment
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    def push(self, msg_type: int, payload: bytes = b"") -> bool:
+        """Append a message. Returns False if the ring is full."""
+        size = _align(_RECORD.size + len(payload))
+        if size > self.capacity // 2:
+            raise ValueError(f"Message of {len(payload)} bytes does not fit the ring")
+
+        with self._lock:
+            head, tail = _HEADER.unpack_from(self.buf, 0)[:2]
+            pos = head % self.capacity
+            contiguous = self.capacity - pos
+            needed = size if size <= contiguous else contiguous + size
+            if head - tail + needed > self.capacity:
+                return False
+
+            if size > contiguous:
+                # Not enough room before the end: mark the gap and restart at 0
+                struct.pack_into("<I", self.buf, _HEADER.size + pos, _WRAP)
+                head += contiguous
+                pos = 0
+
+            offset = _HEADER.size + pos
+            _RECORD.pack_into(self.buf, offset, len(payload), msg_type)
+            start = offset + _RECORD.size
+            self.buf[start:start + len(payload)] = payload
+            # Publish last, so the consumer never sees a half-written record
+            _HEAD.pack_into(self.buf, 0, head + size)
+        return True
+
+    def pop(self) -> Optional[Tuple[int, bytes]]:
+        """Remove and return the oldest message, or None if the ring is empty."""
+        head, tail = _HEADER.unpack_from(self.buf, 0)[:2]
+        if tail == head:
+            return None
+
+        pos = tail % self.capacity
+        if struct.unpack_from("<I", self.buf, _HEADER.size + pos)[0] == _WRAP:
+            tail += self.capacity - pos
+            pos = 0
+
+        offset = _HEADER.size + pos
+        length, msg_type = _RECORD.unpack_from(self.buf, offset)
+        start = offset + _RECORD.size
+        payload = bytes(self.buf[start:start + length])
+        _HEAD.pack_into(self.buf, 8, tail + _align(_RECORD.size + length))
+        return msg_type, payload
+
+    def touch(self):
+        """Record a producer heartbeat."""
+        _HEAD.pack_into(self.buf, 16, time.time_ns())
+
+    def heartbeat_age(self) -> float:
+        """Seconds since the producer last called touch()."""
+        return (time.time_ns() - _HEAD.unpack_from(self.buf, 16)[0]) / 1e9
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,51 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from clock import VirtualClock
+from executor import Executor
+from input_backend import FakeInputBackend
+from screen_wait import SyntheticScreenSource
+
+Timeline = List[Tuple[int, str]]
+
+
+def simulate(action_data: Dict[str, Any], window_tracker=None, cancel_at_ms: Optional[float] = None,
+             frame_provider=None, row: int = 0) -> Tuple[Timeline, FakeInputBackend, Executor]:
+    """Run one action on a virtual clock against fake input and screen.
+
+    Returns the timeline as ``(ns since trigger, text)`` entries, covering
+    status messages and every injected button press, plus the backend and
+    executor so callers can inspect exact timestamps and stats.
+    ``cancel_at_ms`` fires the kill switch at that simulated time. Without
+    a ``frame_provider`` the screen never changes, so Change/Match waits
+    run to their timeout. Ladders click ``row`` (0-based) of their table.
+    """
+    clock = VirtualClock()
+    backend = FakeInputBackend(clock)
+    executor = Executor(backend, clock)
+    executor.window_tracker = window_tracker
+    executor.set_screen_source(SyntheticScreenSource(frame_provider or (lambda x, y, w, h: bytes(w * h * 4))))
+
+    timeline: Timeline = []
+    executor.status_callback = lambda message: timeline.append((clock.now_ns(), message))
+
+    # Log presses as they happen so they interleave correctly with status messages
+    inject_button = backend.button
+
+    def button(name, down):
+        inject_button(name, down)
+        if down:
+            x, y = backend.position
+            timeline.append((clock.now_ns(), f"{name} click @ {x},{y}"))
+
+    backend.button = button
+    if cancel_at_ms is not None:
+        clock.call_at(int(cancel_at_ms * 1_000_000), executor.cancel_all)
+
+    executor.run_action(action_data, triggered_ns=clock.now_ns(), row=row)
+    return timeline, backend, executor
+
+
+def dry_run(action_data: Dict[str, Any], window_tracker=None, row: int = 0) -> List[str]:
+    """Computed timeline of an action as printable lines."""
+    timeline, _, _ = simulate(action_data, window_tracker, row=row)
+    return [f"{t / 1e6:>10.1f} ms  {text}" for t, text in timeline]
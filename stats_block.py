@@ -0,0 +1,157 @@
+import os
+import struct
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional
+
+DEFAULT_NAME = "strade_stats"
+MAGIC = 0x53545244  # "STRD"
+VERSION = 4
+
+HOOK_UNKNOWN = 0
+HOOK_OK = 1
+HOOK_DEGRADED = 2
+HOOK_DEAD = 3
+HOOK_STATES = {HOOK_UNKNOWN: "unknown", HOOK_OK: "ok", HOOK_DEGRADED: "degraded", HOOK_DEAD: "dead"}
+
+# Fixed layout; readers written in any language can rely on these offsets.
+_HEADER = struct.Struct("<IIQ")  # magic, version, sequence (odd while a write is in progress)
+_SEQ_OFFSET = 8
+FIELDS = (
+    ("triggers", "Q"),
+    ("executions", "Q"),
+    ("clicks", "Q"),
+    ("cancellations", "Q"),
+    ("kills", "Q"),
+    ("queue_depth", "Q"),
+    ("latency_p50_ns", "Q"),
+    ("latency_p90_ns", "Q"),
+    ("latency_p99_ns", "Q"),
+    ("latency_max_ns", "Q"),
+    ("kill_ack_worst_ns", "Q"),
+    ("kill_to_last_injection_worst_ns", "Q"),
+    ("ui_lag_p99_ns", "Q"),
+    ("ui_lag_max_ns", "Q"),
+    ("throttled", "Q"),
+    ("throttle_delay_max_ns", "Q"),
+    ("journal_dropped", "Q"),
+    ("updated_ns", "Q"),
+    ("last_error_ns", "Q"),
+    ("pid", "I"),
+    ("hook_health", "I"),
+    ("last_error", "128s"),
+)
+_BODY = struct.Struct("<" + "".join(fmt for _, fmt in FIELDS))
+_SEQ = struct.Struct("<Q")
+SIZE = _HEADER.size + _BODY.size
+
+# Offsets of individual fields, for single in-place writes
+_OFFSETS = {}
+_offset = _HEADER.size
+for _name, _fmt in FIELDS:
+    _OFFSETS[_name] = (_offset, struct.Struct("<" + _fmt))
+    _offset += struct.calcsize("<" + _fmt)
+
+
+class StatsBlock:
+    """Fixed-layout executor stats in shared memory for external monitors.
+
+    Writes are in place (struct.pack_into) and guarded by a sequence lock:
+    the writer bumps the sequence to odd, writes, then bumps it to even.
+    Readers retry if the sequence changed underneath them, so the writer
+    never waits for a reader. The sequence lock needs a single writer, and
+    several threads publish (hook callbacks, the worker and lanes, the
+    watchdog, the UI), so writers serialize on ``_write_lock``.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.buf = shm.buf
+        self.owner = owner
+        self._seq = _HEADER.unpack_from(self.buf, 0)[2]
+        self._write_lock = threading.Lock()
+
+    @classmethod
+    def create(cls, name: str = DEFAULT_NAME) -> "StatsBlock":
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=SIZE)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, 0)
+        block = cls(shm, owner=True)
+        block.publish({"pid": os.getpid()})
+        return block
+
+    @classmethod
+    def attach(cls, name: str = DEFAULT_NAME) -> "StatsBlock":
+        shm = shared_memory.SharedMemory(name=name)
+        if os.name == "posix":
+            # Readers must not unlink the writer's segment on exit
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        magic, version, _ = _HEADER.unpack_from(shm.buf, 0)
+        if magic != MAGIC or version != VERSION:
+            shm.close()
+            raise ValueError(f"Unexpected stats block layout (magic={magic:#x}, version={version})")
+        return cls(shm, owner=False)
+
+    def _begin(self):
+        self._seq += 1
+        _SEQ.pack_into(self.buf, _SEQ_OFFSET, self._seq)
+
+    def _end(self):
+        self._seq += 1
+        _SEQ.pack_into(self.buf, _SEQ_OFFSET, self._seq)
+
+    def publish(self, values: Dict[str, Any]):
+        """Overwrite the given fields (others keep their value) in one sequenced write."""
+        with self._write_lock:
+            self._begin()
+            try:
+                for name, value in values.items():
+                    slot = _OFFSETS.get(name)
+                    if slot is None:
+                        continue
+                    offset, fmt = slot
+                    if name == "last_error":
+                        value = str(value).encode("utf-8")[:127]
+                    fmt.pack_into(self.buf, offset, value)
+                _OFFSETS["updated_ns"][1].pack_into(self.buf, _OFFSETS["updated_ns"][0], time.time_ns())
+            finally:
+                self._end()
+
+    def write_field(self, name: str, value: int):
+        """Single counter update, cheap enough for a hook callback."""
+        offset, fmt = _OFFSETS[name]
+        with self._write_lock:
+            self._begin()
+            fmt.pack_into(self.buf, offset, value)
+            self._end()
+
+    def read(self, retries: int = 100) -> Optional[Dict[str, Any]]:
+        """Consistent snapshot of all fields, or None if the writer kept racing us."""
+        for _ in range(retries):
+            seq_before = _SEQ.unpack_from(self.buf, _SEQ_OFFSET)[0]
+            if seq_before & 1:
+                continue
+            values = _BODY.unpack_from(self.buf, _HEADER.size)
+            seq_after = _SEQ.unpack_from(self.buf, _SEQ_OFFSET)[0]
+            if seq_before == seq_after:
+                snapshot = dict(zip((name for name, _ in FIELDS), values))
+                snapshot["last_error"] = snapshot["last_error"].rstrip(b"\0").decode("utf-8", "replace")
+                snapshot["sequence"] = seq_after
+                return snapshot
+        return None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,66 @@
+"""Read the executor's shared-memory stats block without touching the UI.
+
+Usage:
+    python stats_reader.py [--name strade_stats] [--watch SECONDS] [--json]
+"""
+import argparse
+import json
+import time
+
+from stats_block import DEFAULT_NAME, HOOK_STATES, StatsBlock
+
+
+def format_snapshot(snapshot) -> str:
+    age = (time.time_ns() - snapshot["updated_ns"]) / 1e9 if snapshot["updated_ns"] else float("nan")
+    lines = [
+        f"pid {snapshot['pid']}  updated {age:.1f}s ago  hooks {HOOK_STATES.get(snapshot['hook_health'], '?')}",
+        f"triggers {snapshot['triggers']}  executions {snapshot['executions']}  clicks {snapshot['clicks']}  "
+        f"cancellations {snapshot['cancellations']}  kills {snapshot['kills']}  queue {snapshot['queue_depth']}",
+        f"latency p50 {snapshot['latency_p50_ns'] / 1e6:.2f}ms  p90 {snapshot['latency_p90_ns'] / 1e6:.2f}ms  "
+        f"p99 {snapshot['latency_p99_ns'] / 1e6:.2f}ms  max {snapshot['latency_max_ns'] / 1e6:.2f}ms",
+        f"kill ack worst {snapshot['kill_ack_worst_ns'] / 1e6:.2f}ms  "
+        f"cancel->last injection worst {snapshot['kill_to_last_injection_worst_ns'] / 1e6:.2f}ms",
+        f"ui lag p99 {snapshot['ui_lag_p99_ns'] / 1e6:.2f}ms  max {snapshot['ui_lag_max_ns'] / 1e6:.2f}ms",
+        f"throttled {snapshot['throttled']}  throttle delay max {snapshot['throttle_delay_max_ns'] / 1e6:.2f}ms  "
+        f"journal dropped {snapshot['journal_dropped']}",
+    ]
+    if snapshot["last_error"]:
+        when = time.strftime("%H:%M:%S", time.localtime(snapshot["last_error_ns"] / 1e9))
+        lines.append(f"last error [{when}]: {snapshot['last_error']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--name", default=DEFAULT_NAME, help="Shared memory name of the stats block")
+    parser.add_argument("--watch", type=float, default=0, help="Refresh every N seconds")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    args = parser.parse_args()
+
+    try:
+        block = StatsBlock.attach(args.name)
+    except FileNotFoundError:
+        raise SystemExit(f"No stats block named '{args.name}' (is the executor running?)")
+
+    try:
+        while True:
+            snapshot = block.read()
+            if snapshot is None:
+                print("Stats block busy, retrying")
+            elif args.json:
+                print(json.dumps(snapshot))
+            else:
+                print(format_snapshot(snapshot))
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+            if not args.json:
+                print()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        block.close()
+
+
+if __name__ == "__main__":
+    main()
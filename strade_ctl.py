@@ -0,0 +1,40 @@
+"""Send commands to a running app through its control channel.
+
+Usage:
+    python strade_ctl.py profile NAME
+    python strade_ctl.py trigger HOTKEY [--row N]
+"""
+import argparse
+import sys
+
+from control_channel import CTL_PROFILE, CTL_TRIGGER, pack_trigger, send_command
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    profile = commands.add_parser("profile", help="Switch the active profile")
+    profile.add_argument("name")
+    trigger = commands.add_parser("trigger", help="Fire the active profile's action for a hotkey")
+    trigger.add_argument("hotkey")
+    trigger.add_argument("--row", type=int, help="Ladder row to fire (1-based)")
+    args = parser.parse_args()
+    if args.command == "trigger" and args.row is not None and args.row < 1:
+        parser.error("--row starts at 1")
+
+    try:
+        if args.command == "profile":
+            sent = send_command(CTL_PROFILE, args.name.encode("utf-8"))
+        elif args.command == "trigger":
+            row = args.row - 1 if args.row is not None else None
+            sent = send_command(CTL_TRIGGER, pack_trigger(args.hotkey, row))
+    except FileNotFoundError:
+        print("No running instance found (control channel missing)", file=sys.stderr)
+        raise SystemExit(1)
+    if not sent:
+        print("Control channel full, command dropped", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
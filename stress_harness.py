@@ -0,0 +1,158 @@
+"""Soak test the UI against fake input and window backends.
+
+Drives thousands of simulated hotkey triggers, hotkey bindings, coordinate
+picks and test toggles through a real App (real Tk, fake input/windows).
+After every round it lets animations settle and samples live threads, Tk
+widgets, pending after() callbacks and tracemalloc usage. Exits with code 1
+if any of them keeps growing past its tolerance.
+
+Usage:
+    python stress_harness.py [--rounds 10] [--cycles 200] [--memory-mb 4]
+"""
+import argparse
+import gc
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from config_manager import ConfigManager
+from input_backend import FakeInputBackend
+from screen_wait import SyntheticScreenSource
+from window_tracker import FakeWindowProvider
+
+HOTKEYS = ["f13", "f14", "f15", "f16"]
+
+
+def pump(app, seconds: float):
+    """Run the Tk event loop for a while without entering mainloop()."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.update()
+        time.sleep(0.002)
+
+
+def settle(app, executor, timeout: float = 10.0, quiet: float = 1.5):
+    """Wait for queued executions to finish and for animations to expire."""
+    deadline = time.perf_counter() + timeout
+    while not executor.is_idle() and time.perf_counter() < deadline:
+        pump(app, 0.01)
+    # Ripples self-destruct within 1s; give their failsafes time to fire
+    pump(app, quiet)
+
+
+def count_widgets(widget) -> int:
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def sample(app):
+    gc.collect()
+    return {
+        "threads": threading.active_count(),
+        "widgets": count_widgets(app),
+        "after": len(app.tk.splitlist(app.tk.call("after", "info"))),
+        "memory": tracemalloc.get_traced_memory()[0],
+    }
+
+
+def run_cycle(app, backend, index: int):
+    frame = app.actions[index % len(app.actions)]
+    hotkey = HOTKEYS[index % len(HOTKEYS)]
+
+    # Trigger the action like a user pressing its hotkey
+    backend.press(hotkey)
+    pump(app, 0.005)
+
+    # Show and hide the test crosshairs
+    app.test_action(frame)
+    pump(app, 0.005)
+    app.test_action(frame)
+
+    # Re-bind the same hotkey
+    app.wait_for_hotkey(frame)
+    backend.press(hotkey)
+    pump(app, 0.005)
+
+    # Re-pick the first coordinate (twice, the first pick is abandoned)
+    row = frame.coord_rows[0]
+    x, y = row.get_coord()
+    app.start_picking(row)
+    app.start_picking(row)
+    backend.user_click(x, y, "middle")
+    pump(app, 0.005)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=10, help="Measurement rounds (the first is warm-up)")
+    parser.add_argument("--cycles", type=int, default=200, help="Trigger/bind/pick/test cycles per round")
+    parser.add_argument("--threads", type=int, default=2, help="Allowed growth in live threads")
+    parser.add_argument("--widgets", type=int, default=20, help="Allowed growth in Tk widgets")
+    parser.add_argument("--after", type=int, default=10, help="Allowed growth in pending after() callbacks")
+    parser.add_argument("--memory-mb", type=float, default=4.0, help="Allowed growth in traced memory")
+    args = parser.parse_args()
+
+    from main import App
+
+    workdir = tempfile.mkdtemp(prefix="strade_soak_")
+    config = ConfigManager(os.path.join(workdir, "config.json"))
+    config.config.update({"engine_mode": "thread", "journal_enabled": False, "stats_block_name": ""})
+
+    backend = FakeInputBackend()
+    provider = FakeWindowProvider()
+    app = App(config_manager=config, backend=backend, window_provider=provider)
+    app.executor.set_screen_source(SyntheticScreenSource(lambda x, y, w, h: bytes(w * h * 4)))
+    for i, hotkey in enumerate(HOTKEYS):
+        app.add_action({
+            "name": f"Soak {i + 1}",
+            "hotkey": hotkey,
+            "coords": [{"x": 100 + i * 40, "y": 200}, {"x": 120 + i * 40, "y": 240}],
+            "mode": "Double" if i % 2 else "Single",
+            "delay_ms": 0,
+        })
+    app.refresh_executor()
+    settle(app, app.executor)
+
+    tracemalloc.start()
+    samples = []
+    cycle = 0
+    print(f"{'round':>5} {'cycles':>7} {'threads':>8} {'widgets':>8} {'after':>6} {'memory':>10} {'clicks':>7}")
+    for round_index in range(args.rounds):
+        for _ in range(args.cycles):
+            run_cycle(app, backend, cycle)
+            cycle += 1
+        settle(app, app.executor)
+        clicks = len(backend.clicks())
+        # The fake backend's own event log is expected to grow
+        backend.events.clear()
+        samples.append(sample(app))
+        s = samples[-1]
+        print(f"{round_index:>5} {cycle:>7} {s['threads']:>8} {s['widgets']:>8} {s['after']:>6} "
+              f"{s['memory'] / 1024:>8.0f}KB {clicks:>7}")
+
+    app.executor.stop_listening()
+    app.destroy()
+
+    if len(samples) < 2:
+        raise SystemExit("Need at least two rounds to measure growth")
+    baseline, final = samples[0], samples[-1]
+    limits = {
+        "threads": args.threads,
+        "widgets": args.widgets,
+        "after": args.after,
+        "memory": int(args.memory_mb * 1024 * 1024),
+    }
+    leaks = [
+        f"{name}: {baseline[name]} -> {final[name]} (allowed +{limit})"
+        for name, limit in limits.items()
+        if final[name] - baseline[name] > limit
+    ]
+    if leaks:
+        print("LEAK " + "; ".join(leaks))
+        raise SystemExit(1)
+    print(f"OK after {cycle} cycles")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import json
+
+from config_manager import ConfigManager
+
+
+def test_saves_reach_the_file_again_after_a_conflict(tmp_path):
+    path = tmp_path / "config.json"
+    manager = ConfigManager(str(path))
+    conflicts = []
+    manager.conflict_callback = lambda conflict_path, data: conflicts.append((conflict_path, json.loads(data)))
+    manager.config["theme"] = "Light"
+    assert manager.save_config()
+
+    path.write_text(json.dumps({"actions": [], "theme": "Blue"}))
+    manager.config["theme"] = "Green"
+    assert not manager.save_config()
+    assert json.loads(path.read_text())["theme"] == "Blue"
+    assert json.loads((tmp_path / "config.json.conflict").read_text())["theme"] == "Green"
+    assert conflicts == [(str(path) + ".conflict", {"actions": [], "theme": "Blue"})]
+
+    manager.config["theme"] = "Dark"
+    assert manager.save_config()
+    assert json.loads(path.read_text())["theme"] == "Dark"
+    assert len(conflicts) == 1
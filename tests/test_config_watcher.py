@@ -0,0 +1,48 @@
+from config_manager import ConfigManager
+from config_watcher import ConfigChange, diff_configs
+
+
+def action(name, **extra):
+    return dict({"name": name, "hotkey": "", "coords": []}, **extra)
+
+
+def test_only_edited_actions_are_in_the_diff():
+    old = {"actions": [action("Buy"), action("Sell"), action("Flat")], "theme": "Dark"}
+    new = {"actions": [action("Buy"), action("Sell", delay_ms=5), action("Flat"), action("Hedge")],
+           "theme": "Dark"}
+    diff = diff_configs(old, new)
+    assert diff.actions == {"Default": [("replace", 1, 2, [action("Sell", delay_ms=5)]),
+                                        ("insert", 3, 3, [action("Hedge")])]}
+    assert diff.counts() == (1, 0, 1)
+    assert diff.settings == {}
+
+
+def test_profiles_and_settings():
+    old = {"profiles": {"A": {"actions": [action("Buy")]}, "B": {"actions": [action("Sell")]}},
+           "active_profile": "A"}
+    new = {"profiles": {"A": {"actions": [], "hotkey": "f9"}, "C": {"actions": [action("Hedge")]}},
+           "active_profile": "C"}
+    diff = diff_configs(old, new)
+    assert diff.added_profiles == {"C": [action("Hedge")]}
+    assert diff.removed_profiles == ["B"]
+    assert diff.actions == {"A": [("delete", 0, 1, [])]}
+    assert diff.counts() == (1, 1, 0)
+    assert diff.settings["active_profile"] == "C"
+    assert diff.settings["profile_hotkeys"] == {"f9": "A"}
+
+
+def test_identical_configs_have_an_empty_diff():
+    config = {"actions": [action("Buy")], "theme": "Dark"}
+    assert diff_configs(config, dict(config)).is_empty()
+
+
+def test_change_is_rediffed_once_the_model_moves_on(tmp_path):
+    manager = ConfigManager(str(tmp_path / "config.json"))
+    manager.config = {"actions": [action("Buy")]}
+    edited = {"actions": [action("Buy"), action("Sell")]}
+    change = ConfigChange(edited, "digest", diff_configs(manager.config, edited), manager.version)
+    assert change.diff_for(manager).counts() == (1, 0, 0)
+
+    manager.config = {"actions": [action("Buy"), action("Sell")]}
+    manager.version += 1
+    assert change.diff_for(manager).is_empty()
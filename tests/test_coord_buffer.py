@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+from coord_buffer import CoordBuffer, coords_of, json_default
+
+
+def test_csv_import_skips_headers_and_reads_every_separator():
+    text = "x,y,ref\n10,20\n\n30;40;123\n50\t60\n70 80\n-5.7,9\nnot,a,point\n"
+    buffer = CoordBuffer.from_csv(text)
+    assert [buffer.point(i) for i in range(len(buffer))] == [(10, 20), (30, 40), (50, 60), (70, 80), (-5, 9)]
+    assert [buffer.ref(i) for i in range(len(buffer))] == [None, 123, None, None, None]
+
+
+def test_csv_without_points_is_an_error():
+    with pytest.raises(ValueError):
+        CoordBuffer.from_csv("x,y\n\n")
+
+
+def test_packed_json_round_trips_points_and_refs():
+    buffer = CoordBuffer.from_points([(1, 2), (-3, 4, 2 ** 40), (5, -6)])
+    saved = json.loads(json.dumps({"coord_buffer": buffer}, default=json_default))
+    loaded = coords_of(saved)
+    assert list(loaded.xy) == [1, 2, -3, 4, 5, -6]
+    assert [loaded.ref(i) for i in range(3)] == [None, 2 ** 40, None]
+    assert loaded.to_dicts() == buffer.to_dicts()
+
+
+def test_refs_are_added_lazily():
+    buffer = CoordBuffer.from_points([(1, 1), (2, 2)])
+    assert buffer.refs is None
+    buffer.extend(CoordBuffer.from_points([(3, 3, 7)]))
+    assert [buffer.ref(i) for i in range(3)] == [None, None, 7]
+    assert buffer.translated(10, 20).point(2) == (13, 23)
+    assert buffer.summary() == "3 points · x 1–3 · y 1–3"
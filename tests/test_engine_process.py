@@ -0,0 +1,71 @@
+import uuid
+
+import pytest
+
+from engine_process import CMD_PLAN, EVT_EXEC_END, EVT_EXEC_START, EVT_STATUS, EngineClient, _ReliableEvents
+from executor import Executor
+from input_backend import FakeInputBackend
+from shm_ring import ShmRing
+from stats_block import StatsBlock
+
+
+@pytest.fixture
+def ring():
+    ring = ShmRing.create(f"strade_test_{uuid.uuid4().hex[:8]}", 256)
+    yield ring
+    ring.close()
+
+
+def drain(ring):
+    messages = []
+    while (message := ring.pop()) is not None:
+        messages.append(message[0])
+    return messages
+
+
+def test_execution_events_survive_a_full_ring(ring):
+    reliable = _ReliableEvents(ring)
+    while ring.push(EVT_STATUS):
+        pass
+    reliable.push(EVT_EXEC_START)
+    reliable.push(EVT_EXEC_END)
+    assert len(reliable.pending) == 2
+
+    assert set(drain(ring)) == {EVT_STATUS}
+    reliable.flush()
+    assert not reliable.pending
+    assert drain(ring) == [EVT_EXEC_START, EVT_EXEC_END]
+
+
+def test_new_execution_events_queue_behind_pending_ones(ring):
+    reliable = _ReliableEvents(ring)
+    while ring.push(EVT_STATUS):
+        pass
+    reliable.push(EVT_EXEC_START)
+    drain(ring)
+    reliable.push(EVT_EXEC_END)  # The ring has room again, but START must go first
+    assert drain(ring) == []
+    reliable.flush()
+    assert drain(ring) == [EVT_EXEC_START, EVT_EXEC_END]
+
+
+def test_ui_lag_reaches_the_engine_stats_block():
+    executor = Executor(FakeInputBackend())
+    executor.publish_ui_lag(1, 2)  # No stats block: nothing to do
+    executor.stats_block = StatsBlock.create(f"strade_test_{uuid.uuid4().hex[:8]}")
+    try:
+        executor.publish_ui_lag(3_000_000, 9_000_000)
+        snapshot = executor.stats_block.read()
+        assert (snapshot["ui_lag_p99_ns"], snapshot["ui_lag_max_ns"]) == (3_000_000, 9_000_000)
+    finally:
+        executor.stats_block.close()
+
+
+def test_oversize_command_is_reported_not_raised(ring):
+    client = EngineClient.__new__(EngineClient)  # Only the command ring, no engine process
+    client.commands = ring
+    messages = []
+    client.status_callback = messages.append
+    client._send(CMD_PLAN, bytes(1024))
+    assert drain(ring) == []
+    assert messages == ["⚠️ Engine: Message of 1024 bytes does not fit the ring"]
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from executor import Executor
+from input_backend import FakeInputBackend
+from macro import BUTTON_DOWN, BUTTON_UP, MacroBuffer
+
+
+def wait_idle(executor, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not executor.is_idle():
+        assert time.monotonic() < deadline, "executor did not finish"
+        time.sleep(0.005)
+
+
+def test_release_after_kill_is_counted():
+    # A drag: the button stays down for 500ms, and the kill comes in between
+    macro = MacroBuffer()
+    macro.append(0, BUTTON_DOWN, 5, 5, 0)
+    macro.append(500_000, BUTTON_UP, 50, 5, 0)
+    backend = FakeInputBackend()
+    executor = Executor(backend)
+    pressed = threading.Event()
+    executor.click_indicator_callback = lambda x, y: pressed.set()
+    executor.trigger({"name": "Drag", "macro": macro})
+    assert pressed.wait(1.0)
+    killed_ns = time.perf_counter_ns()
+    executor.cancel_all()  # Acknowledged while the button is still down
+    wait_idle(executor)
+
+    buttons = [(e[0], e[5]) for e in backend.events if e[1] == "button"]
+    assert [down for _, down in buttons] == [True, False]  # Released by the kill, not the macro
+    released_ns = buttons[-1][0]
+    assert released_ns > killed_ns
+    # The release is the last injection after the kill and is what the stat reports
+    assert executor.stats["kill_to_last_injection_worst_ns"] >= (released_ns - killed_ns) // 2
+    assert executor.stats["kill_to_last_injection_worst_ns"] > 0
+
+
+def test_start_and_end_callbacks_are_paired():
+    executor = Executor(FakeInputBackend())
+    events = []
+    executor.execution_start_callback = lambda: events.append("start")
+    executor.execution_end_callback = lambda: events.append("end")
+    # Anchored to a window that cannot be resolved: nothing runs, so neither fires
+    executor.run_action({"name": "Anchored", "window": "Missing|app.exe", "coords": [{"x": 1, "y": 1}]})
+    assert events == []
+    executor.run_action({"name": "Plain", "coords": [{"x": 1, "y": 1}]})
+    assert events == ["start", "end"]
@@ -0,0 +1,61 @@
+import gc
+
+import pytest
+
+from gc_guard import GcGuard
+
+
+@pytest.fixture
+def guard_factory():
+    guards = []
+
+    def make(**kwargs):
+        guards.append(GcGuard(**kwargs))
+        return guards[-1]
+
+    yield make
+    for guard in guards:
+        guard.close()
+    gc.enable()
+
+
+def test_collection_is_held_off_while_executions_overlap(guard_factory):
+    guard = guard_factory(enabled=True, idle_ms=0)
+    guard.begin_execution()
+    guard.begin_execution()
+    assert not gc.isenabled()
+    guard.end_execution()
+    assert not gc.isenabled()  # One execution is still in flight
+    assert not guard.collect_if_idle()
+    guard.end_execution()
+    assert gc.isenabled()
+    assert guard.deferred == 1
+    assert guard.collect_if_idle()
+    assert not guard.collect_if_idle()  # The deferred work is done once
+    assert guard.idle_collections == 1
+
+
+def test_deferred_collection_waits_for_the_idle_period(guard_factory):
+    guard = guard_factory(enabled=True, idle_ms=60_000)
+    guard.begin_execution()
+    guard.end_execution()
+    assert not guard.collect_if_idle()
+
+
+def test_pauses_are_split_by_execution_even_when_disabled(guard_factory):
+    guard = guard_factory(enabled=False)
+    guard.begin_execution()
+    assert gc.isenabled()  # Measuring only
+    gc.collect()
+    guard.end_execution()
+    gc.collect()
+    summary = guard.summary()
+    assert summary["pause_in_execution"]["count"] >= 1
+    assert summary["pause_idle"]["count"] >= 1
+    assert summary["deferred"] == 0
+
+
+def test_close_unhooks_the_callback(guard_factory):
+    guard = guard_factory()
+    guard.close()
+    assert guard._on_gc not in gc.callbacks
@@ -0,0 +1,98 @@
+import threading
+import time
+
+from clock import VirtualClock
+from executor import Executor
+from governor import PRIORITY_HIGH, InjectionGovernor, TokenBucket
+from input_backend import FakeInputBackend
+
+
+def test_bucket_refills_at_rate_up_to_capacity():
+    bucket = TokenBucket(10, 3, now_ns=0)
+    for _ in range(3):
+        assert bucket.wait_ns(0) == 0
+        bucket.take(0)
+    assert 99_000_000 < bucket.wait_ns(0) <= 100_000_001  # One token every 100ms
+    assert bucket.wait_ns(10_000_000_000) == 0
+    assert bucket.tokens == 3  # Never more than the capacity
+
+
+def test_sustained_and_peak_rates_shape_a_burst():
+    clock = VirtualClock()
+    governor = InjectionGovernor(sustained_cps=10, peak_cps=40, clock=clock)
+    token = threading.Event()
+    times = []
+    for _ in range(60):
+        assert governor.acquire(token)
+        times.append(clock.now_ns())
+    gaps = [b - a for a, b in zip(times, times[1:])]
+    assert min(gaps) >= 25_000_000 - 1  # Never faster than the peak rate
+    # A full second later the 40-click burst is spent and the sustained rate rules
+    assert gaps[-1] >= 100_000_000 - 1
+    summary = governor.summary()
+    assert summary["passed"] == 60
+    assert summary["throttled"] == 59
+    assert summary["delay_max_ns"] >= 100_000_000 - 1
+
+
+def test_per_target_limit_only_applies_to_its_target():
+    clock = VirtualClock()
+    governor = InjectionGovernor(per_target={"Slow": 5}, clock=clock)
+    token = threading.Event()
+    for _ in range(3):
+        governor.acquire(token, "Slow")
+    assert clock.now_ns() >= 400_000_000 - 2
+    before = clock.now_ns()
+    for _ in range(100):
+        governor.acquire(token, "Other")
+    assert clock.now_ns() == before
+    assert governor.summary()["throttled_by_target"] == {"Slow": 2}
+
+
+def test_high_priority_never_waits_and_the_debt_is_paid_by_normal_clicks():
+    clock = VirtualClock()
+    governor = InjectionGovernor(sustained_cps=10, clock=clock)
+    token = threading.Event()
+    for _ in range(10):
+        governor.acquire(token)
+    assert governor.acquire(token, priority=PRIORITY_HIGH)
+    assert clock.now_ns() == 0
+    assert governor.summary()["bypassed"] == 1
+    governor.acquire(token)
+    assert clock.now_ns() >= 200_000_000 - 2  # Waited for the bypass's token too
+
+
+def test_a_cancel_wakes_a_throttled_click():
+    clock = VirtualClock()
+    governor = InjectionGovernor(sustained_cps=1, clock=clock)
+    token = threading.Event()
+    governor.acquire(token)
+    clock.call_later(0.2, token.set)
+    assert not governor.acquire(token)
+    assert clock.now_ns() == 200_000_000
+    assert governor.summary()["cancelled"] == 1
+
+
+def test_no_limits_means_no_governor():
+    assert InjectionGovernor.from_config({"sustained_cps": 0, "peak_cps": 0, "per_target": {}}) is None
+    assert InjectionGovernor.from_config(None) is None
+    assert InjectionGovernor.from_config({"per_target": {"A": 3}}) is not None
+
+
+def test_high_priority_action_passes_a_throttled_burst():
+    backend = FakeInputBackend()
+    executor = Executor(backend)
+    executor.governor = InjectionGovernor(sustained_cps=20)
+    burst = [{"x": 1, "y": 1}] * 40  # 20 go at once, then 50ms apart
+    executor.trigger({"name": "Burst", "coords": burst, "delay_ms": 0})
+    time.sleep(0.1)
+    executor.trigger({"name": "Urgent", "coords": [{"x": 9, "y": 9}], "priority": PRIORITY_HIGH})
+    deadline = time.monotonic() + 3
+    while not executor.is_idle():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    presses = [(e[2], e[3]) for e in backend.events if e[1] == "button" and e[5]]
+    assert len(presses) == 41
+    urgent = presses.index((9, 9))
+    assert urgent < 30  # Well before the burst's last click
+    assert executor.governor.summary()["bypassed"] >= 1
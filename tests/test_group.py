@@ -0,0 +1,126 @@
+import pytest
+
+from clock import VirtualClock
+from executor import Executor
+from group import Timeline, format_group_spec, parse_group_spec
+from input_backend import FakeInputBackend
+from macro import BUTTON_DOWN, BUTTON_UP, MacroBuffer
+from message_backend import FakeMessageBackend
+from plan import compile_action, compile_group, decode_plan, encode_plan
+from simulation import simulate
+from window_tracker import FakeWindowProvider, WindowTracker
+
+ACTIONS = {
+    "Burst": {"name": "Burst", "coords": [{"x": 10, "y": 10}, {"x": 20, "y": 20}, {"x": 30, "y": 30}],
+              "mode": "Burst", "burst_count": 4, "delay_ms": 5},
+    "Double": {"name": "Double", "coords": [{"x": 40, "y": 40}, {"x": 50, "y": 50}], "mode": "Double",
+               "delay_ms": 100},
+    "Single": {"name": "Single", "coords": [{"x": 60, "y": 60}, {"x": 70, "y": 70}], "delay_ms": 30},
+}
+
+
+def press_times(action_data):
+    """When the executor presses each point of an action, on a virtual clock."""
+    _, backend, _ = simulate(action_data)
+    return [(t, x, y) for t, kind, x, y, _, down in backend.events if kind == "button" and down]
+
+
+def timeline_presses(timeline):
+    return [(t, x, y) for t, _, kind, x, y, _ in timeline.events() if kind == BUTTON_DOWN]
+
+
+@pytest.mark.parametrize("name", sorted(ACTIONS))
+def test_member_timeline_matches_executor_timing(name):
+    timeline = Timeline.merge([(compile_action(ACTIONS[name]), 0)])
+    assert timeline_presses(timeline) == press_times(ACTIONS[name])
+
+
+def test_merged_timeline_is_sorted_and_keeps_each_member():
+    group = {"name": "G", "group": parse_group_spec("Burst@0, Double@7, Single@12")}
+    timeline = compile_group(group, ACTIONS)["timeline"]
+    times = list(timeline.t_ns)
+    assert times == sorted(times)
+    for index, name in enumerate(("Burst", "Double", "Single")):
+        offset = (0, 7, 12)[index] * 1_000_000
+        member = [(t - offset, x, y) for t, m, kind, x, y, _ in timeline.events()
+                  if m == index and kind == BUTTON_DOWN]
+        assert member == press_times(ACTIONS[name])
+    # Every press is followed by its own release before that member's next event
+    for index in range(3):
+        kinds = [kind for _, m, kind, _, _, _ in timeline.events() if m == index]
+        assert kinds == [BUTTON_DOWN, BUTTON_UP] * (len(kinds) // 2)
+
+
+def test_group_plays_its_timeline_under_one_execution():
+    group = {"name": "G", "group": parse_group_spec("Single@0, Double@15")}
+    plan = compile_group(group, ACTIONS)
+    _, backend, executor = simulate(plan)
+    presses = [(t, x, y) for t, kind, x, y, _, down in backend.events if kind == "button" and down]
+    assert presses == timeline_presses(plan["timeline"])
+    assert executor.stats["executions"] == 1
+
+
+def test_kill_stops_the_whole_group():
+    plan = compile_group({"name": "G", "group": parse_group_spec("Single@0, Double@15")}, ACTIONS)
+    _, backend, _ = simulate(plan, cancel_at_ms=20)
+    presses = [t for t, kind, *_ , down in backend.events if kind == "button" and down]
+    assert presses and max(presses) < 20_000_000
+    buttons = [down for _, kind, _, _, _, down in backend.events if kind == "button"]
+    assert buttons.count(True) == buttons.count(False)
+
+
+def test_macro_members_keep_their_timing_and_keys():
+    macro = MacroBuffer()
+    macro.append(0, BUTTON_DOWN, 1, 1, 0)
+    macro.append(8_000, BUTTON_UP, 1, 1, 0)
+    macro.append_key(20_000, "ctrl+c", 1, 1)
+    actions = dict(ACTIONS, Mac={"name": "Mac", "macro": macro, "time_scale": 2.0})
+    timeline = compile_group({"name": "G", "group": parse_group_spec("Mac@100")}, actions)["timeline"]
+    assert [(t, kind) for t, _, kind, *_ in timeline.events()] == [
+        (100_000_000, BUTTON_DOWN), (104_000_000, BUTTON_UP), (110_000_000, 3)]
+    assert timeline.keys == ["ctrl+c"]
+
+
+def test_group_plan_round_trips():
+    plan = compile_group({"name": "G", "hotkey": "f1", "group": parse_group_spec("Burst@0, Single@40")}, ACTIONS)
+    decoded = decode_plan(encode_plan(plan))
+    assert list(decoded["timeline"].events()) == list(plan["timeline"].events())
+    assert decoded["timeline"].members == plan["timeline"].members
+    assert list(compile_action(decoded)["timeline"].events()) == list(plan["timeline"].events())
+
+
+def test_members_are_routed_by_their_own_delivery():
+    chart = "TerminalWindow|terminal.exe"
+    actions = dict(ACTIONS, Post={"name": "Post", "coords": [{"x": 5, "y": 6}], "window": chart,
+                                  "delivery": "message", "delay_ms": 0})
+    plan = compile_group({"name": "G", "group": parse_group_spec("Post@0, Single@10")}, actions)
+    plan = decode_plan(encode_plan(plan))  # The delivery survives the engine's encoding
+
+    clock = VirtualClock()
+    backend = FakeInputBackend(clock)
+    executor = Executor(backend, clock)
+    tracker = WindowTracker(FakeWindowProvider({chart: (100, 100, 500, 500)}))
+    tracker.watch(chart)
+    tracker.start()
+    executor.window_tracker = tracker
+    executor.message_backend = FakeMessageBackend({chart: (100, 100, 500, 500)}, clock)
+    executor.run_action(plan, triggered_ns=clock.now_ns())
+
+    assert [(t, w, x, y) for t, w, x, y, _ in executor.message_backend.clicks()] == [(0, chart, 5, 6)]
+    # Only the cursor member moved the cursor
+    assert {(x, y) for _, kind, x, y, _, _ in backend.events if kind == "move"} == {(60, 60), (70, 70)}
+
+
+def test_bad_members_are_rejected():
+    with pytest.raises(ValueError):
+        compile_group({"name": "G", "group": [{"action": "Nope"}]}, ACTIONS)
+    nested = dict(ACTIONS, Inner={"name": "Inner", "group": [{"action": "Single"}]})
+    with pytest.raises(ValueError):
+        compile_group({"name": "G", "group": [{"action": "Inner"}]}, nested)
+
+
+def test_group_spec_text():
+    members = parse_group_spec("Cancel all@0, Requote @ 150, Last")
+    assert members == [{"action": "Cancel all", "offset_ms": 0}, {"action": "Requote", "offset_ms": 150},
+                       {"action": "Last", "offset_ms": 0}]
+    assert format_group_spec(members) == "Cancel all@0, Requote@150, Last@0"
@@ -0,0 +1,50 @@
+from hook_watchdog import HookWatchdog
+from input_backend import FakeInputBackend
+from input_hub import InputHub
+from stats_block import HOOK_DEAD, HOOK_DEGRADED, HOOK_OK
+
+
+def make_watchdog(reinstall=None):
+    backend = FakeInputBackend()
+    hub = InputHub(backend)
+    hub.start()
+    reports = []
+    watchdog = HookWatchdog(hub, reinstall or hub.restart, lambda state, message: reports.append((state, message)),
+                            probe_timeout=0.05)
+    return backend, hub, watchdog, reports
+
+
+def test_delivering_hooks_are_ok():
+    _, _, watchdog, reports = make_watchdog()
+    assert watchdog.check() == HOOK_OK
+    assert reports == [(HOOK_OK, None)]
+    assert watchdog.check() == HOOK_OK
+    assert len(reports) == 1  # Only changes and incidents are reported
+
+
+def test_dropped_hooks_are_reinstalled():
+    backend, hub, watchdog, reports = make_watchdog()
+    backend.hooks = None  # The OS silently removed them
+    assert watchdog.check() == HOOK_DEGRADED
+    assert watchdog.reinstalls == 1
+    assert backend.hooks is not None
+    assert reports[-1] == (HOOK_DEGRADED, "Hooks stopped delivering events; re-installed")
+    assert watchdog.check() == HOOK_OK
+
+
+def test_hooks_that_stay_dead_are_reported():
+    backend, _, watchdog, reports = make_watchdog(reinstall=lambda: None)
+    backend.hooks = None
+    assert watchdog.check() == HOOK_DEAD
+    assert reports[-1] == (HOOK_DEAD, "Hooks stopped delivering events; re-install failed")
+    assert [message for _, message in watchdog.incidents] == ["Hooks stopped delivering events; re-install failed"]
+
+
+def test_failing_reinstall_is_an_incident():
+    def reinstall():
+        raise OSError("SetWindowsHookEx failed")
+
+    backend, _, watchdog, reports = make_watchdog(reinstall)
+    backend.hooks = None
+    assert watchdog.check() == HOOK_DEAD
+    assert "Hook re-install raised: SetWindowsHookEx failed" in reports[-1][1]
@@ -0,0 +1,79 @@
+from input_backend import FakeInputBackend
+from input_hub import InputHub, MovementDetector
+
+
+def started_hub():
+    backend = FakeInputBackend()
+    hub = InputHub(backend)
+    hub.start()
+    return backend, hub
+
+
+def test_combos_are_reported_once_with_modifiers_first():
+    backend, hub = started_hub()
+    combos = []
+    hub.subscribe_keys(combos.append)
+    on_key = backend.hooks[0]
+    for key in ("a", "left shift", "control"):
+        on_key(key, True)
+    for key in ("a", "left shift", "control"):
+        on_key(key, False)
+    backend.press("f1")
+    backend.send_probe()  # Watchdog probes are counted but never reported
+    assert combos == ["ctrl+shift+a", "f1"]
+    assert hub.event_counts["keyboard"] == 10
+
+
+def test_capture_takes_only_the_next_combo():
+    backend, hub = started_hub()
+    captured, seen = [], []
+    hub.subscribe_keys(seen.append)
+    hub.capture_hotkey(captured.append)
+    backend.press("ctrl+f5")
+    backend.press("f6")
+    assert captured == ["ctrl+f5"]
+    assert seen == ["ctrl+f5", "f6"]
+
+
+def test_click_subscribers_can_unsubscribe_and_failures_are_contained():
+    backend, hub = started_hub()
+    clicks = []
+
+    def once(x, y, button, pressed, injected):
+        clicks.append((x, y, button, pressed, injected))
+        return False
+
+    def broken(*args):
+        raise RuntimeError("subscriber bug")
+
+    hub.subscribe_clicks(broken)
+    hub.subscribe_clicks(once)
+    backend.user_click(5, 6)
+    assert clicks == [(5, 6, "left", True, False)]
+    assert hub.position == (5, 6)
+    assert hub.get_stats()["subscribers"]["click"] == 1
+
+
+def test_movement_detector_ignores_injected_moves():
+    backend, hub = started_hub()
+    detector = MovementDetector(hub)
+    detector.arm((100, 100), threshold=10)
+    backend.move(500, 500)  # The executor's own move
+    assert not detector.moved
+    backend.user_move(105, 95)  # Within the threshold
+    assert not detector.moved
+    backend.user_move(130, 100)
+    backend.user_move(100, 100)  # Coming back does not clear it
+    assert detector.moved
+    detector.arm((100, 100), threshold=10)
+    assert not detector.moved
+
+
+def test_restart_reinstalls_the_hooks():
+    backend, hub = started_hub()
+    combos = []
+    hub.subscribe_keys(combos.append)
+    backend.hooks = None  # The OS dropped them
+    hub.restart()
+    backend.press("f2")
+    assert combos == ["f2"]
@@ -0,0 +1,41 @@
+from journal import ExecutionJournal, read_journal
+from replay_journal import load_executions
+
+
+def write_session(path, clicks, **options):
+    journal = ExecutionJournal(str(path), flush_interval=60, **options)
+    for i in range(clicks):
+        journal.record(1, "Buy", 10, 20, "left", 1_000_000 * i, 1_000_000 * i + 50_000, 0)
+    journal.close()
+    return journal
+
+
+def test_sessions_appending_to_one_file_stay_apart(tmp_path):
+    path = tmp_path / "executions.jsonl"
+    first = write_session(path, 2)
+    second = write_session(path, 3)
+    assert first.run != second.run
+
+    executions, dropped = load_executions(str(path))
+    assert list(executions) == [(first.run, 1), (second.run, 1)]
+    assert [len(records) for records in executions.values()] == [2, 3]
+    assert dropped == {}
+
+
+def test_dropped_records_are_written_and_reported(tmp_path):
+    path = tmp_path / "executions.jsonl"
+    journal = write_session(path, 5, capacity=2)
+    assert journal.dropped == 3
+    assert journal.written == 2
+
+    executions, dropped = load_executions(str(path))
+    assert dropped == {journal.run: 3}
+    assert [r["p"] for r in executions[(journal.run, 1)]] == [3_000_000, 4_000_000]
+
+
+def test_journals_without_run_ids_still_load(tmp_path):
+    path = tmp_path / "executions.jsonl"
+    path.write_text('{"e":1,"a":"Old","x":1,"y":2,"b":"left","p":0,"t":5,"w":0}\n')
+    executions, _ = load_executions(str(path))
+    assert list(executions) == [(None, 1)]
+    assert next(read_journal(str(path)))["a"] == "Old"
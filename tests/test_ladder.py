@@ -0,0 +1,67 @@
+import threading
+import time
+
+from executor import Executor
+from input_backend import FakeInputBackend
+
+LADDER = {
+    "name": "Bid ladder",
+    "coords": [{"x": 100, "y": 200}],
+    "ladder": {"rows": 4, "offset": [0, 18]},
+    "delay_ms": 0,
+}
+
+
+def wait_idle(executor, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not executor.is_idle():
+        assert time.monotonic() < deadline, "executor did not finish"
+        time.sleep(0.005)
+
+
+def waiting_executor():
+    backend = FakeInputBackend()
+    executor = Executor(backend)
+    prompts = threading.Semaphore(0)
+    executor.status_callback = lambda message: prompts.release() if "Press row" in message else None
+    return backend, executor, prompts
+
+
+def test_row_key_is_swallowed_only_while_a_ladder_waits():
+    backend, executor, prompts = waiting_executor()
+    executor.trigger(dict(LADDER))
+    assert prompts.acquire(timeout=1.0)
+    assert backend.press("3")
+    wait_idle(executor)
+    assert backend.clicks()[0][1:3] == (100, 236)
+    assert backend.typed == []  # The digit picked the row and never reached the focused window
+
+    backend.press("3")  # Nobody waits: the digit is just typed
+    assert backend.typed == ["3"]
+    assert len(backend.clicks()) == 1
+
+
+def test_two_waiting_ladders_each_get_their_own_row():
+    backend, executor, prompts = waiting_executor()
+    executor.trigger(dict(LADDER, name="Bid"))
+    assert prompts.acquire(timeout=1.0)
+    # A high-priority ladder waits on the priority lane at the same time
+    executor.trigger(dict(LADDER, name="Ask", coords=[{"x": 300, "y": 200}], priority="high"))
+    assert prompts.acquire(timeout=1.0)
+    backend.press("2")
+    backend.press("4")
+    wait_idle(executor)
+    assert sorted(click[1:3] for click in backend.clicks()) == [(100, 218), (300, 254)]
+
+
+def test_simulation_clicks_the_chosen_ladder_row():
+    from plan import compile_action
+    from simulation import simulate
+
+    for action in (LADDER, compile_action(LADDER)):
+        for row, y in ((0, 200), (3, 254)):
+            _, backend, _ = simulate(action, row=row)
+            assert [click[1:3] for click in backend.clicks()] == [(100, y)]
+    timeline, backend, _ = simulate(LADDER, row=7)
+    assert backend.clicks() == []
+    assert timeline[-1][1] == "⚠️ Bid ladder: no row 8 (1-4)"
@@ -0,0 +1,60 @@
+from input_backend import FakeInputBackend
+from input_hub import InputHub
+from macro import BUTTON_DOWN, BUTTON_UP, KEY, MOVE, MacroBuffer, MacroRecorder, macro_of
+from simulation import simulate
+
+EVENTS = [(0, MOVE, 100, 100, 0), (1_500, BUTTON_DOWN, 100, 100, 0), (3_000, MOVE, 90, 130, 0),
+          (3_000, BUTTON_UP, 90, 130, 0), (400_000, BUTTON_DOWN, -20, 5, 1), (410_000, BUTTON_UP, -20, 5, 1)]
+
+
+def recorded():
+    macro = MacroBuffer()
+    for event in EVENTS:
+        macro.append(*event)
+    macro.append_key(500_000, "ctrl+c", -20, 5)
+    return macro
+
+
+def test_varint_encoding_round_trips():
+    macro = recorded()
+    assert list(macro.events()) == EVENTS + [(500_000, KEY, -20, 5, 0)]
+    small = MacroBuffer()
+    small.append(200, BUTTON_DOWN, 1, -1, 1)
+    assert small.to_bytes() == bytes([1 | 1 << 2, 0xC8, 0x01, 2, 1])  # Varint time, zigzag deltas
+    loaded = macro_of({"macro": macro.to_json()})
+    assert list(loaded.events()) == list(macro.events())
+    assert (loaded.count, loaded.duration_us, loaded.keys) == (7, 500_000, ["ctrl+c"])
+
+
+def test_playback_keeps_recorded_timing():
+    _, backend, _ = simulate({"name": "M", "macro": recorded()})
+    buttons = [(t, x, y, b, down) for t, kind, x, y, b, down in backend.events if kind == "button"]
+    assert buttons == [(1_500_000, 100, 100, "left", True), (3_000_000, 90, 130, "left", False),
+                       (400_000_000, -20, 5, "right", True), (410_000_000, -20, 5, "right", False)]
+    assert backend.typed == ["ctrl+c"]
+
+
+def test_release_without_a_recorded_press_is_skipped():
+    macro = MacroBuffer()
+    macro.append(0, BUTTON_UP, 50, 50, 0)  # The button was already down when recording started
+    macro.append(10_000, BUTTON_DOWN, 60, 60, 0)
+    macro.append(20_000, BUTTON_UP, 60, 60, 0)
+    _, backend, _ = simulate({"name": "M", "macro": macro})
+    assert [(x, y, down) for _, kind, x, y, _, down in backend.events if kind == "button"] == [
+        (60, 60, True), (60, 60, False)]
+
+
+def test_recorder_ignores_injected_input():
+    backend = FakeInputBackend()
+    hub = InputHub(backend)
+    hub.start()
+    recorder = MacroRecorder(hub)
+    recorder.start()
+    backend.user_click(10, 10)
+    backend.move(300, 300)  # An action firing while recording
+    backend.button("left", True)
+    backend.button("left", False)
+    backend.user_click(20, 20)
+    macro = recorder.stop()
+    assert [(kind, x, y) for _, kind, x, y, _ in macro.events()] == [
+        (BUTTON_DOWN, 10, 10), (BUTTON_UP, 10, 10), (MOVE, 20, 20), (BUTTON_DOWN, 20, 20), (BUTTON_UP, 20, 20)]
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from executor import Executor
+from input_backend import FakeInputBackend
+from message_backend import FakeMessageBackend, WindowMessageInput
+from window_tracker import FakeWindowProvider, WindowTracker, window_key
+
+CHART = window_key("TerminalWindow", "terminal.exe")
+BROKER = window_key("BrokerWindow", "broker.exe")
+
+
+def wait_idle(executor, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not executor.is_idle():
+        assert time.monotonic() < deadline, "executor did not finish"
+        time.sleep(0.005)
+
+
+def message_executor(windows):
+    provider = FakeWindowProvider(windows)
+    tracker = WindowTracker(provider)
+    for key in windows:
+        tracker.watch(key)
+    tracker.start()
+    backend = FakeInputBackend()
+    executor = Executor(backend)
+    executor.window_tracker = tracker
+    executor.message_backend = FakeMessageBackend(dict(windows))
+    return backend, executor
+
+
+def action(name, window):
+    return {"name": name, "window": window, "delivery": "message", "delay_ms": 200,
+            "coords": [{"x": 10, "y": 20}, {"x": 30, "y": 40}]}
+
+
+def test_windows_get_their_own_lanes_and_never_move_the_cursor():
+    backend, executor = message_executor({CHART: (100, 100, 500, 500), BROKER: (600, 0, 900, 300)})
+    executor.trigger(action("Buy", CHART))
+    executor.trigger(action("Hedge", BROKER))
+    wait_idle(executor)
+
+    messages = executor.message_backend
+    chart, broker = messages.clicks(CHART), messages.clicks(BROKER)
+    # Points are window-relative, so the client coordinates are the stored ones
+    assert [(x, y) for _, _, x, y, _ in chart] == [(10, 20), (30, 40)]
+    assert [(x, y) for _, _, x, y, _ in broker] == [(10, 20), (30, 40)]
+    # In parallel: the second window clicks before the first one's 200 ms delay is over
+    assert broker[0][0] < chart[1][0]
+    assert backend.events == []  # Nothing went through the cursor
+
+
+def test_closed_window_fails_with_not_found():
+    messages = FakeMessageBackend({CHART: (100, 100, 500, 500)})
+    lane = WindowMessageInput(messages, CHART)
+    lane.move(150, 150)
+    lane.button("left", True)
+    lane.button("left", False)
+
+    del messages.windows[CHART]
+    with pytest.raises(OSError, match="not found"):
+        lane.move(150, 150)
+
+
+def test_window_closing_under_a_lane_is_reported():
+    backend, executor = message_executor({CHART: (100, 100, 500, 500)})
+    del executor.message_backend.windows[CHART]  # Gone before the tracker noticed
+    executor.trigger(action("Buy", CHART))
+    wait_idle(executor)
+    assert executor.last_error == f"Execution failed: Window '{CHART}' not found"
+    assert executor.message_backend.events == []
+    assert backend.events == []
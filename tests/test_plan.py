@@ -0,0 +1,44 @@
+from plan import compile_action, decode_plan, encode_plan
+
+
+LADDER = {
+    "name": "Bid ladder",
+    "hotkey": "ctrl+1",
+    "coords": [{"x": 100, "y": 200}, {"x": 140, "y": 200}],
+    "ladder": {"rows": 4, "offset": [0, 18]},
+    "mode": "Double",
+    "delay_ms": 25,
+    "priority": "high",
+}
+
+
+def rows(plan):
+    return [list(row.xy) for row in plan["ladder_table"]]
+
+
+def test_compile_is_idempotent_for_ladders():
+    once = compile_action(LADDER)
+    twice = compile_action(once)
+    assert twice["ladder"] == {"dx": 0, "dy": 18, "rows": 4}
+    assert rows(twice) == rows(once)
+    assert rows(twice)[3] == [100, 254, 140, 254]
+
+
+def test_encode_decode_round_trip():
+    plan = compile_action(LADDER)
+    decoded = decode_plan(encode_plan(plan))
+    assert list(decoded["coords"].xy) == list(plan["coords"].xy)
+    assert rows(decoded) == rows(plan)
+    for key in ("name", "hotkey", "ladder", "mode", "delay_ms", "priority", "delivery", "window"):
+        assert decoded[key] == plan[key]
+
+
+def test_recompiling_a_decoded_plan_keeps_it():
+    decoded = decode_plan(encode_plan(compile_action(LADDER)))
+    assert rows(compile_action(decoded)) == rows(decoded)
+
+
+def test_out_of_range_timing_is_clamped_for_the_engine():
+    plan = compile_action(dict(LADDER, delay_ms=-50, burst_count=-1))
+    decoded = decode_plan(encode_plan(plan))
+    assert (decoded["delay_ms"], decoded["burst_count"]) == (0, 0)
@@ -0,0 +1,61 @@
+import sys
+import threading
+
+import pytest
+
+from realtime import RealtimeMode, RealtimePlatform
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux scheduling")
+def test_linux_reports_no_process_priority_step():
+    from realtime import LinuxRealtime
+
+    mode = RealtimeMode(platform=LinuxRealtime(), jitter_samples=0)
+    try:
+        steps = mode.apply()["steps"]
+    finally:
+        mode.restore()
+    assert steps["process_priority"] == "unsupported"
+    assert steps["affinity"] == "ok"
+
+
+class RecordingPlatform(RealtimePlatform):
+    """Records which thread each step ran on; the timer step is refused."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.calls = []
+
+    def _step(self, name):
+        self.calls.append((name, threading.current_thread().name))
+        return lambda: self.calls.append(("undo " + name, threading.current_thread().name))
+
+    def default_core(self):
+        return 0
+
+    def raise_thread_priority(self):
+        return self._step("thread_priority")
+
+    def pin_thread(self, core):
+        return self._step("affinity")
+
+    def raise_timer_resolution(self):
+        raise OSError("refused")
+
+
+def test_background_measurement_leaves_the_tuned_thread_free():
+    platform = RecordingPlatform()
+    done = threading.Event()
+    mode = RealtimeMode(platform=platform, jitter_samples=5, on_measured=lambda m: done.set())
+    summary = mode.apply(wait=False)
+    assert summary["active"] and summary["jitter_before"] is None  # Not measured on this thread
+    assert done.wait(5.0)
+    assert mode.jitter_before["count"] == 5 and mode.jitter_after["count"] == 5
+    here = threading.current_thread().name
+    # The helper repeats only the steps that worked, and undoes them again
+    assert platform.calls == [("thread_priority", here), ("affinity", here),
+                              ("thread_priority", "realtime-jitter"), ("affinity", "realtime-jitter"),
+                              ("undo affinity", "realtime-jitter"), ("undo thread_priority", "realtime-jitter")]
+    assert mode.steps["timer_resolution"] == "refused"
+    assert mode.format_status().startswith("Real-time 2/4 · jitter p99")
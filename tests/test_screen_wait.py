@@ -0,0 +1,65 @@
+import threading
+
+from clock import VirtualClock
+from screen_wait import (
+    RegionWaiter, SyntheticScreenSource, WAIT_CANCELLED, WAIT_CHANGED, WAIT_MATCHED,
+    WAIT_TIMEOUT, region_hash,
+)
+
+IDLE = b"\x00" * 16
+READY = b"\xff" * 16
+
+
+def screen(clock, switch_at_ms=None):
+    """A screen that shows IDLE until ``switch_at_ms`` and READY afterwards."""
+    def provider(x, y, width, height):
+        if switch_at_ms is not None and clock.now_ns() >= switch_at_ms * 1_000_000:
+            return READY
+        return IDLE
+    return SyntheticScreenSource(provider)
+
+
+def test_wait_matches_the_reference_once_the_region_shows_it():
+    clock = VirtualClock()
+    source = screen(clock, switch_at_ms=50)
+    waiter = RegionWaiter(source, poll_interval_ms=2, clock=clock)
+    result = waiter.wait(100, 100, timeout_ms=1000, reference=region_hash(READY))
+    assert result == WAIT_MATCHED
+    assert clock.now_ns() == 50_000_000  # Matched on the first poll after the switch
+    assert source.grab_count == 26
+
+
+def test_wait_reports_a_change_from_the_baseline():
+    clock = VirtualClock()
+    waiter = RegionWaiter(screen(clock, switch_at_ms=10), clock=clock)
+    baseline = waiter.snapshot(100, 100)
+    assert waiter.wait(100, 100, timeout_ms=1000, baseline=baseline) == WAIT_CHANGED
+
+
+def test_wait_times_out_when_the_region_never_matches():
+    clock = VirtualClock()
+    waiter = RegionWaiter(screen(clock), poll_interval_ms=5, clock=clock)
+    result = waiter.wait(100, 100, timeout_ms=100, reference=region_hash(READY))
+    assert result == WAIT_TIMEOUT
+    assert clock.now_ns() == 100_000_000
+
+
+def test_cancel_event_wakes_the_wait_at_once():
+    clock = VirtualClock()
+    cancel = threading.Event()
+    clock.call_at(30_000_000, cancel.set)
+    waiter = RegionWaiter(screen(clock), poll_interval_ms=20, clock=clock)
+    result = waiter.wait(100, 100, timeout_ms=1000, reference=region_hash(READY),
+                         cancel_event=cancel)
+    assert result == WAIT_CANCELLED
+    assert clock.now_ns() == 30_000_000  # Not the end of the 40 ms poll interval
+
+
+def test_should_cancel_stops_the_wait_between_polls():
+    clock = VirtualClock()
+    polls = []
+    waiter = RegionWaiter(screen(clock), clock=clock)
+    result = waiter.wait(100, 100, timeout_ms=1000, reference=region_hash(READY),
+                         should_cancel=lambda: polls.append(1) or len(polls) >= 3)
+    assert result == WAIT_CANCELLED
+    assert len(polls) == 3
@@ -0,0 +1,10 @@
+from input_backend import FakeInputBackend
+from self_test import format_result, run_self_test
+
+
+def test_loopback_sees_every_click_on_the_fake_backend():
+    result = run_self_test(FakeInputBackend(), iterations=20, interval=0)
+    assert result["missed"] == 0
+    assert result["end_to_end"]["count"] == 20
+    assert result["trigger_to_injection"]["count"] == 20
+    assert format_result(result).startswith("20 iterations, 0 missed")
@@ -0,0 +1,58 @@
+import threading
+
+from clock import VirtualClock
+from simulation import dry_run, simulate
+
+THREE_POINTS = {
+    "name": "Three",
+    "coords": [{"x": 10, "y": 10}, {"x": 20, "y": 20}, {"x": 30, "y": 30}],
+    "delay_ms": 250,
+}
+
+
+def presses(backend):
+    return [(t, x, y) for t, kind, x, y, _, down in backend.events if kind == "button" and down]
+
+
+def test_virtual_clock_fires_timers_in_order_while_advancing():
+    clock = VirtualClock()
+    fired = []
+    clock.call_at(30, lambda: fired.append(("b", clock.now_ns())))
+    clock.call_at(10, lambda: fired.append(("a", clock.now_ns())))
+    clock.call_later(1e-6, lambda: fired.append(("c", clock.now_ns())))
+    clock.sleep(2e-6)
+    assert fired == [("a", 10), ("b", 30), ("c", 1000)]
+    assert clock.now_ns() == 2000
+
+
+def test_virtual_clock_wait_stops_when_a_timer_sets_the_event():
+    clock = VirtualClock()
+    event = threading.Event()
+    clock.call_at(400_000_000, event.set)
+    assert clock.wait(event, 1.0) is True
+    assert clock.now_ns() == 400_000_000
+    assert clock.wait(threading.Event(), 0.5) is False
+    assert clock.now_ns() == 900_000_000
+
+
+def test_simulated_clicks_land_exactly_on_schedule():
+    timeline, backend, _ = simulate(THREE_POINTS)
+    assert presses(backend) == [(0, 10, 10), (250_000_000, 20, 20), (500_000_000, 30, 30)]
+    texts = [text for _, text in timeline]
+    assert "left click @ 20,20" in texts
+    assert texts[-1] == "Done: Three (3 clicks)"
+    # Countdown updates come every 100 ms of simulated time
+    countdown = [t for t, text in timeline if "⏱" in text and "Click 2/3" in text]
+    assert countdown == [0, 100_000_000, 200_000_000]
+
+
+def test_cancel_at_a_simulated_time_stops_the_schedule():
+    timeline, backend, _ = simulate(THREE_POINTS, cancel_at_ms=300)
+    assert [xy for _, *xy in presses(backend)] == [[10, 10], [20, 20]]
+    assert not any(text.startswith("Done:") for _, text in timeline)
+
+
+def test_dry_run_prints_the_timeline_in_milliseconds():
+    lines = dry_run(THREE_POINTS)
+    assert any(line.strip().startswith("250.0 ms") and "20,20" in line for line in lines)
+    assert lines[-1].split("ms", 1)[1].strip() == "Done: Three (3 clicks)"
@@ -0,0 +1,64 @@
+import sys
+import threading
+import uuid
+
+import pytest
+
+from stats_block import StatsBlock
+
+
+@pytest.fixture
+def block():
+    block = StatsBlock.create(f"strade_test_{uuid.uuid4().hex[:8]}")
+    yield block
+    block.close()
+
+
+def test_concurrent_writers_keep_the_block_readable(block):
+    reader = block  # Reads go through the same mapping an attached reader would use
+    stop = threading.Event()
+    torn = []
+
+    def publisher(base):
+        for i in range(2000):
+            # Both fields always carry the same value; a snapshot with different ones is torn
+            block.publish({"triggers": base + i, "executions": base + i})
+
+    def counter():
+        for i in range(2000):
+            block.write_field("queue_depth", i)
+
+    def read_loop():
+        while not stop.is_set():
+            snapshot = reader.read()
+            if snapshot is not None and snapshot["triggers"] != snapshot["executions"]:
+                torn.append(snapshot)
+
+    threads = [threading.Thread(target=publisher, args=(n * 100_000,)) for n in range(4)]
+    threads += [threading.Thread(target=counter) for _ in range(2)]
+    watcher = threading.Thread(target=read_loop)
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads as often as possible to provoke races
+    try:
+        watcher.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stop.set()
+        watcher.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert not torn
+    snapshot = reader.read()
+    assert snapshot is not None
+    assert snapshot["sequence"] % 2 == 0
+    assert snapshot["sequence"] == 2 * (1 + 4 * 2000 + 2 * 2000)  # Every write bumped it twice
+
+
+def test_publish_ignores_unknown_fields_and_truncates_errors(block):
+    block.publish({"clicks": 7, "gc": {"ignored": True}, "last_error": "x" * 300})
+    snapshot = block.read()
+    assert snapshot["clicks"] == 7
+    assert snapshot["last_error"] == "x" * 127
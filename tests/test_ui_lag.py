@@ -0,0 +1,74 @@
+import ui_lag
+from ui_lag import LagMonitor
+
+
+class FakeWidget:
+    """Collects after() callbacks; the test runs them like a Tk loop would."""
+
+    def __init__(self):
+        self.pending = {}
+        self._ids = 0
+
+    def after(self, ms, callback):
+        self._ids += 1
+        self.pending[self._ids] = callback
+        return self._ids
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_next(self):
+        after_id = min(self.pending)
+        self.pending.pop(after_id)()
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0
+
+    def perf_counter_ns(self):
+        return self.now
+
+
+def monitor(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(ui_lag, "time", clock)
+    widget = FakeWidget()
+    lag = LagMonitor(widget, interval_ms=50, stall_ms=100)
+    lag.start()
+    return clock, widget, lag
+
+
+def test_on_time_beats_record_no_lag(monkeypatch):
+    clock, widget, lag = monitor(monkeypatch)
+    clock.now += 50_000_000
+    widget.run_next()
+    assert lag.current_ns == 0
+    assert lag.stalls == {}
+
+
+def test_stall_is_blamed_on_the_longest_tracked_callback(monkeypatch):
+    clock, widget, lag = monitor(monkeypatch)
+
+    def busy(ms):
+        clock.now += ms * 1_000_000
+
+    refresh = lag.track(busy, "refresh")
+    save = lag.track(busy, "save")
+    refresh(30)
+    save(200)  # The beat was due 50 ms in, during save()
+    widget.run_next()
+    assert lag.current_ns == 180_000_000
+    assert lag.stalls == {"save": 1}
+    assert lag.format_status() == "lag 180ms · worst 180ms (save)"
+
+    clock.now += 200_000_000  # Blocked again with nothing tracked
+    widget.run_next()
+    assert lag.stalls == {"save": 1, "untracked": 1}
+    assert lag.summary()["worst_culprit"] == "save"
+
+
+def test_stop_cancels_the_heartbeat(monkeypatch):
+    _, widget, lag = monitor(monkeypatch)
+    lag.stop()
+    assert widget.pending == {}
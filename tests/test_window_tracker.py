@@ -0,0 +1,55 @@
+from executor import Executor
+from input_backend import FakeInputBackend
+from window_tracker import FakeWindowProvider, WindowTracker, key_label, split_key, window_key
+
+
+def test_window_keys_round_trip():
+    key = window_key("Chrome_WidgetWin_1", "chrome.exe")
+    assert key == "Chrome_WidgetWin_1|chrome.exe"
+    assert split_key(key) == ("Chrome_WidgetWin_1", "chrome.exe", None)
+    titled = window_key("Chrome_WidgetWin_1", "chrome.exe", "Chart | EURUSD")
+    assert split_key(titled) == ("Chrome_WidgetWin_1", "chrome.exe", "Chart | EURUSD")
+    assert key_label(titled) == "chrome: Chart | EURUSD"
+
+
+def test_legacy_class_only_keys_match_any_process():
+    assert split_key("TerminalWindow") == ("TerminalWindow", None, None)
+    assert key_label("TerminalWindow") == "TerminalWindow"
+
+
+def test_windows_of_the_same_class_are_told_apart():
+    chart = window_key("Chrome_WidgetWin_1", "terminal.exe")
+    browser = window_key("Chrome_WidgetWin_1", "chrome.exe")
+    provider = FakeWindowProvider({chart: (100, 100, 500, 500), browser: (0, 0, 50, 50)}, foreground=browser)
+    tracker = WindowTracker(provider)
+    tracker.watch(chart)
+    tracker.start()
+    assert tracker.origins == {chart: (100, 100)}
+    assert tracker.foreground != chart  # The focus gate must not pass for the browser
+    provider.move_window(browser, 10, 10)
+    assert tracker.origins == {chart: (100, 100)}
+    provider.focus(chart)
+    assert tracker.foreground == chart
+
+
+def test_closed_window_is_not_found_until_it_reopens():
+    chart = window_key("TerminalWindow", "terminal.exe")
+    provider = FakeWindowProvider({chart: (100, 100, 500, 500)})
+    tracker = WindowTracker(provider)
+    tracker.watch(chart)
+    tracker.start()
+    executor = Executor(FakeInputBackend())
+    executor.window_tracker = tracker
+    messages = []
+    executor.status_callback = messages.append
+    action = {"name": "Buy", "window": chart}
+    assert executor._resolve_window(action, "Buy") == (100, 100)
+
+    provider.close_window(chart)
+    assert chart not in tracker.origins
+    assert executor._resolve_window(action, "Buy") is None
+    assert messages == ["⚠️ Buy: Target window not found"]
+
+    provider.open_window(chart, (300, 200, 700, 600))  # Restarted: new handle, new place
+    assert tracker.origins[chart] == (300, 200)
+    assert executor._resolve_window(action, "Buy") == (300, 200)
@@ -0,0 +1,84 @@
+import functools
+import time
+from typing import Callable, Dict, Optional
+
+from histogram import LatencyHistogram
+
+
+class LagMonitor:
+    """Measures Tk event-loop lag with a periodic after() heartbeat.
+
+    Each beat is scheduled ``interval_ms`` ahead; how late it actually runs
+    is the time the event loop was blocked. Callbacks wrapped with track()
+    record their duration, and a beat later than ``stall_ms`` is blamed on
+    the longest tracked callback that ran since the previous beat.
+    """
+
+    def __init__(self, widget, interval_ms: int = 50, stall_ms: int = 100):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.stall_ns = stall_ms * 1_000_000
+        self.histogram = LatencyHistogram()
+        self.current_ns = 0
+        self.worst_ns = 0
+        self.worst_culprit: Optional[str] = None
+        self.stalls: Dict[str, int] = {}  # culprit -> number of stalls
+        self._longest = (0, None)  # (duration ns, name) since the last beat
+        self._expected_ns = 0
+        self._after_id = None
+
+    def start(self):
+        if self._after_id is None:
+            self._schedule()
+
+    def stop(self):
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self):
+        self._expected_ns = time.perf_counter_ns() + self.interval_ms * 1_000_000
+        self._after_id = self.widget.after(self.interval_ms, self._beat)
+
+    def _beat(self):
+        lag = max(0, time.perf_counter_ns() - self._expected_ns)
+        self.histogram.record(lag)
+        self.current_ns = lag
+        culprit = None
+        if lag > self.stall_ns:
+            culprit = self._longest[1] or "untracked"
+            self.stalls[culprit] = self.stalls.get(culprit, 0) + 1
+        if lag > self.worst_ns:
+            self.worst_ns = lag
+            self.worst_culprit = culprit
+        self._longest = (0, None)
+        self._schedule()
+
+    def track(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """Wrap a UI callback so stalls can be attributed to it."""
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def tracked(*args, **kwargs):
+            started = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.perf_counter_ns() - started
+                if duration > self._longest[0]:
+                    self._longest = (duration, name)
+
+        return tracked
+
+    def summary(self) -> Dict[str, object]:
+        stats = self.histogram.summary()
+        stats["current_ns"] = self.current_ns
+        stats["worst_culprit"] = self.worst_culprit
+        stats["stalls"] = dict(self.stalls)
+        return stats
+
+    def format_status(self) -> str:
+        worst = f"{self.worst_ns / 1e6:.0f}ms"
+        if self.worst_culprit:
+            worst += f" ({self.worst_culprit})"
+        return f"lag {self.current_ns / 1e6:.0f}ms · worst {worst}"
@@ -0,0 +1,427 @@
+import ctypes
+import ntpath
+import threading
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+Rect = Tuple[int, int, int, int]  # left, top, right, bottom
+
+
+def window_key(class_name: str, image: Optional[str] = None, title: Optional[str] = None) -> str:
+    """Stable key of a top-level window: "class|process image[|title]".
+
+    Many apps share a window class (every Chromium app is
+    Chrome_WidgetWin_1), so the process image is part of the key; the
+    title is only added to tell apart two windows of the same app.
+    """
+    parts = [class_name, image or ""]
+    if title:
+        parts.append(title)
+    return "|".join(parts)
+
+
+def split_key(key: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """(class, image, title) of a key; keys saved before images were added are a bare class."""
+    parts = key.split("|", 2)
+    class_name = parts[0]
+    image = parts[1] or None if len(parts) > 1 else None
+    title = parts[2] if len(parts) > 2 else None
+    return class_name, image, title
+
+
+def key_label(key: str) -> str:
+    """Short display name: the process image if known, else the class."""
+    class_name, image, title = split_key(key)
+    label = image[:-4] if image and image.endswith(".exe") else image or class_name
+    return f"{label}: {title}" if title else label
+
+
+class Win32WindowIndex:
+    """Maps window keys to the HWND they were anchored to (Windows only).
+
+    A key is pinned to one HWND when it is anchored or first looked up,
+    and the pin is checked with IsWindow before use, so two windows with
+    the same class (or app) never stand in for each other. The tracker's
+    provider and the message backend share one index per process (see
+    shared_window_index()), so they agree on which window a key means.
+    """
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        import ctypes.wintypes
+        self._wintypes = ctypes.wintypes
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._pins: Dict[str, int] = {}
+        self._images: Dict[int, str] = {}  # pid -> image name
+        self._lock = threading.Lock()
+
+    def class_name(self, hwnd) -> Optional[str]:
+        buf = ctypes.create_unicode_buffer(256)
+        if not self._user32.GetClassNameW(hwnd, buf, 256):
+            return None
+        return buf.value
+
+    def title(self, hwnd) -> str:
+        buf = ctypes.create_unicode_buffer(256)
+        self._user32.GetWindowTextW(hwnd, buf, 256)
+        return buf.value
+
+    def image(self, hwnd) -> Optional[str]:
+        """Lowercase file name of the process owning a window, e.g. "chrome.exe"."""
+        pid = self._wintypes.DWORD()
+        self._user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+        cached = self._images.get(pid.value)
+        if cached is not None:
+            return cached
+        process = self._kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+        if not process:
+            return None
+        try:
+            buf = ctypes.create_unicode_buffer(1024)
+            size = self._wintypes.DWORD(1024)
+            if not self._kernel32.QueryFullProcessImageNameW(process, 0, buf, ctypes.byref(size)):
+                return None
+        finally:
+            self._kernel32.CloseHandle(process)
+        image = ntpath.basename(buf.value).lower()
+        self._images[pid.value] = image
+        return image
+
+    def _matches(self, hwnd, key) -> bool:
+        class_name, image, title = split_key(key)
+        if self.class_name(hwnd) != class_name:
+            return False
+        if image is not None and self.image(hwnd) != image:
+            return False
+        return title is None or self.title(hwnd) == title
+
+    def _top_level_windows(self) -> List[int]:
+        found = []
+        EnumWindowsProc = ctypes.WINFUNCTYPE(ctypes.c_bool, ctypes.c_void_p, ctypes.c_void_p)
+
+        def collect(hwnd, _):
+            if self._user32.IsWindowVisible(hwnd):
+                found.append(hwnd)
+            return True
+
+        self._user32.EnumWindows(EnumWindowsProc(collect), 0)
+        return found
+
+    def pin(self, hwnd) -> str:
+        """Key for a window the user picked, pinned to it.
+
+        When the app's plain key is already pinned to another live window,
+        the title is added so each window keeps its own key.
+        """
+        base = window_key(self.class_name(hwnd) or "", self.image(hwnd))
+        with self._lock:
+            key = base
+            other = self._pins.get(base)
+            if other and other != hwnd and self._user32.IsWindow(other):
+                key = window_key(self.class_name(hwnd) or "", self.image(hwnd), self.title(hwnd))
+            self._pins[key] = hwnd
+        return key
+
+    def handle(self, key: str) -> Optional[int]:
+        """The window a key is pinned to; the first matching window pins it if the pin is gone."""
+        with self._lock:
+            hwnd = self._pins.get(key)
+            if hwnd and self._user32.IsWindow(hwnd):
+                return hwnd
+            pinned = {h for k, h in self._pins.items() if k != key}
+            for candidate in self._top_level_windows():
+                if candidate not in pinned and self._matches(candidate, key):
+                    self._pins[key] = candidate
+                    return candidate
+            self._pins.pop(key, None)
+            return None
+
+    def keys_of(self, hwnd) -> List[str]:
+        """Keys pinned to a window (empty for windows nobody anchored to)."""
+        with self._lock:
+            return [key for key, pinned in self._pins.items() if pinned == hwnd]
+
+    def release(self, hwnd) -> List[str]:
+        """Unpin a destroyed window; returns the keys that pointed at it."""
+        with self._lock:
+            keys = [key for key, pinned in self._pins.items() if pinned == hwnd]
+            for key in keys:
+                del self._pins[key]
+            return keys
+
+
+_shared_index: Optional[Win32WindowIndex] = None
+
+
+def shared_window_index() -> Win32WindowIndex:
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = Win32WindowIndex()
+    return _shared_index
+
+
+class WindowProvider:
+    """Source of window move/foreground events.
+
+    A provider calls ``on_moved(key, rect)`` when a top-level window moves
+    or resizes, ``on_foreground(key)`` when the foreground window changes,
+    ``on_closed(key)`` when an anchored window is destroyed and
+    ``on_opened()`` when a new top-level window appears (it may be an
+    anchored app coming back under a new handle). Windows are identified
+    by a stable key (see window_key()).
+    """
+
+    def start(self, on_moved: Callable[[str, Rect], None], on_foreground: Callable[[Optional[str]], None],
+              on_closed: Callable[[str], None], on_opened: Callable[[], None]):
+        raise NotImplementedError
+
+    def stop(self):
+        pass
+
+    def find(self, key: str) -> Optional[Rect]:
+        """Look up a window's rectangle directly (used only to seed the cache)."""
+        raise NotImplementedError
+
+    def foreground(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def window_at(self, x: int, y: int) -> Tuple[Optional[str], Optional[Rect]]:
+        """Return the top-level window under a screen point."""
+        raise NotImplementedError
+
+
+class WinEventWindowProvider(WindowProvider):
+    """Windows provider using SetWinEventHook on a dedicated message-loop thread."""
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_CREATE = 0x8000
+    EVENT_OBJECT_DESTROY = 0x8001
+    EVENT_OBJECT_SHOW = 0x8002
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    GA_ROOT = 2
+    WM_QUIT = 0x0012
+
+    def __init__(self, index: Optional[Win32WindowIndex] = None):
+        import ctypes.wintypes
+        self._wintypes = ctypes.wintypes
+        self._user32 = ctypes.windll.user32
+        self._index = index or shared_window_index()
+        self._thread = None
+        self._thread_id = None
+        self._hooks = []
+        self._proc = None  # Keep a reference so the callback is not collected
+
+    def _foreground_key(self, hwnd) -> Optional[str]:
+        """The anchored key of a window; other windows get a key no action uses."""
+        keys = self._index.keys_of(hwnd)
+        if keys:
+            return keys[0]
+        class_name = self._index.class_name(hwnd)
+        return f"{class_name}#{hwnd:x}" if class_name else None
+
+    def _rect(self, hwnd) -> Optional[Rect]:
+        rect = self._wintypes.RECT()
+        if not self._user32.GetWindowRect(hwnd, ctypes.byref(rect)):
+            return None
+        return (rect.left, rect.top, rect.right, rect.bottom)
+
+    def start(self, on_moved, on_foreground, on_closed, on_opened):
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p,
+            ctypes.c_long, ctypes.c_long, ctypes.c_ulong, ctypes.c_ulong
+        )
+
+        def callback(hook, event, hwnd, id_object, id_child, thread, time_ms):
+            if not hwnd:
+                return
+            if event == self.EVENT_SYSTEM_FOREGROUND:
+                on_foreground(self._foreground_key(hwnd))
+            elif id_object == self.OBJID_WINDOW and id_child == 0:
+                if event == self.EVENT_OBJECT_DESTROY:
+                    # The handle is dead now; a reopened window is found again on show
+                    for key in self._index.release(hwnd):
+                        on_closed(key)
+                    return
+                # Only top-level windows; child controls move all the time
+                if self._user32.GetAncestor(hwnd, self.GA_ROOT) != hwnd:
+                    return
+                if event in (self.EVENT_OBJECT_CREATE, self.EVENT_OBJECT_SHOW):
+                    on_opened()
+                    return
+                keys = self._index.keys_of(hwnd)  # Only anchored windows are tracked
+                rect = self._rect(hwnd) if keys else None
+                if rect:
+                    for key in keys:
+                        on_moved(key, rect)
+
+        self._proc = WinEventProc(callback)
+        ready = threading.Event()
+
+        def run():
+            self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+            for first, last in ((self.EVENT_SYSTEM_FOREGROUND, self.EVENT_SYSTEM_FOREGROUND),
+                                (self.EVENT_OBJECT_CREATE, self.EVENT_OBJECT_SHOW),
+                                (self.EVENT_OBJECT_LOCATIONCHANGE, self.EVENT_OBJECT_LOCATIONCHANGE)):
+                self._hooks.append(self._user32.SetWinEventHook(
+                    first, last, 0, self._proc, 0, 0, self.WINEVENT_OUTOFCONTEXT
+                ))
+            ready.set()
+            msg = self._wintypes.MSG()
+            while self._user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                self._user32.TranslateMessage(ctypes.byref(msg))
+                self._user32.DispatchMessageW(ctypes.byref(msg))
+            for hook in self._hooks:
+                self._user32.UnhookWinEvent(hook)
+            self._hooks.clear()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait(1.0)
+
+    def stop(self):
+        if self._thread_id:
+            self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+            self._thread_id = None
+
+    def find(self, key):
+        hwnd = self._index.handle(key)
+        return self._rect(hwnd) if hwnd else None
+
+    def foreground(self):
+        hwnd = self._user32.GetForegroundWindow()
+        return self._foreground_key(hwnd) if hwnd else None
+
+    def window_at(self, x, y):
+        hwnd = self._user32.WindowFromPoint(self._wintypes.POINT(x, y))
+        if not hwnd:
+            return None, None
+        root = self._user32.GetAncestor(hwnd, self.GA_ROOT)
+        return self._index.pin(root), self._rect(root)
+
+
+class FakeWindowProvider(WindowProvider):
+    """In-memory provider for tests: move and focus windows by hand."""
+
+    def __init__(self, windows: Optional[Dict[str, Rect]] = None, foreground: Optional[str] = None):
+        self.windows = dict(windows or {})
+        self._foreground = foreground
+        self._on_moved = None
+        self._on_foreground = None
+        self._on_closed = None
+        self._on_opened = None
+
+    def start(self, on_moved, on_foreground, on_closed, on_opened):
+        self._on_moved = on_moved
+        self._on_foreground = on_foreground
+        self._on_closed = on_closed
+        self._on_opened = on_opened
+
+    def stop(self):
+        self._on_moved = None
+        self._on_foreground = None
+        self._on_closed = None
+        self._on_opened = None
+
+    def move_window(self, key: str, left: int, top: int):
+        old = self.windows.get(key, (0, 0, 100, 100))
+        width, height = old[2] - old[0], old[3] - old[1]
+        self.windows[key] = (left, top, left + width, top + height)
+        if self._on_moved:
+            self._on_moved(key, self.windows[key])
+
+    def close_window(self, key: str):
+        self.windows.pop(key, None)
+        if self._foreground == key:
+            self.focus(None)
+        if self._on_closed:
+            self._on_closed(key)
+
+    def open_window(self, key: str, rect: Rect):
+        self.windows[key] = rect
+        if self._on_opened:
+            self._on_opened()
+
+    def focus(self, key: Optional[str]):
+        self._foreground = key
+        if self._on_foreground:
+            self._on_foreground(key)
+
+    def find(self, key):
+        return self.windows.get(key)
+
+    def foreground(self):
+        return self._foreground
+
+    def window_at(self, x, y):
+        for key, rect in self.windows.items():
+            if rect[0] <= x < rect[2] and rect[1] <= y < rect[3]:
+                return key, rect
+        return None, None
+
+
+class WindowTracker:
+    """Event-driven cache of window origins and the current foreground window.
+
+    The provider's events keep ``origins`` and ``foreground`` current, so
+    resolving an anchored coordinate at fire time is one dictionary read.
+    A closed window's origin is dropped (its actions report the window as
+    not found) until a matching window opens again.
+    """
+
+    def __init__(self, provider: WindowProvider):
+        self.provider = provider
+        self.origins: Dict[str, Tuple[int, int]] = {}
+        self.foreground: Optional[str] = None
+        self.watched: Set[str] = set()
+        self.started = False
+
+    def start(self):
+        self.provider.start(self._on_moved, self._on_foreground, self._on_closed, self._on_opened)
+        self.foreground = self.provider.foreground()
+        for key in self.watched:
+            self._seed(key)
+        self.started = True
+
+    def stop(self):
+        self.provider.stop()
+        self.started = False
+
+    def watch(self, key: str):
+        """Start caching a window's position."""
+        if key in self.watched:
+            return
+        self.watched.add(key)
+        if self.started:
+            self._seed(key)
+
+    def _seed(self, key):
+        rect = self.provider.find(key)
+        if rect:
+            self.origins[key] = (rect[0], rect[1])
+
+    def _on_moved(self, key, rect):
+        if key in self.watched:
+            self.origins[key] = (rect[0], rect[1])
+
+    def _on_foreground(self, key):
+        self.foreground = key
+
+    def _on_closed(self, key):
+        self.origins.pop(key, None)
+
+    def _on_opened(self):
+        # Cheap for the common case: nothing watched is missing
+        for key in [key for key in self.watched if key not in self.origins]:
+            self._seed(key)
+
+    def window_at(self, x: int, y: int) -> Tuple[Optional[str], Optional[Tuple[int, int]]]:
+        """Find the window under a point and start tracking it."""
+        key, rect = self.provider.window_at(x, y)
+        if not key or not rect:
+            return None, None
+        self.watch(key)
+        self.origins[key] = (rect[0], rect[1])
+        return key, self.origins[key]
@@ -0,0 +1,375 @@
+import contextlib
+import ctypes
+import ctypes.util
+import logging
+import os
+import struct
+import threading
+from collections import deque
+from typing import Callable, Dict, FrozenSet, Optional
+
+from input_backend import InputBackend, combo_keys
+
+log = logging.getLogger(__name__)
+
+# Core X event codes (X.h)
+KEY_PRESS = 2
+KEY_RELEASE = 3
+BUTTON_PRESS = 4
+BUTTON_RELEASE = 5
+MOTION_NOTIFY = 6
+
+BUTTON_CODES = {"left": 1, "middle": 2, "right": 3}
+BUTTON_NAMES = {code: name for name, code in BUTTON_CODES.items()}  # 4-7 (wheel) are not clicks
+
+# keysym name -> key name as used in hotkey combos ("ctrl+shift+a"); others are lowercased
+KEYSYM_NAMES = {
+    "Control_L": "ctrl", "Control_R": "ctrl",
+    "Alt_L": "alt", "Alt_R": "alt", "ISO_Level3_Shift": "alt", "Meta_L": "alt", "Meta_R": "alt",
+    "Shift_L": "shift", "Shift_R": "shift",
+    "Super_L": "windows", "Super_R": "windows",
+    "Escape": "esc", "Return": "enter", "BackSpace": "backspace", "Prior": "page up", "Next": "page down",
+    "Caps_Lock": "caps lock", "Num_Lock": "num lock", "Print": "print screen",
+}
+# Reverse direction for injection; the first keysym of each name is the one pressed
+_NAME_KEYSYMS = {}
+for _keysym, _name in KEYSYM_NAMES.items():
+    _NAME_KEYSYMS.setdefault(_name, _keysym)
+
+XRECORD_FROM_SERVER = 0
+XRECORD_ALL_CLIENTS = 3
+
+
+class _Range8(ctypes.Structure):
+    _fields_ = [("first", ctypes.c_ubyte), ("last", ctypes.c_ubyte)]
+
+
+class _Range16(ctypes.Structure):
+    _fields_ = [("first", ctypes.c_ushort), ("last", ctypes.c_ushort)]
+
+
+class _ExtRange(ctypes.Structure):
+    _fields_ = [("ext_major", _Range8), ("ext_minor", _Range16)]
+
+
+class XRecordRange(ctypes.Structure):
+    _fields_ = [
+        ("core_requests", _Range8),
+        ("core_replies", _Range8),
+        ("ext_requests", _ExtRange),
+        ("ext_replies", _ExtRange),
+        ("delivered_events", _Range8),
+        ("device_events", _Range8),
+        ("errors", _Range8),
+        ("client_started", ctypes.c_int),
+        ("client_died", ctypes.c_int),
+    ]
+
+
+class XRecordInterceptData(ctypes.Structure):
+    _fields_ = [
+        ("id_base", ctypes.c_ulong),
+        ("server_time", ctypes.c_ulong),
+        ("client_seq", ctypes.c_ulong),
+        ("category", ctypes.c_int),
+        ("client_swapped", ctypes.c_int),
+        ("data", ctypes.POINTER(ctypes.c_ubyte)),
+        ("data_len", ctypes.c_ulong),  # In 4-byte units
+    ]
+
+
+_INTERCEPT_PROC = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.POINTER(XRecordInterceptData))
+
+_libs = None
+
+
+def _load_libs():
+    """libX11 and libXtst (XTest and XRecord), with the prototypes used here."""
+    global _libs
+    if _libs is not None:
+        return _libs
+    x11_path = ctypes.util.find_library("X11")
+    xtst_path = ctypes.util.find_library("Xtst")
+    if not x11_path or not xtst_path:
+        raise OSError("libX11 and libXtst are required for the X11 backend")
+    x11 = ctypes.CDLL(x11_path)
+    xtst = ctypes.CDLL(xtst_path)
+    display = ctypes.c_void_p
+    window = ctypes.c_ulong
+
+    # The record thread and the injecting threads use Xlib concurrently
+    x11.XInitThreads()
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = display
+    x11.XCloseDisplay.argtypes = [display]
+    x11.XDefaultRootWindow.argtypes = [display]
+    x11.XDefaultRootWindow.restype = window
+    x11.XFlush.argtypes = [display]
+    x11.XSync.argtypes = [display, ctypes.c_int]
+    x11.XFree.argtypes = [ctypes.c_void_p]
+    x11.XQueryPointer.argtypes = [display, window, ctypes.POINTER(window), ctypes.POINTER(window),
+                                  ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                                  ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                                  ctypes.POINTER(ctypes.c_uint)]
+    x11.XStringToKeysym.argtypes = [ctypes.c_char_p]
+    x11.XStringToKeysym.restype = ctypes.c_ulong
+    x11.XKeysymToString.argtypes = [ctypes.c_ulong]
+    x11.XKeysymToString.restype = ctypes.c_char_p
+    x11.XKeysymToKeycode.argtypes = [display, ctypes.c_ulong]
+    x11.XKeysymToKeycode.restype = ctypes.c_ubyte
+    x11.XkbKeycodeToKeysym.argtypes = [display, ctypes.c_ubyte, ctypes.c_int, ctypes.c_int]
+    x11.XkbKeycodeToKeysym.restype = ctypes.c_ulong
+    x11.XDisplayKeycodes.argtypes = [display, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+
+    xtst.XTestFakeMotionEvent.argtypes = [display, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+    xtst.XTestFakeButtonEvent.argtypes = [display, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+    xtst.XTestFakeKeyEvent.argtypes = [display, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+    xtst.XRecordAllocRange.restype = ctypes.POINTER(XRecordRange)
+    xtst.XRecordCreateContext.argtypes = [display, ctypes.c_int, ctypes.POINTER(ctypes.c_ulong), ctypes.c_int,
+                                          ctypes.POINTER(ctypes.POINTER(XRecordRange)), ctypes.c_int]
+    xtst.XRecordCreateContext.restype = ctypes.c_ulong
+    xtst.XRecordEnableContext.argtypes = [display, ctypes.c_ulong, _INTERCEPT_PROC, ctypes.c_void_p]
+    xtst.XRecordDisableContext.argtypes = [display, ctypes.c_ulong]
+    xtst.XRecordFreeContext.argtypes = [display, ctypes.c_ulong]
+    xtst.XRecordFreeData.argtypes = [ctypes.POINTER(XRecordInterceptData)]
+
+    _libs = (x11, xtst)
+    return _libs
+
+
+class X11InputBackend(InputBackend):
+    """XTest injection and an XRecord listener for hotkeys and the input hub.
+
+    Injection uses its own display connection and flushes after every
+    call, so an event has reached the server before the executor's
+    injection lock is released (the kill switch relies on that). Inside
+    batch() the flush is deferred to the end of the batch: one round of
+    writes for a whole sequence.
+
+    One XRecord context on two further connections (control and data)
+    sees every key, button and motion event on the server; it feeds both
+    the registered hotkeys and the hub's hooks. XRecord cannot tell
+    XTest events apart, so moves and button events this backend injected
+    are matched (by position, or by button and direction) and reported as
+    injected.
+    """
+
+    def __init__(self, display_name: Optional[str] = None):
+        self._x11, self._xtst = _load_libs()
+        self._display_name = (display_name or os.environ.get("DISPLAY", "")).encode() or None
+        self._display = self._open()
+        self._root = self._x11.XDefaultRootWindow(self._display)
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._key_names = self._keycode_names()
+        self.hotkeys: Dict[str, Callable[[], None]] = {}
+        self._combos: Dict[FrozenSet[str], Callable[[], None]] = {}
+        self._held = set()
+        self._hooks = None
+        self._injected_moves = deque(maxlen=64)
+        self._injected_buttons = deque(maxlen=64)
+        self._intercept = _INTERCEPT_PROC(self._on_record)  # Must outlive the context
+        self._record = None  # (control display, context, thread) while listening
+
+    def _open(self):
+        display = self._x11.XOpenDisplay(self._display_name)
+        if not display:
+            raise OSError(f"Cannot open X display {(self._display_name or b'').decode() or '(unset)'}")
+        return display
+
+    def _keycode_names(self) -> Dict[int, str]:
+        """Key name of every keycode, computed once so the record thread only does lookups."""
+        low, high = ctypes.c_int(), ctypes.c_int()
+        self._x11.XDisplayKeycodes(self._display, ctypes.byref(low), ctypes.byref(high))
+        names = {}
+        for keycode in range(low.value, high.value + 1):
+            keysym = self._x11.XkbKeycodeToKeysym(self._display, keycode, 0, 0)
+            raw = self._x11.XKeysymToString(keysym) if keysym else None
+            if raw:
+                name = raw.decode()
+                names[keycode] = KEYSYM_NAMES.get(name, name.lower())
+        return names
+
+    def _keycode(self, name: str) -> int:
+        keysym_name = _NAME_KEYSYMS.get(name)
+        candidates = [keysym_name] if keysym_name else [name, name.capitalize(), name.upper()]
+        for candidate in candidates:
+            keysym = self._x11.XStringToKeysym(candidate.encode())
+            keycode = self._x11.XKeysymToKeycode(self._display, keysym) if keysym else 0
+            if keycode:
+                return keycode
+        raise ValueError(f"Key '{name}' is not mapped on this X server")
+
+    # ----- injection -----
+
+    def _flush(self):
+        if not self._batch_depth:
+            self._x11.XFlush(self._display)
+
+    @contextlib.contextmanager
+    def batch(self):
+        """Defer XFlush until the outermost batch ends (one write for many events)."""
+        with self._lock:
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                self._flush()
+
+    def sync(self):
+        """Wait until the server has processed everything injected so far."""
+        with self._lock:
+            self._x11.XSync(self._display, 0)
+
+    def move(self, x, y):
+        with self._lock:
+            self._injected_moves.append((x, y))
+            self._xtst.XTestFakeMotionEvent(self._display, -1, x, y, 0)
+            self._flush()
+
+    def button(self, button, down):
+        with self._lock:
+            self._injected_buttons.append((button, bool(down)))
+            self._xtst.XTestFakeButtonEvent(self._display, BUTTON_CODES[button], int(down), 0)
+            self._flush()
+
+    def cursor_pos(self):
+        root, child = ctypes.c_ulong(), ctypes.c_ulong()
+        x, y, wx, wy = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        mask = ctypes.c_uint()
+        with self._lock:
+            self._x11.XQueryPointer(self._display, self._root, ctypes.byref(root), ctypes.byref(child),
+                                    ctypes.byref(x), ctypes.byref(y), ctypes.byref(wx), ctypes.byref(wy),
+                                    ctypes.byref(mask))
+        return x.value, y.value
+
+    def send_hotkey(self, key_combo):
+        keycodes = [self._keycode(key) for key in key_combo.lower().split("+")]
+        with self.batch():
+            for keycode in keycodes:
+                self._xtst.XTestFakeKeyEvent(self._display, keycode, 1, 0)
+            for keycode in reversed(keycodes):
+                self._xtst.XTestFakeKeyEvent(self._display, keycode, 0, 0)
+
+    def send_probe(self):
+        # A zero-distance XTest move produces no event, so step one pixel out and back
+        x, y = self.cursor_pos()
+        with self.batch():
+            keycode = self._keycode("f24")
+            self._xtst.XTestFakeKeyEvent(self._display, keycode, 1, 0)
+            self._xtst.XTestFakeKeyEvent(self._display, keycode, 0, 0)
+            self.move(x + 1, y)
+            self.move(x, y)
+
+    # ----- hotkeys and hooks -----
+
+    def add_hotkey(self, key_combo, callback, suppress=None):
+        # XRecord only observes: keys cannot be swallowed, ``suppress`` is ignored
+        self.hotkeys[key_combo] = callback
+        self._combos[combo_keys(key_combo)] = callback
+        self._start_record()
+
+    def remove_hotkey(self, key_combo):
+        del self.hotkeys[key_combo]
+        self._combos.pop(combo_keys(key_combo), None)
+
+    def clear_hotkeys(self):
+        self.hotkeys.clear()
+        self._combos = {}
+
+    def install_hooks(self, on_key, on_move, on_click):
+        self._hooks = (on_key, on_move, on_click)
+        self._start_record()
+
+    def uninstall_hooks(self):
+        self._hooks = None
+        if not self.hotkeys:
+            self._stop_record()
+
+    def _start_record(self):
+        if self._record is not None:
+            return
+        control = self._open()
+        data = self._open()
+        record_range = self._xtst.XRecordAllocRange()
+        record_range.contents.device_events.first = KEY_PRESS
+        record_range.contents.device_events.last = MOTION_NOTIFY
+        clients = (ctypes.c_ulong * 1)(XRECORD_ALL_CLIENTS)
+        ranges = (ctypes.POINTER(XRecordRange) * 1)(record_range)
+        context = self._xtst.XRecordCreateContext(control, 0, clients, 1, ranges, 1)
+        self._x11.XFree(record_range)
+        if not context:
+            self._x11.XCloseDisplay(control)
+            self._x11.XCloseDisplay(data)
+            raise OSError("XRecordCreateContext failed (is the RECORD extension enabled?)")
+        self._x11.XSync(control, 0)
+
+        def run():
+            # Blocks, calling _on_record for every event, until the context is disabled
+            self._xtst.XRecordEnableContext(data, context, self._intercept, None)
+            self._xtst.XRecordFreeContext(control, context)
+            self._x11.XCloseDisplay(data)
+            self._x11.XCloseDisplay(control)
+
+        thread = threading.Thread(target=run, name="x11-record", daemon=True)
+        self._record = (control, context, thread)
+        thread.start()
+
+    def _stop_record(self):
+        if self._record is None:
+            return
+        control, context, thread = self._record
+        self._record = None
+        self._xtst.XRecordDisableContext(control, context)
+        self._x11.XFlush(control)
+        thread.join(timeout=1.0)
+        self._held.clear()
+
+    def _on_record(self, closure, record):
+        try:
+            data = record.contents
+            if data.category == XRECORD_FROM_SERVER and data.data_len * 4 >= 24:
+                raw = ctypes.string_at(data.data, 32)
+                # Device events are xEvent records: type, detail, ..., root x/y at offset 20
+                x, y = struct.unpack_from("=hh", raw, 20)
+                self._dispatch(raw[0] & 0x7F, raw[1], x, y)
+        except Exception as e:
+            log.exception("X11 record callback failed: %s", e)
+        finally:
+            self._xtst.XRecordFreeData(record)
+
+    def _dispatch(self, kind: int, detail: int, x: int, y: int):
+        hooks = self._hooks
+        if kind == MOTION_NOTIFY:
+            injected = (x, y) in self._injected_moves
+            if injected:
+                self._injected_moves.remove((x, y))
+            if hooks:
+                hooks[1](x, y, injected)
+        elif kind in (BUTTON_PRESS, BUTTON_RELEASE):
+            name = BUTTON_NAMES.get(detail)
+            pressed = kind == BUTTON_PRESS
+            injected = (name, pressed) in self._injected_buttons
+            if injected:
+                self._injected_buttons.remove((name, pressed))
+            if name and hooks:
+                hooks[2](x, y, name, pressed, injected)
+        elif kind in (KEY_PRESS, KEY_RELEASE):
+            name = self._key_names.get(detail, f"keycode {detail}")
+            down = kind == KEY_PRESS
+            if hooks:
+                hooks[0](name, down)
+            if not down:
+                self._held.discard(name)
+            elif name not in self._held:  # Auto-repeat does not re-fire a hotkey
+                self._held.add(name)
+                callback = self._combos.get(frozenset(self._held))
+                if callback is not None:
+                    callback()
+
+    def close(self):
+        self._stop_record()
+        if self._display:
+            self._x11.XCloseDisplay(self._display)
+            self._display = None
@@ -0,0 +1,147 @@
+"""X11 backend benchmark: injection throughput and latency against Xvfb.
+
+Starts a private Xvfb server (unless --display is given) and measures:
+  * throughput: injected moves per second, one XFlush per event vs one
+    XFlush per batch of --batch events (XSync'ed, so the server did the work)
+  * move latency: XTest motion -> seen by the XRecord hook
+  * end-to-end: the self-test loopback (hotkey -> executor -> click seen by the hook)
+
+Needs Xvfb, libX11 and libXtst (Debian/Ubuntu: xvfb libxtst6).
+
+Usage:
+    python x11_bench.py [--moves 20000] [--batch 100] [--iterations 200] [--display :1] [--json]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import Optional
+
+from histogram import LatencyHistogram
+from input_hub import InputHub
+from self_test import format_result, run_self_test
+from x11_backend import X11InputBackend
+
+
+def start_xvfb(timeout: float = 5.0):
+    """Start Xvfb on the first free display; returns (process, display name)."""
+    if not shutil.which("Xvfb"):
+        raise SystemExit("Xvfb not found (install xvfb, or pass --display)")
+    number = 99
+    while os.path.exists(f"/tmp/.X11-unix/X{number}") or os.path.exists(f"/tmp/.X{number}-lock"):
+        number += 1
+    display = f":{number}"
+    process = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise SystemExit(f"Xvfb failed to start on {display}")
+        time.sleep(0.05)
+    return process, display
+
+
+def measure_throughput(backend: X11InputBackend, moves: int, batch: int) -> dict:
+    """Moves per second with per-event flushing and with batched flushing."""
+    result = {}
+    for mode in ("per_event", "batched"):
+        backend.sync()
+        started = time.perf_counter_ns()
+        if mode == "per_event":
+            for i in range(moves):
+                backend.move(i % 1000, i % 700)
+        else:
+            for first in range(0, moves, batch):
+                with backend.batch():
+                    for i in range(first, min(first + batch, moves)):
+                        backend.move(i % 1000, i % 700)
+        backend.sync()
+        elapsed = time.perf_counter_ns() - started
+        result[mode] = {"moves": moves, "elapsed_ns": elapsed, "per_second": int(moves * 1e9 / elapsed)}
+    return result
+
+
+def measure_move_latency(backend: X11InputBackend, hub: InputHub, iterations: int,
+                         timeout: float = 1.0) -> dict:
+    """XTest motion -> MotionNotify delivered through XRecord to the hub."""
+    histogram = LatencyHistogram()
+    seen = threading.Event()
+    target = [None, 0]
+
+    def on_move(x, y, injected):
+        if (x, y) == target[0] and not seen.is_set():
+            target[1] = time.perf_counter_ns()
+            seen.set()
+
+    subscription = hub.subscribe_moves(on_move)
+    missed = 0
+    try:
+        for i in range(iterations):
+            seen.clear()
+            target[0] = (100 + i % 500, 100 + (i * 7) % 500)
+            sent = time.perf_counter_ns()
+            backend.move(*target[0])
+            if seen.wait(timeout):
+                histogram.record(target[1] - sent)
+            else:
+                missed += 1
+    finally:
+        subscription.cancel()
+    summary = histogram.summary()
+    summary["missed"] = missed
+    return summary
+
+
+def run_benchmark(display: Optional[str], moves: int, batch: int, iterations: int, hotkey: str) -> dict:
+    backend = X11InputBackend(display)
+    hub = InputHub(backend)
+    hub.start()
+    try:
+        throughput = measure_throughput(backend, moves, batch)
+        move_latency = measure_move_latency(backend, hub, iterations)
+    finally:
+        hub.stop()
+    loopback = run_self_test(backend, iterations, hotkey, 640, 512)
+    backend.close()
+    return {"throughput": throughput, "move_latency": move_latency, "loopback": loopback}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--moves", type=int, default=20000, help="Injected moves per throughput run")
+    parser.add_argument("--batch", type=int, default=100, help="Moves per XFlush in the batched run")
+    parser.add_argument("--iterations", type=int, default=200, help="Latency samples")
+    parser.add_argument("--hotkey", default="f23", help="Hotkey used for the loopback")
+    parser.add_argument("--display", help="Use this X display instead of starting Xvfb")
+    parser.add_argument("--json", action="store_true", help="Print JSON instead of text")
+    args = parser.parse_args()
+
+    xvfb = None
+    display = args.display
+    if display is None:
+        xvfb, display = start_xvfb()
+    try:
+        result = run_benchmark(display, args.moves, args.batch, args.iterations, args.hotkey)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+            xvfb.wait()
+    result["display"] = display
+
+    if args.json:
+        print(json.dumps(result))
+        return
+    for mode, s in result["throughput"].items():
+        print(f"throughput {mode:<10} {s['per_second']:>9,} moves/s ({s['moves']} in {s['elapsed_ns'] / 1e6:.1f}ms)")
+    s = result["move_latency"]
+    print(f"move latency          n={s['count']:<5} p50 {s['p50_ns'] / 1e6:7.3f}ms  p99 {s['p99_ns'] / 1e6:7.3f}ms  "
+          f"max {s['max_ns'] / 1e6:7.3f}ms  missed {s['missed']}")
+    print(format_result(result["loopback"]))
+
+
+if __name__ == "__main__":
+    main()